@@ -1,50 +1,167 @@
-from src import CONFIG, ClockCycle, FrontMenu, units, utils, assembler, ui
-
-
-def run_TD4(cc: ClockCycle):
-    CLOCK_GENERATOR = units.build_CLOCK_GENERATOR(cc)
-    ROM = units.build_ROM(assembler.assemble(CONFIG['program_file']))
-    REGISTER_A = units.build_REGISTER(False, False)
-    REGISTER_B = units.build_REGISTER(False, False)
-    REGISTER_C = units.build_REGISTER(False, False)
-    PC = units.build_REGISTER(True, True)
-    D_FF_C = units.build_D_FF()
-
-    q_d = utils.bastr2ba('0000')    # MUX input; cd is fixed with 0000
-    q_c_in = utils.bastr2ba('0000')  # input of REGISTER_C is fixed with 0000
-    step = 0
-    max_step = CONFIG['max_step']
-    for ck, reset in CLOCK_GENERATOR:
-        if step > max_step or ck is False:
-            break
-        q_PC, q_a, q_b, q_c_out, c_flag = PC.send((ck, reset)), REGISTER_A.send((ck, reset)),\
-            REGISTER_B.send((ck, reset)), REGISTER_C.send((ck, reset)), D_FF_C.send((ck, reset))
-        op_arr = ROM(q_PC)
-        decoded_arr = units.DECODER(op_arr[4:], units.NOT(c_flag))
-        select_a, select_b, load0_, load1_, load2_, load3_ = \
-            (bool(b) for b in decoded_arr)
-        selected_arr = units.MUX(select_a, select_b, q_a, q_b, q_c_in, q_d)
-        res_arr = units.ALU(c_flag, selected_arr, op_arr[:4])
-        c, sum_arr = bool(res_arr[0]), res_arr[1:]
-        D_FF_C.send(c)
-        REGISTER_A.send((load0_, sum_arr))
-        REGISTER_B.send((load1_, sum_arr))
-        REGISTER_C.send((load2_, sum_arr))
-        PC.send((load3_, sum_arr))
-        units.DISPLAY(cc,
-                      step=step, PC=utils.ba2str(q_PC[::-1]), output=utils.ba2str(q_c_out[::-1]),
-                      REGISTER_A=utils.ba2str(q_a[::-1]), REGISTER_B=utils.ba2str(q_b[::-1]),
-                      c_flag=int(c_flag), fetched_op=utils.ba2str(op_arr[::-1]),
-                      decode_res=utils.ba2str(decoded_arr),
-                      MUX_res=utils.ba2str(selected_arr[::-1]),
-                      carry=int(c), ALU_res=utils.ba2str(sum_arr))
-        step += 1
-
-
-def main():
+from typing import Callable, Iterator, List
+from contextlib import ExitStack, contextmanager
+import argparse
+import functools
+
+# modules depending on numpy are imported where they are used, which keeps --help
+# and the menus instant
+from src import CONFIG, ClockCycle, FrontMenu, Engine, ui
+
+
+@contextmanager
+def open_observers(args: argparse.Namespace) -> Iterator[List[Callable]]:
+    """Yield observers of cycles requested by args, closed on exit"""
+    with ExitStack() as stack:
+        observers = []
+        if args.trace:
+            from src import trace
+            observers.append(stack.enter_context(trace.TraceWriter(args.trace)))
+        if args.events:
+            from src import events
+            stream = events.EventStream(args.watch)
+            stream.subscribe(stack.enter_context(events.EventLogWriter(args.events)))
+            observers.append(stream)
+        yield observers
+
+
+@contextmanager
+def open_in_port(args: argparse.Namespace):
+    """Yield the input port requested by args, a constant or a device closed on exit"""
+    from src import inport
+    port = inport.open_port(args.in_port, args.in_format)
+    if isinstance(port, int):
+        yield port
+    else:
+        with port:
+            yield port
+
+
+def run_TD4(cc: ClockCycle, args: argparse.Namespace, in_port):
+    from src import units, utils, assembler, cpu, clock, renderer, debugger
+    stats = clock.ClockStats(args.hz or cc.value) if cc is not ClockCycle.MANUAL else None
+    td4 = cpu.TD4(assembler.assemble(args.program), in_port=in_port)
+    with open_observers(args) as observers, ExitStack() as stack:
+        if cc is ClockCycle.MANUAL:
+            # the debugger calls observers itself, also for cycles it does not show
+            for cycle in debugger.Debugger(td4, observers).run(args.max_step):
+                units.DISPLAY(cc,
+                              step=cycle.step, PC=utils.ba2str(cycle.q_PC[::-1]),
+                              output=utils.ba2str(cycle.q_c_out[::-1]),
+                              REGISTER_A=utils.ba2str(cycle.q_a[::-1]),
+                              REGISTER_B=utils.ba2str(cycle.q_b[::-1]),
+                              c_flag=int(cycle.c_flag),
+                              fetched_op=utils.ba2str(cycle.op_arr[::-1]),
+                              decode_res=utils.ba2str(cycle.decoded_arr),
+                              MUX_res=utils.ba2str(cycle.selected_arr[::-1]),
+                              carry=int(cycle.c), ALU_res=utils.ba2str(cycle.sum_arr))
+        else:
+            # the panel keeps up with any clock by skipping frames
+            observers.append(stack.enter_context(renderer.Renderer(args.fps)))
+            CLOCK_GENERATOR = units.build_CLOCK_GENERATOR(cc, args.hz, stats)
+            for cycle in td4.run(CLOCK_GENERATOR, args.max_step):
+                for observer in observers:
+                    observer(cycle)
+    if args.clock_stats and stats is not None:
+        print('\n' + stats.report())
+
+
+def run_headless(args: argparse.Namespace, in_port):
+    from src import assembler, headless, analysis, fastcore, romimage
+    engine = Engine(args.engine)
+    rom_cache = romimage.DEFAULT_CACHE_DIR if args.rom_cache is True else args.rom_cache
+    if engine is Engine.MEMO:
+        memo = headless.gate_backend(engine)
+        memo.configure(None if args.memo_size < 0 else args.memo_size,
+                       enabled=args.memo_size != 0)
+    with open_observers(args) as observers:
+        result = headless.run(args.program, args.max_step, engine, args.verify, observers,
+                              rom_cache, in_port)
+    print(headless.report(result, engine))
+    if engine is Engine.MEMO and memo.enabled():
+        print(memo.report())
+    if engine is Engine.CYCLE:
+        rom = fastcore.rom_from_matrix(assembler.assemble(args.program))
+        print(analysis.describe(analysis.analyze(rom)))
+
+
+def positive_float(value: str) -> float:
+    """argparse type of a number over 0"""
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(f'must be positive, not {value}')
+    return number
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='TD4 emulator')
+    parser.add_argument('--headless', action='store_true',
+                        help='run at max speed without clock, display nor menu, then print a summary')
+    parser.add_argument('-p', '--program', default=CONFIG['program_file'],
+                        help='program file (default: program_file in TD4_config.json)')
+    parser.add_argument('-n', '--max-step', type=int, default=CONFIG['max_step'],
+                        help='last step to execute (default: max_step in TD4_config.json)')
+    parser.add_argument('-e', '--engine', choices=tuple(e.value for e in Engine),
+                        default=Engine.GATE.value, help='engine used in headless mode')
+    parser.add_argument('--rom-cache', metavar='DIR', nargs='?', const=True,
+                        help='skip assembly of unchanged programs in headless mode '
+                        + '(default DIR: .td4cache)')
+    parser.add_argument('--memo-size', type=int, default=1024, metavar='N',
+                        help='cache entries per unit of the memo engine; -1 is unbounded, '
+                        + '0 turns caching off (default: 1024)')
+    parser.add_argument('--verify', action='store_true',
+                        help='diff the headless result against the gate-level engine')
+    parser.add_argument('--profile', action='store_true',
+                        help='time each stage and unit and count gate evaluations; dumped after each run')
+    parser.add_argument('--hz', type=positive_float, default=None,
+                        help='clock frequency of NORMAL and HIGH modes instead of 1 Hz / 10 Hz')
+    parser.add_argument('--fps', type=positive_float, default=30.0,
+                        help='frame rate of the register panel in NORMAL and HIGH modes')
+    parser.add_argument('--clock-stats', action='store_true',
+                        help='print jitter and late ticks of the clock after each run')
+    parser.add_argument('--trace', metavar='FILE',
+                        help='record every cycle into a binary trace; see python -m src.trace')
+    parser.add_argument('--events', metavar='FILE',
+                        help='log changes of watched registers; see python -m src.events')
+    parser.add_argument('--watch', nargs='+', default=['out'],
+                        choices=('pc', 'a', 'b', 'out', 'carry'),
+                        help='registers logged by --events (default: out)')
+    parser.add_argument('--in-port', metavar='SPEC', default='0000',
+                        help='input port read by IN A and IN B: a constant (0110 or 6), '
+                        + '- for stdin with --headless, or a file or named pipe of nibbles '
+                        + '(default: 0000)')
+    parser.add_argument('--in-format', choices=('packed', 'hex'), default='packed',
+                        help='nibbles of --in-port data: 2 per byte low first, or hex digits')
+    parser.add_argument('--no-splash', dest='splash', action='store_false',
+                        help='skip the progress bar at power on')
+    args = parser.parse_args(argv)
+    if args.in_port == '-' and not args.headless:
+        parser.error('--in-port - needs --headless; the menus read stdin as well')
+    return args
+
+
+def profiled(run: Callable, enabled: bool) -> Callable:
+    if not enabled:
+        return run
+
+    @functools.wraps(run)
+    def _profiled(*args):
+        from src import profiler
+        prof = profiler.Profiler()
+        try:
+            with prof.instrument():
+                run(*args)
+        finally:
+            print('\n' + prof.report())
+    return _profiled
+
+
+def run_menus(args: argparse.Namespace, stack: ExitStack):
+    """Run the menus until QUIT; the input port is opened by the first run into stack"""
     print('TD4 Power on...')
-    ui.dummy_progress()
+    if args.splash:
+        ui.dummy_progress()
 
+    in_port = None
     while True:
         selected_front_menu = ui.front_menu()
 
@@ -53,8 +170,10 @@ def main():
             break
         elif selected_front_menu is FrontMenu.RUN:
             selected_run_menu = ui.run_menu()
+            if in_port is None:
+                in_port = stack.enter_context(open_in_port(args))
             try:
-                run_TD4(selected_run_menu)
+                profiled(run_TD4, args.profile)(selected_run_menu, args, in_port)
                 print('\nFinish')
             except KeyboardInterrupt:
                 pass
@@ -62,5 +181,16 @@ def main():
             raise ValueError('Undefined menu is selected')
 
 
+def main(argv=None):
+    args = parse_args(argv)
+    if args.headless:
+        with open_in_port(args) as in_port:
+            profiled(run_headless, args.profile)(args, in_port)
+        return
+
+    with ExitStack() as stack:
+        run_menus(args, stack)
+
+
 if __name__ == '__main__':
     main()
@@ -1,11 +1,24 @@
-import json
 import os
 from enum import Enum
+from typing import Dict, NamedTuple
 
 config_path = os.path.join(os.path.dirname(
     os.path.dirname(os.path.abspath(__file__))), 'TD4_config.json')
-with open(config_path, 'r') as f:
-    CONFIG = json.load(f)
+
+
+def load_config() -> Dict:
+    """Read TD4_config.json; src.CONFIG is read through this on first access"""
+    import json
+    with open(config_path, 'r') as f:
+        return json.load(f)
+
+
+def __getattr__(name: str):
+    # keep `import src` free of file I/O; CONFIG is cached once read
+    if name == 'CONFIG':
+        globals()['CONFIG'] = load_config()
+        return globals()['CONFIG']
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
 
 
 class ClockCycle(Enum):
@@ -23,3 +36,26 @@ class DebugMenu(Enum):
     NEXT = 0
     RESET = 1
     STOP = 2
+    BACK = 3  # step back N steps
+    JUMP = 4  # jump to step K
+    BREAK = 5  # set breakpoints on PC or instructions
+    WATCH = 6  # set watchpoints on registers
+    CONTINUE = 7  # run without display until a breakpoint or watchpoint hits
+
+
+class Engine(Enum):
+    GATE = 'gate'  # gate-level units; the reference model
+    TABLE = 'table'  # truth tables generated from the gate-level units
+    MEMO = 'memo'  # gate-level units behind LRU caches
+    FAST = 'fast'  # integer-packed core
+    CYCLE = 'cycle'  # transition table with cycle detection
+    BLOCK = 'block'  # ROM compiled into Python functions per basic block
+
+
+class State(NamedTuple):
+    """Architectural state of TD4; every register is a 4-bit int (MSB first as usual)"""
+    pc: int
+    a: int
+    b: int
+    out: int
+    carry: int
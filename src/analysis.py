@@ -0,0 +1,110 @@
+"""Whole-machine transition table of TD4.
+
+A state of TD4 with a fixed ROM is PC, A, B, OUT, carry and the input port:
+21 bits packed as pc | a << 4 | b << 8 | out << 12 | carry << 16 | in << 17.
+Its next-state table is built once per ROM, then a run is followed until it enters a
+cycle, so the state at any step is found without executing every step.
+"""
+import numpy as np
+from nptyping import Array
+from typing import NamedTuple, Tuple
+import functools
+
+from src import State, utils, fastcore
+
+N_STATES = 1 << 21
+
+
+def pack(state: State, in_port: int = 0) -> int:
+    pc, a, b, out, carry = state
+    return pc | a << 4 | b << 8 | out << 12 | carry << 16 | in_port << 17
+
+
+def unpack(packed: int) -> State:
+    packed = int(packed)
+    return State(packed & 0b1111, packed >> 4 & 0b1111, packed >> 8 & 0b1111,
+                 packed >> 12 & 0b1111, packed >> 16 & 1)
+
+
+@functools.lru_cache(maxsize=16)
+def build_transition_table(rom: Tuple[int, ...]) -> Array[np.uint32, N_STATES]:
+    """Return next packed state of every packed state; see fastcore.FastTD4.cycle
+
+    Arguments:
+        rom {Tuple[int, ...]} -- 16 instructions of 8 bits; see fastcore.rom_from_matrix
+    """
+    idx = np.arange(N_STATES, dtype=np.uint32)
+    pc, a, b, out = (idx >> shift & 0b1111 for shift in (0, 4, 8, 12))
+    carry, in_port = idx >> 16 & 1, idx >> 17
+
+    exec_table = np.array(fastcore.EXEC_TABLE, dtype=np.uint32)
+    op = np.array(rom, dtype=np.uint32)[pc]
+    select, load_a, load_b, load_out, load_pc = exec_table[op >> 4 | carry << 4].T
+    selected = np.choose(select, (a, b, in_port, np.zeros_like(a)))
+    res = selected + (op & 0b1111) + carry
+    c, s = res >> 4, res & 0b1111
+
+    a = np.where(load_a, s, a)
+    b = np.where(load_b, s, b)
+    out = np.where(load_out, s, out)
+    pc = np.where(load_pc, s, (pc + 1) & 0b1111)
+    table = pc | a << 4 | b << 8 | out << 12 | c << 16 | in_port << 17
+    table.flags.writeable = False
+    return table
+
+
+class Orbit(NamedTuple):
+    """Run from a state until it repeats
+
+    path -- packed states from step 0; the cycle is path[transient:]
+    transient -- steps before entering the cycle
+    period -- length of the cycle
+    """
+    path: Array[np.uint32]
+    transient: int
+    period: int
+
+    def state_at(self, step: int) -> State:
+        """Return state after step cycles"""
+        if step >= len(self.path):
+            step = self.transient + (step - self.transient) % self.period
+        return unpack(self.path[step])
+
+    def outputs_on_cycle(self) -> Tuple[int, ...]:
+        """OUT of each step on the cycle"""
+        return tuple(int(s) >> 12 & 0b1111 for s in self.path[self.transient:])
+
+
+@functools.lru_cache(maxsize=64)
+def analyze(rom: Tuple[int, ...], in_port: int = 0, start: State = State(0, 0, 0, 0, 0)) -> Orbit:
+    """Follow the transition table from start until a state repeats
+
+    Arguments:
+        rom {Tuple[int, ...]} -- 16 instructions of 8 bits
+
+    Keyword Arguments:
+        in_port {int} -- value of the input port (default: {0})
+        start {State} -- state at step 0 (default: {power on})
+
+    Returns:
+        Orbit -- transient and cycle of the run
+    """
+    table = build_transition_table(tuple(rom))
+    seen = {}
+    path = []
+    s = pack(start, in_port)
+    while s not in seen:
+        seen[s] = len(path)
+        path.append(s)
+        s = int(table[s])
+    transient = seen[s]
+    return Orbit(np.array(path, dtype=np.uint32), transient, len(path) - transient)
+
+
+def describe(orbit: Orbit) -> str:
+    outputs = orbit.outputs_on_cycle()
+    changes = [outputs[0]] + [o for p, o in zip(outputs, outputs[1:]) if o != p]
+    return '\n'.join((
+        f'transient: {orbit.transient}, period: {orbit.period}',
+        'outputs on cycle: ' + ', '.join(utils.int2bastr(o, 4) for o in changes),
+    ))
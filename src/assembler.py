@@ -1,5 +1,5 @@
 import numpy as np
-from typing import Tuple
+from typing import Dict, Iterable, Iterator, Tuple
 from nptyping import Array
 import re
 
@@ -47,6 +47,20 @@ INSTRUCTIONS = {
 }
 
 
+def gen_templates(instructions: Dict = INSTRUCTIONS, prefix: Tuple[str, ...] = ()) \
+        -> Iterator[str]:
+    """Yield every instruction of the table; 'Im' stands for a 4-bit immediate"""
+    for key, value in instructions.items():
+        words = prefix + (key, )
+        if isinstance(value, dict):
+            yield from gen_templates(value, words)
+        else:
+            yield ' '.join(words)
+
+
+TEMPLATES = tuple(gen_templates())
+
+
 def assemble_line(line: str) -> Tuple[bool]:
     if len(line) == 0:
         raise ValueError('Invalid syntax: line {}; Empty line is not allowed')
@@ -76,9 +90,31 @@ def assemble_line(line: str) -> Tuple[bool]:
     return bit_arr[::-1]
 
 
+def _opcode(template: str) -> int:
+    bits = assemble_line(template.replace('Im', '0000'))
+    return sum(int(bit) << i for i, bit in enumerate(bits[4:]))
+
+
+# operation code (upper 4 bits): template
+MNEMONICS = {_opcode(template): template for template in TEMPLATES}
+
+
+def disassemble(op: int) -> str:
+    """Return line of an 8-bit instruction; UNDEFINED for an operation code out of INSTRUCTIONS"""
+    template = MNEMONICS.get(op >> 4)
+    if template is None:
+        return 'UNDEFINED'
+    return template.replace('Im', utils.int2bastr(op & 0b1111, 4))
+
+
 def assemble(program_path: str) -> Array[bool, 16, 8]:
     with open(program_path, 'r') as f:
-        program = [l.strip() for l in f]
+        return assemble_lines(f, program_path)
+
+
+def assemble_lines(lines: Iterable[str], program_path: str = '<lines>') -> Array[bool, 16, 8]:
+    """Assemble lines of a program; see assemble"""
+    program = [l.strip() for l in lines]
 
     if len(program) > 16:
         raise ValueError(
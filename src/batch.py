@@ -0,0 +1,132 @@
+"""Lockstep simulation of many TD4 machines.
+
+Every signal gets a leading machine axis, e.g. a register is Array[bool, N, 4]
+(LSB is index=0 as in units), and the units are evaluated for all machines at once
+with NumPy bitwise operations in place of the gate functions.
+"""
+import numpy as np
+from nptyping import Array
+from typing import Iterable, NamedTuple, Optional
+
+from src import assembler
+
+_WEIGHTS = 1 << np.arange(4)
+
+
+class BatchResult(NamedTuple):
+    """Final state of every machine and OUT of every step
+
+    pc, a, b, out -- Array[bool, N, 4]
+    carry -- Array[bool, N]
+    outputs -- Array[uint8, cycles + 1, N]; OUT as int before the 1st cycle and after each cycle
+    """
+    pc: Array[bool]
+    a: Array[bool]
+    b: Array[bool]
+    out: Array[bool]
+    carry: Array[bool]
+    outputs: Optional[Array[np.uint8]]
+
+
+def to_int(arr: Array[bool, ..., 4]) -> Array[int, ...]:
+    """Convert bit arrays (LSB is index=0) on the last axis into ints"""
+    return arr @ _WEIGHTS
+
+
+def FA(cin: Array[bool], a: Array[bool], b: Array[bool]) -> Array[bool]:
+    """Full Adder over machines; see units.FA
+
+    Returns:
+        Array[bool, 2, N] -- carry, sum
+    """
+    t1_c, t1_s = a & b, a ^ b
+    t2_c, t2_s = cin & t1_s, cin ^ t1_s
+    return np.stack((t2_c | t1_c, t2_s))
+
+
+def ALU(cin: Array[bool, ...], arr_a: Array[bool, ..., 4], arr_b: Array[bool, ..., 4]) \
+        -> Array[bool, ..., 5]:
+    """4-bit Full Adder over machines; see units.ALU
+
+    Returns:
+        Array[bool, N, 5] -- 0th bit is carry, others are sums
+    """
+    c = cin
+    sums = []
+    for i in range(4):
+        c, s = FA(c, arr_a[..., i], arr_b[..., i])
+        sums.append(s)
+    return np.stack([c] + sums, axis=-1)
+
+
+def MUX(a: Array[bool], b: Array[bool],
+        ca: Array[bool], cb: Array[bool], cc: Array[bool], cd: Array[bool]) -> Array[bool]:
+    """4-input Multiplexer over machines; see units.MUX"""
+    a, b = a[..., None], b[..., None]
+    return (ca & ~a & ~b) | (cb & a & ~b) | (cc & ~a & b) | (cd & a & b)
+
+
+def DECODER(op_arr: Array[bool, ..., 4], c_flag_: Array[bool, ...]) -> Array[bool, ..., 6]:
+    """Instruction Decoder over machines; see units.DECODER
+
+    Returns:
+        Array[bool, N, 6] -- [select_a, select_b, load0_, load1_, load2_, load3_]
+    """
+    op0, op1, op2, op3 = (op_arr[..., i] for i in range(4))
+    select_a = op0 | op3
+    select_b = op1
+    load0_ = op2 | op3
+    load1_ = ~op2 | op3
+    load2_ = ~(~op2 & op3)
+    load3_ = ~(op2 & op3 & (op0 | c_flag_))
+    return np.stack((select_a, select_b, load0_, load1_, load2_, load3_), axis=-1)
+
+
+def stack(program_paths: Iterable[str]) -> Array[bool, ..., 16, 8]:
+    """Assemble programs into a ROM stack"""
+    return np.stack([assembler.assemble(path) for path in program_paths])
+
+
+def run_batch(roms: Array[bool, ..., 16, 8], cycles: int,
+              in_ports: Optional[Array[bool, ..., 4]] = None, trace: bool = True) -> BatchResult:
+    """Run N machines for the same number of cycles without reset
+
+    Arguments:
+        roms {Array[bool, N, 16, 8]} -- ROM of each machine, e.g. from stack()
+        cycles {int} -- number of cycles to execute
+
+    Keyword Arguments:
+        in_ports {Optional[Array[bool, N, 4]]} -- input port of each machine (default: {0000})
+        trace {bool} -- record OUT of every step (default: {True})
+
+    Returns:
+        BatchResult -- final state and output trace
+    """
+    roms = np.asarray(roms, dtype=bool)
+    n = roms.shape[0]
+    machines = np.arange(n)
+    zeros = np.zeros((n, 4), dtype=bool)
+    one = np.zeros((n, 4), dtype=bool)
+    one[:, 0] = True
+    in_ports = zeros if in_ports is None else np.asarray(in_ports, dtype=bool)
+
+    pc, a, b, out = zeros.copy(), zeros.copy(), zeros.copy(), zeros.copy()
+    c_flag = np.zeros(n, dtype=bool)
+    outputs = np.empty((cycles + 1, n), dtype=np.uint8) if trace else None
+    if trace:
+        outputs[0] = 0
+
+    for i in range(1, cycles + 1):
+        op_arr = roms[machines, to_int(pc)]
+        decoded = DECODER(op_arr[:, 4:], ~c_flag)
+        selected = MUX(decoded[:, 0], decoded[:, 1], a, b, in_ports, zeros)
+        res = ALU(c_flag, selected, op_arr[:, :4])
+        c_flag, sum_arr = res[:, 0], res[:, 1:]
+        a = np.where(decoded[:, 2:3], a, sum_arr)
+        b = np.where(decoded[:, 3:4], b, sum_arr)
+        out = np.where(decoded[:, 4:5], out, sum_arr)
+        pc = np.where(decoded[:, 5:6], ALU(np.zeros(n, dtype=bool), pc, one)[:, 1:], sum_arr)
+        if trace:
+            outputs[i] = to_int(out)
+
+    return BatchResult(pc, a, b, out, c_flag, outputs)
@@ -0,0 +1,163 @@
+"""Benchmark suite of gates, units, cycles, engines and assembler.
+
+    $ python -m src.bench [--baseline bench_baseline.json] [--save-baseline]
+
+Each benchmark reports seconds per operation. Results are written as JSON to
+bench_output.txt and compared with the stored baseline as speedup. Both are taken relative
+to REFERENCE of the same session, so a baseline of another machine still compares.
+run.<engine> times a cold run with the caches of the engine cleared, and
+run.<engine>.warm a run hitting them. startup.* benchmarks time fresh interpreters and
+are checked against STARTUP_BUDGET.
+"""
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple
+import argparse
+import json
+import os
+import subprocess
+import sys
+import timeit
+
+from src import Engine, units, assembler, cpu, headless, analysis, compiler, memo
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROGRAM_PATH = os.path.join(ROOT, 'program.txt')
+OUTPUT_PATH = os.path.join(ROOT, 'bench_output.txt')
+BASELINE_PATH = os.path.join(ROOT, 'bench_baseline.json')
+RUN_MAX_STEP = 300
+EMULATOR_PATH = os.path.join(ROOT, 'TD4-emulator.py')
+REFERENCE = 'unit.ALU'  # speedups are of seconds relative to it
+
+# clear the caches an engine keeps between runs
+CLEAR_CACHES: Dict[Engine, Callable[[], None]] = {
+    Engine.MEMO: lambda: memo.configure(memo.MAXSIZE),
+    Engine.CYCLE: lambda: (analysis.analyze.cache_clear(),
+                           analysis.build_transition_table.cache_clear()),
+    Engine.BLOCK: compiler._compile.cache_clear,
+}
+
+# seconds from launch to exit of a fresh interpreter
+STARTUP_COMMANDS = {
+    'startup.import': ('-c', 'import src'),
+    'startup.help': (EMULATOR_PATH, '--help'),
+    'startup.headless': (EMULATOR_PATH, '--headless', '-e', 'fast', '-n', '0'),
+}
+STARTUP_BUDGET = {
+    'startup.import': 0.05,
+    'startup.help': 0.1,
+    'startup.headless': 0.5,  # NumPy alone takes most of it
+}
+
+
+def _launch(args: Tuple[str, ...]):
+    subprocess.run((sys.executable, ) + args, cwd=ROOT, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def _gen_benchmarks() -> Dict[str, Tuple[Callable[[], object], int]]:
+    """Return {name: (function, number of operations per call)}"""
+    a, b = np.array((True, False, True, False)), np.array((False, True, True, False))
+    op_arr = np.array((True, True, True, False))
+    bit_matrix = assembler.assemble(PROGRAM_PATH)
+    td4 = cpu.TD4(bit_matrix)
+
+    benchmarks = {
+        'gate.NOT': (lambda: units.NOT(True), 1),
+        'gate.AND': (lambda: units.AND(True, False), 1),
+        'gate.OR': (lambda: units.OR(True, False), 1),
+        'gate.NAND': (lambda: units.NAND(True, False), 1),
+        'gate.NOR': (lambda: units.NOR(True, False), 1),
+        'gate.XOR': (lambda: units.XOR(True, False), 1),
+        'unit.HA': (lambda: units.HA(True, False), 1),
+        'unit.FA': (lambda: units.FA(True, True, False), 1),
+        'unit.ALU': (lambda: units.ALU(True, a, b), 1),
+        'unit.MUX': (lambda: units.MUX(True, False, a, b, a, b), 1),
+        'unit.DECODER': (lambda: units.DECODER(op_arr, True), 1),
+        'unit.AR': (lambda: units.AR(a, False, False), 1),
+        'cycle.gate': (td4.cycle, 1),
+        'assembler.assemble': (lambda: assembler.assemble(PROGRAM_PATH), 1),
+    }
+    for engine in Engine:
+        def _run(engine=engine, clear=CLEAR_CACHES.get(engine)):
+            if clear is not None:
+                clear()
+            return headless.ENGINES[engine](bit_matrix, RUN_MAX_STEP)
+
+        benchmarks[f'run.{engine.value}'] = (_run, RUN_MAX_STEP + 1)
+        if engine in CLEAR_CACHES:
+            benchmarks[f'run.{engine.value}.warm'] = (
+                lambda engine=engine: headless.ENGINES[engine](bit_matrix, RUN_MAX_STEP),
+                RUN_MAX_STEP + 1)
+    for name, args in STARTUP_COMMANDS.items():
+        benchmarks[name] = (lambda args=args: _launch(args), 1)
+    return benchmarks
+
+
+def measure(fn: Callable[[], object], n_ops: int = 1, repeat: int = 3) -> float:
+    """Return best seconds per operation"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number / n_ops
+
+
+def run_benchmarks(name_filter: str = '') -> Dict[str, float]:
+    """Run benchmarks whose name contains name_filter, and REFERENCE always"""
+    return {name: measure(fn, n_ops) for name, (fn, n_ops) in _gen_benchmarks().items()
+            if name_filter in name or name == REFERENCE}
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float]) -> Dict[str, float]:
+    """Return speedup of benchmarks in both; baseline / result, each relative to REFERENCE"""
+    if REFERENCE not in results or REFERENCE not in baseline:
+        return {}
+    scale = results[REFERENCE] / baseline[REFERENCE]
+    return {name: baseline[name] * scale / sec for name, sec in results.items()
+            if name in baseline and name != REFERENCE}
+
+
+def over_budget(results: Dict[str, float]) -> Dict[str, float]:
+    """Return startup benchmarks slower than STARTUP_BUDGET"""
+    return {name: sec for name, sec in results.items()
+            if name in STARTUP_BUDGET and sec > STARTUP_BUDGET[name]}
+
+
+def report(results: Dict[str, float], speedups: Optional[Dict[str, float]] = None) -> str:
+    speedups = speedups or {}
+    slow = over_budget(results)
+    lines = []
+    for name, sec in results.items():
+        line = f'{name:<24} {sec * 1e6:12.3f} us/op'
+        if name in speedups:
+            line += f'  x{speedups[name]:.2f}'
+        if name in slow:
+            line += f'  over budget of {STARTUP_BUDGET[name] * 1e3:.0f} ms'
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TD4 emulator benchmarks')
+    parser.add_argument('-k', '--filter', default='', help='run benchmarks whose name contains it')
+    parser.add_argument('-o', '--output', default=OUTPUT_PATH)
+    parser.add_argument('-b', '--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store results as the new baseline')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.filter)
+    speedups = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            speedups = compare(results, json.load(f))
+    with open(args.output, 'w') as f:
+        json.dump({'results': results, 'speedups': speedups,
+                   'over_budget': over_budget(results)}, f, indent=4)
+    if args.save_baseline:
+        # one session only; timings of different sessions are not relative to each other
+        with open(args.baseline, 'w') as f:
+            json.dump(results, f, indent=4)
+    print(report(results, speedups))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Drift-free clock scheduler.
+
+Ticks target absolute deadlines t0 + k / hz on a monotonic clock, so the time spent
+in a cycle and its display does not stretch the period. A tick later than a whole
+period is late; the scheduler either catches up with back-to-back ticks or skips
+the deadlines already passed and counts them as missed.
+"""
+from typing import Callable, Iterator, List, Optional, Tuple
+import time
+
+
+class ClockStats:
+    """Jitter of ticks; bucket i of jitter_buckets counts lateness in [2^(i-1), 2^i) us"""
+    __slots__ = ('hz', 'ticks', 'late_ticks', 'missed_ticks', 'total_lateness', 'max_lateness',
+                 'jitter_buckets', 'late_buckets')
+
+    def __init__(self, hz: float):
+        self.hz = hz
+        self.ticks = 0
+        self.late_ticks = 0
+        self.missed_ticks = 0
+        self.total_lateness = 0.0
+        self.max_lateness = 0.0
+        self.jitter_buckets: List[int] = [0] * 48
+        self.late_buckets: List[int] = [0] * 48  # periods late, in log2 buckets as well
+
+    def add(self, lateness: float, periods_late: int, missed: int):
+        self.ticks += 1
+        self.total_lateness += lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+        self.jitter_buckets[min(int(lateness * 1e6).bit_length(), 47)] += 1
+        if periods_late:
+            self.late_ticks += 1
+            self.late_buckets[min(periods_late.bit_length(), 47)] += 1
+        self.missed_ticks += missed
+
+    def report(self) -> str:
+        mean = self.total_lateness / self.ticks if self.ticks else 0.0
+        lines = [f'clock: {self.hz:g} Hz, ticks: {self.ticks}, late ticks: {self.late_ticks}, '
+                 + f'missed ticks: {self.missed_ticks}',
+                 f'jitter: mean {mean * 1e6:.1f} us, max {self.max_lateness * 1e6:.1f} us']
+        lines += [f'  < {1 << i:>8} us: {n}' for i, n in enumerate(self.jitter_buckets) if n]
+        lines += [f'  late < {1 << i:>4} periods: {n}' for i, n in enumerate(self.late_buckets) if n]
+        return '\n'.join(lines)
+
+
+def build_SCHEDULED_CLOCK(hz: float, catch_up: bool = True, stats: Optional[ClockStats] = None,
+                          spin: float = 2e-4, now: Callable[[], float] = time.perf_counter,
+                          sleep: Callable[[float], None] = time.sleep) \
+        -> Iterator[Tuple[bool, bool]]:
+    """Build and return clock ticking at hz
+
+    Arguments:
+        hz {float} -- frequency; must be > 0
+
+    Keyword Arguments:
+        catch_up {bool} -- tick back-to-back for missed deadlines instead of skipping them
+            (default: {True})
+        stats {Optional[ClockStats]} -- collects jitter of every tick (default: {None})
+        spin {float} -- seconds busy-waited before a deadline for precision (default: {2e-4})
+        now {Callable[[], float]} -- monotonic clock (default: {time.perf_counter})
+        sleep {Callable[[float], None]} -- sleep function (default: {time.sleep})
+
+    Raises:
+        ValueError: raised when hz <= 0
+
+    Yields:
+        Tuple[bool, bool] -- ck, reset_
+    """
+    if hz <= 0:
+        raise ValueError('Frequency must be > 0')
+    period = 1 / hz
+    t0 = now()
+    k = 0
+    while True:
+        k += 1
+        deadline = t0 + k * period
+        remaining = deadline - now()
+        if remaining > spin:
+            sleep(remaining - spin)
+        while now() < deadline:
+            pass
+        lateness = now() - deadline
+        periods_late = int(lateness * hz)
+        missed = 0 if catch_up else periods_late
+        k += missed
+        if stats is not None:
+            stats.add(lateness, periods_late, missed)
+        yield True, True
@@ -0,0 +1,160 @@
+"""Basic-block compiler of ROM.
+
+A ROM is split into basic blocks at jump targets and after jumps, and each block is
+compiled into a Python function with the immediates constant-folded. The runner then
+goes block to block; see fastcore for the semantics it follows.
+"""
+from typing import Callable, List, NamedTuple, Optional, Tuple
+import functools
+
+from src import State, utils, fastcore
+
+SOURCES = ('a', 'b', 'in_port', '0')  # MUX select 0: A, 1: B, 2: IN, 3: 0000
+
+BlockFunction = Callable[[int, int, int, int, int, int, List[Tuple[int, int]]],
+                         Tuple[int, int, int, int, int]]
+
+
+class Block(NamedTuple):
+    start: int
+    length: int
+    source: str
+    function: BlockFunction
+
+
+def is_jump(op: int) -> bool:
+    """Return whether an instruction may load PC"""
+    return any(fastcore.EXEC_TABLE[op >> 4 | c_flag << 4][4] for c_flag in (0, 1))
+
+
+def find_leaders(rom: Tuple[int, ...]) -> Tuple[int, ...]:
+    """Return addresses where basic blocks start: 0, jump targets and next of jumps"""
+    leaders = {0}
+    for address, op in enumerate(rom):
+        if is_jump(op):
+            leaders.add(op & 0b1111)
+            leaders.add((address + 1) & 0b1111)
+    return tuple(sorted(leaders))
+
+
+def gen_block_source(rom: Tuple[int, ...], start: int, leaders: Tuple[int, ...]) -> Tuple[str, int]:
+    """Generate Python source of the block starting at start
+
+    Returns:
+        Tuple[str, int] -- source of function named block and number of instructions
+    """
+    lines = ['def block(a, b, out, carry, in_port, step, outputs):']
+    address = start
+    length = 0
+    while True:
+        op = rom[address]
+        im = op & 0b1111
+        length += 1
+        execs = tuple(fastcore.EXEC_TABLE[op >> 4 | c_flag << 4] for c_flag in (0, 1))
+        select, load_a, load_b, load_out, _ = execs[0]
+        lines.append(f'    # {utils.int2bastr(address, 4)}: {utils.int2bastr(op, 8)}')
+
+        load_pcs = tuple(e[4] for e in execs)
+        if load_pcs[0] != load_pcs[1]:
+            lines.append(f'    jump = carry == {int(load_pcs[1])}')
+        terms = tuple(t for t in (SOURCES[select], str(im)) if t != '0') + ('carry', )
+        lines.append(f'    res = {" + ".join(terms)}')
+        lines.append('    carry = res >> 4')
+        if load_a:
+            lines.append('    a = res & 0b1111')
+        elif load_b:
+            lines.append('    b = res & 0b1111')
+        elif load_out:
+            lines.append('    if out != res & 0b1111:')
+            lines.append('        out = res & 0b1111')
+            lines.append(f'        outputs.append((step + {length}, out))')
+
+        next_address = (address + 1) & 0b1111
+        if load_pcs == (True, True):
+            lines.append('    return res & 0b1111, a, b, out, carry')
+            break
+        elif load_pcs == (False, False):
+            if next_address in leaders:
+                lines.append(f'    return {next_address}, a, b, out, carry')
+                break
+            address = next_address
+        else:
+            lines.append(f'    return res & 0b1111 if jump else {next_address}, a, b, out, carry')
+            break
+    return '\n'.join(lines) + '\n', length
+
+
+def compile_block(rom: Tuple[int, ...], start: int, leaders: Tuple[int, ...]) -> Block:
+    source, length = gen_block_source(rom, start, leaders)
+    namespace = {}
+    exec(compile(source, f'<block {utils.int2bastr(start, 4)}>', 'exec'), namespace)
+    return Block(start, length, source, namespace['block'])
+
+
+class CompiledROM:
+    """Blocks of a ROM. Blocks start at leaders; for a PC out of leaders,
+    e.g. a state loaded from elsewhere, a block runs to the end of the enclosing one.
+    """
+    __slots__ = ('rom', 'leaders', 'blocks', 'dispatch')
+
+    def __init__(self, rom: Tuple[int, ...]):
+        self.rom = tuple(rom)
+        self.leaders = find_leaders(self.rom)
+        self.blocks: Tuple[Block, ...] = tuple(
+            compile_block(self.rom, start, self.leaders + (start, )) for start in range(16))
+        self.dispatch = tuple((block.function, block.length) for block in self.blocks)
+
+    @property
+    def source(self) -> str:
+        return '\n'.join(self.blocks[start].source for start in self.leaders)
+
+
+CACHE_SIZE = 64  # compiled ROMs kept
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _compile(rom: Tuple[int, ...]) -> CompiledROM:
+    return CompiledROM(rom)
+
+
+def compile_rom(rom: Tuple[int, ...]) -> CompiledROM:
+    """Return compiled ROM, cached per ROM; the least recently used of CACHE_SIZE go"""
+    return _compile(tuple(rom))
+
+
+def run(rom: Tuple[int, ...], cycles: int, state: State = State(0, 0, 0, 0, 0), step: int = 0,
+        outputs: Optional[List[Tuple[int, int]]] = None, in_port: int = 0) -> State:
+    """Run compiled ROM block to block without reset
+
+    Arguments:
+        rom {Tuple[int, ...]} -- 16 instructions of 8 bits
+        cycles {int} -- number of cycles to execute
+
+    Keyword Arguments:
+        state {State} -- state at step (default: {power on})
+        step {int} -- step of state (default: {0})
+        outputs {Optional[List[Tuple[int, int]]]} -- (step, OUT) is appended whenever OUT
+            changes (default: {None})
+        in_port {int} -- value of the input port during the run (default: {0})
+
+    Returns:
+        State -- state after cycles
+    """
+    compiled = compile_rom(rom)
+    outputs = [] if outputs is None else outputs
+    pc, a, b, out, carry = state
+    end = step + cycles
+    dispatch = compiled.dispatch
+    while True:
+        function, length = dispatch[pc]
+        if step + length > end:
+            break
+        pc, a, b, out, carry = function(a, b, out, carry, in_port, step, outputs)
+        step += length
+
+    # the rest is shorter than a block
+    td4 = fastcore.FastTD4(rom)
+    td4.load(State(pc, a, b, out, carry))
+    td4.step = step
+    td4.run(end - step, outputs, in_port)
+    return td4.state
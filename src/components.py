@@ -0,0 +1,131 @@
+"""Clocked components of two phases, and the scheduler ticking them.
+
+At a clock edge every component first evaluates its next state from its inputs, then
+every component commits it, so all of them sample the inputs of before the edge
+regardless of their order. Inputs are plain attributes driven by the combinational
+logic of the board before the edge, outputs are q. Components wired to the reset line
+of a scheduler are cleared at an edge with reset_ low, as the CLR pins of 74HC161 and
+74HC74.
+
+Being __slots__ objects instead of coroutines, components can be inspected, copied and
+pickled, and a board of more registers only adds components to its scheduler.
+
+    scheduler = Scheduler((pc, reg_a))
+    reg_a.load_, reg_a.d = False, arr
+    scheduler.tick()
+"""
+from nptyping import Array
+from typing import Iterable, Optional
+import abc
+
+from src import units, utils
+
+ZERO = utils.bastr2ba('0000')
+ONE = utils.bastr2ba('1000')  # LSB is index=0
+
+
+class Component(abc.ABC):
+    """Base of clocked components"""
+    __slots__ = ()
+
+    @abc.abstractmethod
+    def evaluate(self):
+        """Compute the next state from the inputs"""
+
+    @abc.abstractmethod
+    def commit(self):
+        """Take the next state"""
+
+    @abc.abstractmethod
+    def reset(self):
+        """Clear the state"""
+
+
+class Register(Component):
+    """74HC161 as COUNTER or REGISTER; units.build_REGISTER is the reference
+
+    Arguments:
+        ent {bool} -- flag to decide which of COUNTER or REGISTER
+        enp {bool} -- flag to decide which of COUNTER or REGISTER
+
+    Raises:
+        ValueError: raised when ent and enp are Not (True, True) or (False, False)
+
+    Inputs are load_ (active low) and d, the output is q; a COUNTER counts up while
+    load_ is high, a REGISTER holds.
+    """
+    __slots__ = ('counter', 'load_', 'd', 'q', '_next')
+
+    def __init__(self, ent: bool, enp: bool):
+        if not ((ent and enp) or ((ent is False) and (enp is False))):
+            raise ValueError('ent and enp are must be (True, True) or (False, False)')
+        self.counter = bool(ent)
+        self.load_ = True
+        self.d: Array[bool, 1, 4] = ZERO
+        self.q: Array[bool, 1, 4] = ZERO
+        self._next: Array[bool, 1, 4] = ZERO
+
+    def evaluate(self):
+        if self.load_ is False:
+            self._next = self.d
+        elif self.counter:
+            self._next = units.ALU(False, self.q, ONE)[1:]  # count up; [0] is carry
+        else:
+            self._next = self.q
+
+    def commit(self):
+        self.q = self._next
+
+    def reset(self):
+        self.q = ZERO
+
+
+class DFlipFlop(Component):
+    """D-FF; units.build_D_FF is the reference. The input is d, the output is q"""
+    __slots__ = ('d', 'q', '_next')
+
+    def __init__(self):
+        self.d = False
+        self.q = False
+        self._next = False
+
+    def evaluate(self):
+        self._next = self.d
+
+    def commit(self):
+        self.q = self._next
+
+    def reset(self):
+        self.q = False
+
+
+class Scheduler:
+    """Clock of a list of components
+
+    Arguments:
+        components {Iterable[Component]} -- components ticked at every edge
+
+    Keyword Arguments:
+        reset_line {Optional[Iterable[Component]]} -- components cleared by reset_;
+            every component when None (default: {None})
+    """
+    __slots__ = ('components', 'reset_line', '_evaluates', '_commits', '_resets')
+
+    def __init__(self, components: Iterable[Component],
+                 reset_line: Optional[Iterable[Component]] = None):
+        self.components = tuple(components)
+        self.reset_line = self.components if reset_line is None else tuple(reset_line)
+        # bound once; a tick is then three loops of plain calls
+        self._evaluates = tuple(c.evaluate for c in self.components)
+        self._commits = tuple(c.commit for c in self.components)
+        self._resets = tuple(c.reset for c in self.reset_line)
+
+    def tick(self, reset_: bool = True):
+        """Pass a clock edge; with reset_=False the reset line is cleared after it"""
+        for evaluate in self._evaluates:
+            evaluate()
+        for commit in self._commits:
+            commit()
+        if reset_ is False:
+            for reset in self._resets:
+                reset()
@@ -0,0 +1,104 @@
+from nptyping import Array
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
+
+from src import State, units, utils, components
+
+
+class Cycle(NamedTuple):
+    """Signals of one clock cycle; registers hold the state before the clock edge"""
+    step: int
+    q_PC: Array[bool, 1, 4]
+    q_a: Array[bool, 1, 4]
+    q_b: Array[bool, 1, 4]
+    q_c_out: Array[bool, 1, 4]
+    c_flag: bool
+    op_arr: Array[bool, 1, 8]
+    decoded_arr: Array[bool, 1, 6]
+    selected_arr: Array[bool, 1, 4]
+    c: bool
+    sum_arr: Array[bool, 1, 4]
+
+
+class TD4:
+    """TD4 wired from the gate-level units.
+
+    Arguments:
+        bit_matrix {Array[bool, 16, 8]} -- assembled program loaded into ROM
+
+    Keyword Arguments:
+        backend {module} -- provider of ALU, MUX, DECODER and build_ROM (default: {units})
+        in_port {Union[int, Iterable[int], None]} -- 4-bit value of the input port, or values
+            sampled every cycle, 0000 when exhausted or None; see inport (default: {None})
+    """
+
+    def __init__(self, bit_matrix: Array[bool, 16, 8], backend=units,
+                 in_port: Union[int, Iterable[int], None] = None):
+        self.backend = backend
+        self.in_port = None if in_port is None or isinstance(in_port, int) else iter(in_port)
+        self.ROM = backend.build_ROM(bit_matrix)
+        self.REGISTER_A = components.Register(False, False)
+        self.REGISTER_B = components.Register(False, False)
+        self.REGISTER_C = components.Register(False, False)
+        self.PC = components.Register(True, True)
+        self.D_FF_C = components.DFlipFlop()
+        self.registers = (self.PC, self.REGISTER_A, self.REGISTER_B, self.REGISTER_C)
+        # every register and the carry flag are wired to the reset switch
+        self.scheduler = components.Scheduler(self.registers + (self.D_FF_C, ))
+
+        self.q_d = utils.bastr2ba('0000')    # MUX input; cd is fixed with 0000
+        # input port; selected by IN A and IN B
+        self.q_c_in = utils.int2ba(in_port if isinstance(in_port, int) else 0, 4)[::-1]
+        self.step = 0
+
+    def cycle(self, ck: bool = True, reset_: bool = True) -> Cycle:
+        """Pass one clock and return the signals observed in it"""
+        backend = self.backend
+        if self.in_port is not None:
+            self.q_c_in = utils.int2ba(next(self.in_port, 0), 4)[::-1]
+        q_PC, q_a, q_b, q_c_out, c_flag = self.PC.q, self.REGISTER_A.q, self.REGISTER_B.q, \
+            self.REGISTER_C.q, self.D_FF_C.q
+        op_arr = self.ROM(q_PC)
+        decoded_arr = backend.DECODER(op_arr[4:], units.NOT(c_flag))
+        select_a, select_b, load0_, load1_, load2_, load3_ = \
+            (bool(b) for b in decoded_arr)
+        selected_arr = backend.MUX(select_a, select_b, q_a, q_b, self.q_c_in, self.q_d)
+        res_arr = backend.ALU(c_flag, selected_arr, op_arr[:4])
+        c, sum_arr = bool(res_arr[0]), res_arr[1:]
+        self.D_FF_C.d = c
+        for reg, load_ in zip(self.registers, (load3_, load0_, load1_, load2_)):
+            reg.load_, reg.d = load_, sum_arr
+        self.scheduler.tick(reset_)
+
+        cycle = Cycle(self.step, q_PC, q_a, q_b, q_c_out, c_flag,
+                      op_arr, decoded_arr, selected_arr, c, sum_arr)
+        self.step += 1
+        return cycle
+
+    def run(self, clock: Iterable[Tuple[bool, bool]], max_step: int) -> Iterator[Cycle]:
+        """Run while clock ticks, until step exceeds max_step or ck falls
+
+        Arguments:
+            clock {Iterable[Tuple[bool, bool]]} -- (ck, reset_) pairs, e.g. CLOCK_GENERATOR
+            max_step {int} -- last step to execute
+
+        Yields:
+            Cycle -- signals of each executed cycle
+        """
+        for ck, reset_ in clock:
+            if self.step > max_step or ck is False:
+                break
+            yield self.cycle(ck, reset_)
+
+    @property
+    def state(self) -> State:
+        """Current register values"""
+        return State(*(utils.ba2int(reg.q[::-1]) for reg in self.registers),
+                     int(self.D_FF_C.q))
+
+    def load(self, state: State, step: Optional[int] = None):
+        """Set registers to state, and step if given"""
+        for reg, q in zip(self.registers, state):
+            reg.q = utils.int2ba(q, 4)[::-1]
+        self.D_FF_C.q = bool(state.carry)
+        if step is not None:
+            self.step = step
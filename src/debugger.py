@@ -0,0 +1,195 @@
+"""Interactive run loop of ClockCycle.MANUAL with time travel and breakpoints.
+
+Every executed step is kept in a snapshots.SnapshotRing, so BACK and JUMP restore
+registers directly instead of replaying from reset.
+
+CONTINUE runs cycles without display until a breakpoint or watchpoint hits. Conditions
+are tested on the registers and the fetched instruction of each cycle, so the cycle
+which hits is executed and then shown:
+
+    breakpoint -- PC as 4 bits (0110) or decimal (6), or the leading words of an
+                  instruction (JNC, OUT B, ADD A 0001)
+    watchpoint -- <register> <op> <value> with register pc, a, b, out or carry, op one of
+                  == != < <= > >= and value as 4 bits or decimal (out == 0110),
+                  or <register> changed
+"""
+from typing import Callable, Dict, Iterable, Iterator, Optional
+import operator
+import re
+
+from src import DebugMenu, State, utils, ui, assembler, cpu, snapshots
+
+# (state, previous state, fetched instruction) -> hit
+Condition = Callable[[State, Optional[State], int], bool]
+
+OPERATORS = {'==': operator.eq, '!=': operator.ne, '<': operator.lt, '<=': operator.le,
+             '>': operator.gt, '>=': operator.ge}
+WATCH_PATTERN = re.compile(r'^(pc|a|b|out|carry)\s*(?:(==|!=|<=|>=|<|>)\s*(\w+)|\s(changed))$')
+
+
+def cycle_state(cycle: cpu.Cycle) -> State:
+    """State held by the registers in a cycle"""
+    return State(utils.ba2int(cycle.q_PC[::-1]), utils.ba2int(cycle.q_a[::-1]),
+                 utils.ba2int(cycle.q_b[::-1]), utils.ba2int(cycle.q_c_out[::-1]),
+                 int(cycle.c_flag))
+
+
+def _parse_value(value: str) -> int:
+    if assembler.IM_PATTERN.fullmatch(value):
+        return int(value, 2)
+    if value.isdigit() and int(value) < 16:
+        return int(value)
+    raise ValueError(f'Invalid value: {value}; must be 4 bits or 0 to 15')
+
+
+def parse_breakpoint(spec: str) -> Condition:
+    """Return condition of a breakpoint; see the module docstring"""
+    spec = spec.strip()
+    if assembler.IM_PATTERN.fullmatch(spec) or spec.isdigit():
+        pc = _parse_value(spec)
+        return lambda state, previous, op: state.pc == pc
+
+    words = spec.upper().split()
+    # the last word is matched as Im of a template only when it is 4 bits
+    im = words[-1] if words and assembler.IM_PATTERN.fullmatch(words[-1]) else None
+    if not any(t.split()[:len(words)] == words or
+               im is not None and t.replace('Im', im).split() == words
+               for t in assembler.TEMPLATES):
+        raise ValueError(f'Invalid breakpoint: {spec}; must be PC or an instruction')
+    return lambda state, previous, op: assembler.disassemble(op).split()[:len(words)] == words
+
+
+def parse_watchpoint(spec: str) -> Condition:
+    """Return condition of a watchpoint; see the module docstring"""
+    match = WATCH_PATTERN.fullmatch(spec.strip().lower())
+    if match is None:
+        raise ValueError(f'Invalid watchpoint: {spec}; e.g. out == 0110 or a changed')
+    register, op, value, changed = match.groups()
+    i = State._fields.index(register)
+    if changed:
+        return lambda state, previous, _: previous is not None and state[i] != previous[i]
+    compare, value = OPERATORS[op], _parse_value(value)
+    return lambda state, previous, _: compare(state[i], value)
+
+
+class Debugger:
+    """Manual clock of a TD4 with step back and jump
+
+    Arguments:
+        td4 {cpu.TD4} -- machine to debug
+
+    Keyword Arguments:
+        observers {Iterable[Callable[[cpu.Cycle], None]]} -- called with every executed cycle,
+            shown or not (default: {()})
+        ring {Optional[snapshots.SnapshotRing]} -- history (default: {SnapshotRing()})
+        menu {Callable[[], DebugMenu]} -- asks a command (default: {ui.debug_menu})
+        ask_int {Callable[[str], int]} -- asks a number of BACK and JUMP (default: {ui.int_io})
+        ask_line {Callable[[str], str]} -- asks a breakpoint or watchpoint (default: {ui.line_io})
+    """
+
+    def __init__(self, td4: cpu.TD4, observers: Iterable[Callable[[cpu.Cycle], None]] = (),
+                 ring: Optional[snapshots.SnapshotRing] = None,
+                 menu: Callable[[], DebugMenu] = ui.debug_menu,
+                 ask_int: Callable[[str], int] = ui.int_io,
+                 ask_line: Callable[[str], str] = ui.line_io):
+        self.td4 = td4
+        self.observers = tuple(observers)
+        self.ring = snapshots.SnapshotRing() if ring is None else ring
+        self.menu = menu
+        self.ask_int = ask_int
+        self.ask_line = ask_line
+        self.breakpoints: Dict[str, Condition] = {}
+        self.watchpoints: Dict[str, Condition] = {}
+        self.previous: Optional[State] = None  # state of the last executed cycle
+
+    def cycle(self, reset_: bool = True) -> cpu.Cycle:
+        cycle = self.td4.cycle(True, reset_)
+        self.previous = cycle_state(cycle)
+        self.ring.record(cycle.step, self.previous)
+        for observer in self.observers:
+            observer(cycle)
+        return cycle
+
+    def hits(self, state: State, previous: Optional[State], op: int) -> Iterator[str]:
+        """Yield breakpoints and watchpoints hit by a cycle of state fetching op"""
+        for spec, condition in self.breakpoints.items():
+            if condition(state, previous, op):
+                yield f'breakpoint {spec}'
+        for spec, condition in self.watchpoints.items():
+            if condition(state, previous, op):
+                yield f'watchpoint {spec}'
+
+    def run_until(self, max_step: int) -> cpu.Cycle:
+        """Execute cycles until a condition hits or step exceeds max_step; return the last"""
+        while True:
+            previous = self.previous
+            cycle = self.cycle()
+            op = sum(int(bit) << i for i, bit in enumerate(cycle.op_arr))
+            hits = list(self.hits(self.previous, previous, op))
+            if hits:
+                print(f'\nHit {", ".join(hits)} at step {cycle.step}')
+                return cycle
+            if self.td4.step > max_step:
+                return cycle
+
+    def set_points(self, points: Dict[str, Condition], parse: Callable[[str], Condition],
+                   kind: str):
+        listed = ', '.join(points) or 'none'
+        spec = self.ask_line(f'{kind.capitalize()}s: {listed}; add one, - to remove, '
+                             + 'empty to clear >')
+        if not spec:
+            points.clear()
+        elif spec.startswith('-'):
+            points.pop(spec[1:].strip(), None)
+        else:
+            try:
+                points[spec] = parse(spec)
+            except ValueError as err:
+                print(err)
+
+    def restore(self, step: int):
+        """Set the machine to a kept step, or run to a later step without showing it"""
+        if step in self.ring:
+            self.td4.load(self.ring.state_at(step), step)
+        elif step > self.td4.step:
+            while self.td4.step < step:
+                self.cycle()
+        elif step != self.td4.step:
+            raise ValueError(f'Step {step} is no longer kept; the oldest is {self.ring.first}')
+        self.previous = self.ring.state_at(step - 1) if step - 1 in self.ring else None
+
+    def run(self, max_step: int) -> Iterator[cpu.Cycle]:
+        """Execute commands until STOP or step exceeds max_step
+
+        Yields:
+            cpu.Cycle -- cycles to show
+        """
+        while self.td4.step <= max_step:
+            command = self.menu()
+            if command is DebugMenu.NEXT:
+                yield self.cycle()
+            elif command is DebugMenu.RESET:
+                yield self.cycle(reset_=False)
+            elif command is DebugMenu.STOP:
+                break
+            elif command is DebugMenu.BREAK:
+                self.set_points(self.breakpoints, parse_breakpoint, 'breakpoint')
+            elif command is DebugMenu.WATCH:
+                self.set_points(self.watchpoints, parse_watchpoint, 'watchpoint')
+            elif command is DebugMenu.CONTINUE:
+                yield self.run_until(max_step)
+            elif command in (DebugMenu.BACK, DebugMenu.JUMP):
+                if command is DebugMenu.BACK:
+                    step = max(self.td4.step - self.ask_int('Steps back >'), 0)
+                else:
+                    step = min(self.ask_int('Step >'), max_step)
+                try:
+                    self.restore(step)
+                except ValueError as err:
+                    print(err)
+                    continue
+                pc, a, b, out, carry = self.td4.state
+                print(f'\nstep: {self.td4.step}, PC: {pc:04b}, output: {out:04b}, '
+                      + f'REGISTER_A: {a:04b}, REGISTER_B: {b:04b}, c_flag: {carry}\n')
+            else:
+                raise ValueError('Undefined debug menu is selected')
@@ -0,0 +1,203 @@
+"""Register change events.
+
+An EventStream observes cycles of the run loop and emits an Event only when a watched
+register changes, e.g. the LEDs on OUT. Events reach consumers as callbacks, as an
+asyncio queue or from the watch() generator, and can be kept in a delta-encoded log:
+
+    header  -- magic b'TD4E', version (u2), reserved (u2), time of the 1st event in us (i8)
+    events  -- varint(step - previous step), register index << 4 | value (u1),
+               zigzag varint(time - previous time in us)
+
+    $ python -m src.events dump events.bin
+"""
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+import argparse
+import asyncio
+import struct
+import time
+
+from src import utils
+
+# register: value of a cpu.Cycle, as the fields of State
+REGISTERS: Dict[str, Callable] = {
+    'pc': lambda cycle: utils.ba2int(cycle.q_PC[::-1]),
+    'a': lambda cycle: utils.ba2int(cycle.q_a[::-1]),
+    'b': lambda cycle: utils.ba2int(cycle.q_b[::-1]),
+    'out': lambda cycle: utils.ba2int(cycle.q_c_out[::-1]),
+    'carry': lambda cycle: int(cycle.c_flag),
+}
+REGISTER_NAMES = tuple(REGISTERS)
+
+MAGIC = b'TD4E'
+VERSION = 1
+HEADER = struct.Struct('<4sHHq')
+
+
+class Event(NamedTuple):
+    step: int
+    time: float  # seconds since the epoch
+    register: str
+    value: int
+
+
+class EventStream:
+    """Observer of cycles emitting changes of registers
+
+    The 1st observed cycle emits the value of every watched register.
+
+    Keyword Arguments:
+        registers {Iterable[str]} -- names in REGISTERS to watch (default: {('out', )})
+        now {Callable[[], float]} -- timestamp of events (default: {time.time})
+    """
+
+    def __init__(self, registers: Iterable[str] = ('out', ),
+                 now: Callable[[], float] = time.time):
+        registers = tuple(registers)
+        for name in registers:
+            if name not in REGISTERS:
+                raise ValueError(f'No such a register: {name}; use one of {REGISTER_NAMES}')
+        self.getters = tuple((name, REGISTERS[name]) for name in registers)
+        self.values: Dict[str, int] = {}
+        self.now = now
+        self.callbacks: List[Callable[[Event], None]] = []
+
+    def __call__(self, cycle):
+        changed = [(name, value) for name, value in
+                   ((name, getter(cycle)) for name, getter in self.getters)
+                   if self.values.get(name) != value]
+        if not changed:
+            return
+        t = self.now()
+        for name, value in changed:
+            self.values[name] = value
+            event = Event(cycle.step, t, name, value)
+            for callback in self.callbacks:
+                callback(event)
+
+    def subscribe(self, callback: Callable[[Event], None]) -> Callable[[], None]:
+        """Call callback with every event; returns a function to unsubscribe"""
+        self.callbacks.append(callback)
+        return lambda: self.callbacks.remove(callback)
+
+    def queue(self, loop: Optional[asyncio.AbstractEventLoop] = None,
+              maxsize: int = 0) -> asyncio.Queue:
+        """Return a queue of events for a coroutine of loop
+
+        Events are put through loop.call_soon_threadsafe, so the run loop can be in
+        another thread, e.g. run_in_executor. A full queue drops events.
+
+        Keyword Arguments:
+            loop {Optional[asyncio.AbstractEventLoop]} -- loop of the consumer
+                (default: {running loop})
+            maxsize {int} -- see asyncio.Queue (default: {0})
+        """
+        loop = loop or asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+        def _put(event: Event):
+            if not queue.full():
+                queue.put_nowait(event)
+
+        self.subscribe(lambda event: loop.call_soon_threadsafe(_put, event))
+        return queue
+
+
+def watch(cycles: Iterable, registers: Iterable[str] = ('out', ),
+          now: Callable[[], float] = time.time) -> Iterator[Event]:
+    """Yield events of cycles, e.g. watch(td4.run(CLOCK_GENERATOR, max_step))"""
+    stream = EventStream(registers, now)
+    pending: List[Event] = []
+    stream.subscribe(pending.append)
+    for cycle in cycles:
+        stream(cycle)
+        if pending:
+            yield from pending
+            pending.clear()
+
+
+def _write_varint(f: BinaryIO, n: int):
+    while n >= 0x80:
+        f.write(bytes((n & 0x7f | 0x80, )))
+        n >>= 7
+    f.write(bytes((n, )))
+
+
+def _read_varint(data: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+
+class EventLogWriter:
+    """Delta-encoded log of events; subscribe it to an EventStream
+
+    Arguments:
+        path {str} -- log file; overwritten
+    """
+
+    def __init__(self, path: str):
+        self._f = open(path, 'wb')
+        self._step = 0
+        self._time: Optional[int] = None
+
+    def __call__(self, event: Event):
+        t = round(event.time * 1e6)
+        if self._time is None:
+            self._f.write(HEADER.pack(MAGIC, VERSION, 0, t))
+            self._time = t
+        _write_varint(self._f, event.step - self._step)
+        self._f.write(bytes((REGISTER_NAMES.index(event.register) << 4 | event.value, )))
+        dt = t - self._time
+        _write_varint(self._f, dt << 1 if dt >= 0 else (-dt << 1) - 1)
+        self._step, self._time = event.step, t
+
+    def close(self):
+        if not self._f.closed:
+            if self._time is None:
+                self._f.write(HEADER.pack(MAGIC, VERSION, 0, 0))
+            self._f.close()
+
+    def __enter__(self) -> 'EventLogWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_log(path: str) -> Iterator[Event]:
+    """Yield events of a log written by EventLogWriter"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, version, _, t = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f'Not an event log of version {VERSION}: {path}')
+    pos, step = HEADER.size, 0
+    while pos < len(data):
+        d_step, pos = _read_varint(data, pos)
+        reg_value = data[pos]
+        zigzag, pos = _read_varint(data, pos + 1)
+        step += d_step
+        t += zigzag >> 1 if zigzag & 1 == 0 else -((zigzag + 1) >> 1)
+        yield Event(step, t / 1e6, REGISTER_NAMES[reg_value >> 4], reg_value & 0b1111)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TD4 event logs')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    dump_parser = subparsers.add_parser('dump', help='print events of a log')
+    dump_parser.add_argument('path')
+    args = parser.parse_args(argv)
+    if args.command == 'dump':
+        for event in read_log(args.path):
+            stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(event.time))
+            print(f'{stamp}.{int(event.time % 1 * 1e6):06d} step {event.step}: '
+                  + f'{event.register} = {utils.int2bastr(event.value, 4)}')
+
+
+if __name__ == '__main__':
+    main()
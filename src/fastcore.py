@@ -0,0 +1,210 @@
+"""Integer-packed TD4 core.
+
+Registers, carry and ROM are small ints (MSB first as usual) instead of bool arrays,
+and fetch/decode/execute is integer arithmetic. The architectural state is the same
+as cpu.TD4 bit for bit, which is the reference.
+"""
+from nptyping import Array
+from typing import Iterable, List, Optional, Tuple, Union
+import itertools
+
+from src import State
+
+
+IN_PORT_CHUNK = 4096  # cycles of input port values taken at once by FastTD4.run
+
+
+class Register:
+    """74HC161 as COUNTER or REGISTER; see components.Register
+
+    Arguments:
+        ent {bool} -- flag to decide which of COUNTER or REGISTER
+        enp {bool} -- flag to decide which of COUNTER or REGISTER
+
+    Raises:
+        ValueError: raised when ent and enp are Not (True, True) or (False, False)
+    """
+    __slots__ = ('counter', 'q')
+
+    def __init__(self, ent: bool, enp: bool):
+        if not ((ent and enp) or ((ent is False) and (enp is False))):
+            raise ValueError('ent and enp are must be (True, True) or (False, False)')
+        self.counter = bool(ent)
+        self.q = 0
+
+    def clock(self, load_: bool, d: int, reset_: bool = True):
+        if load_ is False:
+            self.q = d
+        elif self.counter:
+            self.q = (self.q + 1) & 0b1111  # count up
+        if reset_ is False:
+            self.q = 0
+
+
+class D_FF:
+    """D-FF; see components.DFlipFlop"""
+    __slots__ = ('q',)
+
+    def __init__(self):
+        self.q = 0
+
+    def clock(self, d: int, reset_: bool = True):
+        self.q = 0 if reset_ is False else d
+
+
+def decode(op: int, c_flag: int) -> Tuple[int, bool, bool, bool, bool]:
+    """Instruction Decoder on ints; see units.DECODER
+
+    Arguments:
+        op {int} -- 4-bit operation code
+        c_flag {int} -- carry flag (not negated)
+
+    Returns:
+        Tuple[int, bool, bool, bool, bool] -- MUX select (0: A, 1: B, 2: IN, 3: 0000),
+        load0_, load1_, load2_, load3_
+    """
+    op0, op1, op2, op3 = op & 1, op >> 1 & 1, op >> 2 & 1, op >> 3
+    select = (op0 | op3) | op1 << 1
+    load0_ = bool(op2 | op3)
+    load1_ = bool((op2 ^ 1) | op3)
+    load2_ = not ((op2 ^ 1) & op3)
+    load3_ = not (op2 & op3 & (op0 | (c_flag ^ 1)))
+    return select, load0_, load1_, load2_, load3_
+
+
+# index: op | c_flag << 4; (select, load A, load B, load OUT, load PC) as active high
+EXEC_TABLE = tuple(
+    (select, not load0_, not load1_, not load2_, not load3_)
+    for select, load0_, load1_, load2_, load3_ in
+    (decode(i & 0b1111, i >> 4) for i in range(32)))
+
+
+def rom_from_matrix(bit_matrix: Array[bool, 16, 8]) -> Tuple[int, ...]:
+    """Convert assembled bit matrix (LSB is index=0) into 16 ints of 8 bits"""
+    return tuple(sum(int(bit) << i for i, bit in enumerate(row)) for row in bit_matrix)
+
+
+class FastTD4:
+    """TD4 on ints
+
+    Arguments:
+        rom {Tuple[int, ...]} -- 16 instructions of 8 bits; see rom_from_matrix
+
+    Keyword Arguments:
+        skip_loops {bool} -- let run jump over counting loops in closed form; see loops
+            (default: {False})
+    """
+    __slots__ = ('rom', 'loop_at', 'PC', 'REGISTER_A', 'REGISTER_B', 'REGISTER_C', 'D_FF_C',
+                 'step')
+
+    def __init__(self, rom: Tuple[int, ...], skip_loops: bool = False):
+        if len(rom) != 16:
+            raise ValueError('ROM must have 16 instructions')
+        self.rom = tuple(rom)
+        self.loop_at: Tuple = (None, ) * 16  # loops.Loop by start address
+        if skip_loops:
+            from src import loops  # loops is built on this module
+            found = loops.find_loops(self.rom)
+            self.loop_at = tuple(found.get(address) for address in range(16))
+        self.PC = Register(True, True)
+        self.REGISTER_A = Register(False, False)
+        self.REGISTER_B = Register(False, False)
+        self.REGISTER_C = Register(False, False)
+        self.D_FF_C = D_FF()
+        self.step = 0
+
+    @property
+    def state(self) -> State:
+        return State(self.PC.q, self.REGISTER_A.q, self.REGISTER_B.q, self.REGISTER_C.q,
+                     self.D_FF_C.q)
+
+    def load(self, state: State):
+        """Set registers to state"""
+        self.PC.q, self.REGISTER_A.q, self.REGISTER_B.q, self.REGISTER_C.q, self.D_FF_C.q = state
+
+    def cycle(self, reset_: bool = True, in_port: int = 0):
+        """Pass one clock; with reset_=False registers are cleared at the end of the cycle"""
+        c_flag = self.D_FF_C.q
+        op = self.rom[self.PC.q]
+        select, load0_, load1_, load2_, load3_ = decode(op >> 4, c_flag)
+        selected = (self.REGISTER_A.q, self.REGISTER_B.q, in_port, 0)[select]
+        res = selected + (op & 0b1111) + c_flag
+        c, s = res >> 4, res & 0b1111
+        self.D_FF_C.clock(c, reset_)
+        self.REGISTER_A.clock(load0_, s, reset_)
+        self.REGISTER_B.clock(load1_, s, reset_)
+        self.REGISTER_C.clock(load2_, s, reset_)
+        self.PC.clock(load3_, s, reset_)
+        self.step += 1
+
+    def run(self, cycles: int, outputs: Optional[List[Tuple[int, int]]] = None,
+            in_port: Union[int, Iterable[int]] = 0):
+        """Pass clocks without reset as fast as possible
+
+        Arguments:
+            cycles {int} -- number of cycles to execute
+
+        Keyword Arguments:
+            outputs {Optional[List[Tuple[int, int]]]} -- (step, OUT) is appended whenever OUT
+                changes (default: {None})
+            in_port {Union[int, Iterable[int]]} -- value of the input port during the run, or
+                values sampled every cycle, 0000 when exhausted; see inport (default: {0})
+
+        Counting loops are skipped in closed form when built with skip_loops; the state,
+        step and outputs are the same as cycle by cycle.
+        """
+        rom, table, loop_at = self.rom, EXEC_TABLE, self.loop_at
+        if any(loop_at):
+            from src.loops import skip
+        pc, a, b, out, carry = self.state
+        step = self.step
+        end = step + cycles
+        constant = isinstance(in_port, int)
+        samples = None if constant else iter(in_port)
+        values: List[int] = []  # values of the input port from step + 1
+        while step < end:
+            # values of the input port are taken in bulk, one per cycle of a chunk
+            first, last = step + 1, end if constant else min(end, step + IN_PORT_CHUNK)
+            if not constant:
+                values += itertools.islice(samples, last - step - len(values))
+                values += [0] * (last - step - len(values))
+            for step in range(first, last + 1):
+                loop = loop_at[pc]
+                if loop is not None:
+                    # whole iterations up to the end of the chunk in one step
+                    r = b if loop.register else a
+                    n, pc, r, carry = skip(loop, r, carry, last - step + 1)
+                    if n:
+                        if loop.register:
+                            b = r
+                        else:
+                            a = r
+                        step += n - 1
+                        values = values[step - first + 1:]
+                        break
+                op = rom[pc]
+                select, load_a, load_b, load_out, load_pc = table[op >> 4 | carry << 4]
+                if select == 0:
+                    res = a + (op & 0b1111) + carry
+                elif select == 1:
+                    res = b + (op & 0b1111) + carry
+                elif select == 2:
+                    res = (in_port if constant else values[step - first]) \
+                        + (op & 0b1111) + carry
+                else:
+                    res = (op & 0b1111) + carry
+                carry = res >> 4
+                res &= 0b1111
+                if load_a:
+                    a = res
+                elif load_b:
+                    b = res
+                elif load_out and out != res:
+                    out = res
+                    if outputs is not None:
+                        outputs.append((step, out))
+                pc = res if load_pc else (pc + 1) & 0b1111
+            else:
+                values = []
+        self.load(State(pc, a, b, out, carry))
+        self.step += cycles
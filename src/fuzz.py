@@ -0,0 +1,234 @@
+"""Differential fuzzing of the engines.
+
+Random programs are generated from assembler.INSTRUCTIONS together with random input
+port schedules. Each case is run through the gate-level cpu.TD4 and an integer model of
+the instruction set written independently of the units, and their states are compared
+every cycle. fastcore is compared every cycle as well; compiler, batch and analysis are
+compared at the end of cases whose input port is constant. Failing cases are shrunk to
+a minimal program and kept in the corpus, which is replayed before new cases.
+
+    $ python -m src.fuzz [-n 1000] [--seed 0] [-j 8] [--cycles 200] [--corpus fuzz_corpus]
+"""
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+import argparse
+import json
+import os
+import random
+
+from src import State, utils, assembler, cpu, fastcore, compiler, batch, analysis
+
+DEFAULT_CORPUS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                  'fuzz_corpus')
+
+
+TEMPLATES = assembler.TEMPLATES
+
+
+class Case(NamedTuple):
+    program: Tuple[str, ...]
+    in_port: Tuple[int, ...]  # value of the input port in each cycle
+    cycles: int
+
+
+def gen_case(rng: random.Random, cycles: int) -> Case:
+    program = tuple(
+        rng.choice(TEMPLATES).replace('Im', utils.int2bastr(rng.randrange(16), 4))
+        for _ in range(rng.randint(1, 16)))
+    if rng.random() < 0.5:
+        in_port = (rng.randrange(16), ) * cycles
+    else:
+        in_port = tuple(rng.randrange(16) for _ in range(cycles))
+    return Case(program, in_port, cycles)
+
+
+def assemble_program(program: Tuple[str, ...]) -> np.ndarray:
+    operations = [assembler.assemble_line(line) for line in program]
+    operations += [(False, ) * 8] * (16 - len(program))
+    return np.array(operations)
+
+
+# opcode: (added to Im, destination) as in the data sheet of TD4; * is undocumented
+OPCODES = {
+    0b0000: ('A', 'A'),       # ADD A, Im
+    0b0001: ('B', 'A'),       # MOV A, B
+    0b0010: ('IN', 'A'),      # IN A
+    0b0011: ('Im', 'A'),      # MOV A, Im
+    0b0100: ('A', 'B'),       # MOV B, A
+    0b0101: ('B', 'B'),       # ADD B, Im
+    0b0110: ('IN', 'B'),      # IN B
+    0b0111: ('Im', 'B'),      # MOV B, Im
+    0b1000: ('B', 'OUT'),     # * OUT B
+    0b1001: ('B', 'OUT'),     # OUT B
+    0b1010: ('Im', 'OUT'),    # * OUT Im
+    0b1011: ('Im', 'OUT'),    # OUT Im
+    0b1100: ('B', 'JNC'),     # * JNC B
+    0b1101: ('B', 'JMP'),     # * JMP B; assembler.INSTRUCTIONS encodes OUT B as this
+    0b1110: ('Im', 'JNC'),    # JNC Im
+    0b1111: ('Im', 'JMP'),    # JMP Im
+}
+
+
+def reference_step(state: State, op: int, in_port: int) -> State:
+    """Execute an instruction on the instruction-set level
+
+    Arguments:
+        state {State} -- state before the instruction
+        op {int} -- instruction of 8 bits
+        in_port {int} -- value of the input port
+
+    Returns:
+        State -- state after the instruction
+    """
+    pc, a, b, out, carry = state
+    code, im = op >> 4, op & 0b1111
+    source, destination = OPCODES[code]
+    operand = {'A': a, 'B': b, 'IN': in_port, 'Im': 0}[source]
+    # the adder takes the carry flag as its carry in
+    res = operand + im + carry
+    s = res & 0b1111
+    pc_next = (pc + 1) & 0b1111
+    if destination == 'A':
+        a = s
+    elif destination == 'B':
+        b = s
+    elif destination == 'OUT':
+        out = s
+    elif destination == 'JMP' or (destination == 'JNC' and carry == 0):
+        pc_next = s
+    return State(pc_next, a, b, out, res >> 4)
+
+
+def check(case: Case) -> Optional[str]:
+    """Return how engines diverge in a case, or None"""
+    bit_matrix = assemble_program(case.program)
+    rom = fastcore.rom_from_matrix(bit_matrix)
+    td4 = cpu.TD4(bit_matrix, in_port=case.in_port)
+    fast = fastcore.FastTD4(rom)
+    expected = State(0, 0, 0, 0, 0)
+    for step, in_port in enumerate(case.in_port[:case.cycles]):
+        cycle = td4.cycle()
+        actual = State(*(utils.ba2int(q[::-1]) for q in
+                         (cycle.q_PC, cycle.q_a, cycle.q_b, cycle.q_c_out)), int(cycle.c_flag))
+        if actual != expected:
+            return f'gate differs at step {step}: expected {expected}, actual {actual}'
+        if fast.state != expected:
+            return f'fast differs at step {step}: expected {expected}, actual {fast.state}'
+        expected = reference_step(expected, rom[expected.pc], in_port)
+        fast.cycle(in_port=in_port)
+    finals = {'gate': td4.state, 'fast': fast.state}
+    loops = fastcore.FastTD4(rom, skip_loops=True)
+    loops.run(case.cycles, in_port=case.in_port[:case.cycles])
+    finals['loops'] = loops.state
+
+    if len(set(case.in_port[:case.cycles])) <= 1:
+        in_port = case.in_port[0] if case.in_port else 0
+        finals['block'] = compiler.run(rom, case.cycles, in_port=in_port)
+        res = batch.run_batch(bit_matrix[None], case.cycles,
+                              utils.int2ba(in_port, 4)[::-1][None], trace=False)
+        finals['batch'] = State(*(int(batch.to_int(r[0])) for r in res[:4]), int(res.carry[0]))
+        finals['cycle'] = analysis.analyze(rom, in_port).state_at(case.cycles)
+    for engine, actual in finals.items():
+        if actual != expected:
+            return f'{engine} differs at step {case.cycles}: expected {expected}, actual {actual}'
+    return None
+
+
+def shrink(case: Case) -> Case:
+    """Reduce a failing case while it keeps failing"""
+    def _candidates(case: Case) -> Iterator[Case]:
+        for cycles in (case.cycles // 2, case.cycles - 1):
+            yield case._replace(cycles=cycles, in_port=case.in_port[:cycles])
+        for i in range(len(case.program)):
+            yield case._replace(program=case.program[:i] + case.program[i + 1:])
+        for i, line in enumerate(case.program):
+            words = line.split()
+            if assembler.IM_PATTERN.fullmatch(words[-1]) and words[-1] != '0000':
+                line = ' '.join(words[:-1] + ['0000'])
+                yield case._replace(program=case.program[:i] + (line, ) + case.program[i + 1:])
+        if any(case.in_port):
+            yield case._replace(in_port=(0, ) * len(case.in_port))
+
+    shrinking = True
+    while shrinking:
+        shrinking = False
+        for candidate in _candidates(case):
+            if candidate.program and candidate.cycles > 0 and check(candidate):
+                case = candidate
+                shrinking = True
+                break
+    return case
+
+
+def run_case(seed: int, cycles: int) -> Optional[Dict]:
+    """Generate, check and shrink a case; return failure record or None"""
+    case = gen_case(random.Random(seed), cycles)
+    if check(case) is None:
+        return None
+    case = shrink(case)
+    return {'seed': seed, 'error': check(case), **case._asdict()}
+
+
+def load_corpus(corpus_dir: str) -> List[Case]:
+    if not os.path.isdir(corpus_dir):
+        return []
+    cases = []
+    for name in sorted(os.listdir(corpus_dir)):
+        if name.endswith('.json'):
+            with open(os.path.join(corpus_dir, name), 'r') as f:
+                record = json.load(f)
+            cases.append(Case(tuple(record['program']), tuple(record['in_port']), record['cycles']))
+    return cases
+
+
+def save_failure(corpus_dir: str, failure: Dict):
+    os.makedirs(corpus_dir, exist_ok=True)
+    with open(os.path.join(corpus_dir, f'{failure["seed"]}.json'), 'w') as f:
+        json.dump(failure, f, indent=4)
+
+
+def fuzz(n_cases: int, seed: int = 0, cycles: int = 200, workers: Optional[int] = None,
+         corpus_dir: Optional[str] = DEFAULT_CORPUS_DIR) -> List[Dict]:
+    """Replay the corpus, then check n_cases new cases across processes
+
+    Returns:
+        List[Dict] -- failures; new ones are saved into the corpus
+    """
+    failures = []
+    for i, case in enumerate(load_corpus(corpus_dir) if corpus_dir else ()):
+        error = check(case)
+        if error:
+            failures.append({'seed': f'corpus {i}', 'error': error, **case._asdict()})
+
+    workers = workers or os.cpu_count() or 1
+    seeds = range(seed, seed + n_cases)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        chunksize = max(1, n_cases // (workers * 4))
+        for failure in executor.map(run_case, seeds, (cycles, ) * n_cases, chunksize=chunksize):
+            if failure is None:
+                continue
+            failures.append(failure)
+            if corpus_dir:
+                save_failure(corpus_dir, failure)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Differential fuzzing of TD4 engines')
+    parser.add_argument('-n', '--cases', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0, help='seed of the 1st case')
+    parser.add_argument('--cycles', type=int, default=200, help='cycles of a case')
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS_DIR)
+    args = parser.parse_args(argv)
+
+    failures = fuzz(args.cases, args.seed, args.cycles, args.workers, args.corpus)
+    for failure in failures:
+        print(f'seed {failure["seed"]}: {failure["error"]}')
+        print('\n'.join(f'    {line}' for line in failure['program']))
+    print(f'{args.cases} cases, {len(failures)} failures')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,225 @@
+import numpy as np
+from nptyping import Array
+from typing import Callable, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+import importlib
+import itertools
+import time
+
+from src import Engine, State, cpu, units, utils, assembler, fastcore, analysis, compiler, romimage
+
+UNROLL_LIMIT = 1 << 20  # output changes unrolled by run_cycle at most
+
+
+class RunResult(NamedTuple):
+    """Summary of a headless run
+
+    state -- registers after the last cycle
+    outputs -- (step, OUT) whenever OUT changes, starting with (0, 0) at power on
+    cycles -- number of executed clock cycles
+    elapsed -- wall time in seconds
+    """
+    state: State
+    outputs: Tuple[Tuple[int, int], ...]
+    cycles: int
+    elapsed: float
+
+    @property
+    def cycles_per_sec(self) -> float:
+        return self.cycles / self.elapsed if self.elapsed > 0 else float('inf')
+
+
+def run_gate(bit_matrix: Array[bool, 16, 8], max_step: int, backend=units,
+             observers: Iterable[Callable[[cpu.Cycle], None]] = (),
+             in_port: Union[int, Iterable[int]] = 0) -> RunResult:
+    """Run the gate-level TD4 with a free running clock; no sleep and no display
+
+    Arguments:
+        bit_matrix {Array[bool, 16, 8]} -- assembled program
+        max_step {int} -- last step to execute, as max_step in TD4_config.json
+
+    Keyword Arguments:
+        backend {module} -- unit backend passed to cpu.TD4 (default: {units})
+        observers {Iterable[Callable[[cpu.Cycle], None]]} -- called with every cycle,
+            e.g. trace.TraceWriter (default: {()})
+        in_port {Union[int, Iterable[int]]} -- value of the input port, or values sampled
+            every cycle; see inport (default: {0})
+
+    Returns:
+        RunResult -- final state, output history and speed
+    """
+    td4 = cpu.TD4(bit_matrix, backend, in_port)
+    outputs = [(0, 0)]
+    last = 0
+    start = time.perf_counter()
+    observers = tuple(observers)
+    for cycle in td4.run(itertools.repeat((True, True)), max_step):
+        for observer in observers:
+            observer(cycle)
+        out = utils.ba2int(cycle.q_c_out[::-1])
+        if out != last:
+            outputs.append((cycle.step, out))
+            last = out
+    state = td4.state
+    elapsed = time.perf_counter() - start
+    if state.out != last:
+        outputs.append((td4.step, state.out))
+    return RunResult(state, tuple(outputs), td4.step, elapsed)
+
+
+def run_fast(bit_matrix: Array[bool, 16, 8], max_step: int,
+             in_port: Union[int, Iterable[int]] = 0) -> RunResult:
+    """Run the integer-packed core skipping busy-wait loops; see run_gate and loops"""
+    td4 = fastcore.FastTD4(fastcore.rom_from_matrix(bit_matrix), skip_loops=True)
+    outputs = [(0, 0)]
+    start = time.perf_counter()
+    td4.run(max_step + 1, outputs, in_port)
+    elapsed = time.perf_counter() - start
+    return RunResult(td4.state, tuple(outputs), td4.step, elapsed)
+
+
+def run_cycle(bit_matrix: Array[bool, 16, 8], max_step: int, in_port: int = 0) -> RunResult:
+    """Jump to the final state through the transition table; see run_gate.
+    outputs of the cycle are unrolled from the changes within one period, up to
+    UNROLL_LIMIT changes; the rest repeat by period, see analysis.describe.
+    """
+    start = time.perf_counter()
+    orbit = analysis.analyze(fastcore.rom_from_matrix(bit_matrix), in_port)
+    cycles = max_step + 1
+    state = orbit.state_at(cycles)
+    elapsed = time.perf_counter() - start
+    outs = orbit.path >> 12 & 0b1111
+    # path is followed by its cycle again, so path[-1] is followed by path[transient]
+    outs = np.append(outs, outs[orbit.transient])
+    steps = np.flatnonzero(outs[1:] != outs[:-1]) + 1
+    steps = steps[steps <= cycles]
+    outputs = ((0, 0),) + tuple((int(step), int(outs[step])) for step in steps)
+    # step transient + offset + m * period repeats the change at transient + offset
+    offsets = steps[steps > orbit.transient] - orbit.transient
+    if len(offsets) == 0:
+        return RunResult(state, outputs, cycles, elapsed)
+    n_repeats = max(cycles - orbit.transient, 0) // orbit.period
+    n_repeats = min(n_repeats, -(-UNROLL_LIMIT // len(offsets)))
+    repeats = np.arange(1, n_repeats + 1)
+    unrolled = (orbit.transient + offsets + repeats[:, None] * orbit.period).ravel()
+    unrolled = unrolled[(unrolled >= len(outs)) & (unrolled <= cycles)][:UNROLL_LIMIT]
+    cycle_outs = outs[orbit.transient:-1]
+    outputs += tuple((int(step), int(cycle_outs[(step - orbit.transient) % orbit.period]))
+                     for step in unrolled)
+    return RunResult(state, outputs, cycles, elapsed)
+
+
+def run_block(bit_matrix: Array[bool, 16, 8], max_step: int, in_port: int = 0) -> RunResult:
+    """Run ROM compiled per basic block; see run_gate"""
+    rom = fastcore.rom_from_matrix(bit_matrix)
+    outputs = [(0, 0)]
+    start = time.perf_counter()
+    state = compiler.run(rom, max_step + 1, outputs=outputs, in_port=in_port)
+    elapsed = time.perf_counter() - start
+    return RunResult(state, tuple(outputs), max_step + 1, elapsed)
+
+
+# backends are imported on first use; generating the tables takes a while
+GATE_BACKENDS = {
+    Engine.GATE: 'src.units',
+    Engine.TABLE: 'src.tables',
+    Engine.MEMO: 'src.memo',
+}
+
+
+def gate_backend(engine: Engine):
+    """Return backend module of an engine in GATE_BACKENDS"""
+    return importlib.import_module(GATE_BACKENDS[engine])
+
+
+def run_table(bit_matrix: Array[bool, 16, 8], max_step: int,
+              in_port: Union[int, Iterable[int]] = 0) -> RunResult:
+    """run_gate on the truth-table backend"""
+    return run_gate(bit_matrix, max_step, gate_backend(Engine.TABLE), in_port=in_port)
+
+
+def run_memo(bit_matrix: Array[bool, 16, 8], max_step: int,
+             in_port: Union[int, Iterable[int]] = 0) -> RunResult:
+    """run_gate on the memoized backend"""
+    return run_gate(bit_matrix, max_step, gate_backend(Engine.MEMO), in_port=in_port)
+
+
+# engines sampling the input port every cycle; the others take a constant
+STREAMING_ENGINES = (Engine.GATE, Engine.TABLE, Engine.MEMO, Engine.FAST)
+
+ENGINES: Dict[Engine, Callable[..., RunResult]] = {
+    Engine.GATE: run_gate,
+    Engine.TABLE: run_table,
+    Engine.MEMO: run_memo,
+    Engine.FAST: run_fast,
+    Engine.CYCLE: run_cycle,
+    Engine.BLOCK: run_block,
+}
+
+
+def run(program_file: str, max_step: int, engine: Engine = Engine.GATE,
+        verify: bool = False, observers: Iterable[Callable[[cpu.Cycle], None]] = (),
+        cache_dir: Optional[str] = None, in_port: Union[int, Iterable[int]] = 0) -> RunResult:
+    """Run program headless
+
+    Arguments:
+        program_file {str} -- program to assemble
+        max_step {int} -- last step to execute
+
+    Keyword Arguments:
+        engine {Engine} -- engine to run (default: {Engine.GATE})
+        verify {bool} -- diff the result against the gate-level reference (default: {False})
+        observers {Iterable[Callable[[cpu.Cycle], None]]} -- called with every cycle;
+            only engines in GATE_BACKENDS see cycles (default: {()})
+        cache_dir {Optional[str]} -- skip assembly of programs cached in it; see romimage
+            (default: {None})
+        in_port {Union[int, Iterable[int]]} -- value of the input port, or values sampled
+            every cycle by STREAMING_ENGINES; see inport (default: {0})
+
+    Raises:
+        ValueError: raised when verify is set and the result differs from the reference,
+            observers are given to an engine out of GATE_BACKENDS, or values of the input
+            port to an engine out of STREAMING_ENGINES
+
+    Returns:
+        RunResult -- final state, output history and speed
+    """
+    bit_matrix = romimage.assemble_cached(program_file, cache_dir) if cache_dir \
+        else assembler.assemble(program_file)
+    observers = tuple(observers)
+    if not isinstance(in_port, int) and engine not in STREAMING_ENGINES:
+        raise ValueError(f'{engine.value} engine takes a constant input port; '
+                         + f'use one of {[e.value for e in STREAMING_ENGINES]}')
+    reference_port = in_port
+    if verify and engine is not Engine.GATE and not isinstance(in_port, int):
+        # values are read once; the reference gets a copy
+        in_port, reference_port = itertools.tee(in_port)
+    if engine in GATE_BACKENDS:
+        result = run_gate(bit_matrix, max_step, gate_backend(engine), observers, in_port)
+    elif observers:
+        raise ValueError(f'{engine.value} engine does not pass cycles to observers; '
+                         + f'use one of {[e.value for e in GATE_BACKENDS]}')
+    else:
+        result = ENGINES[engine](bit_matrix, max_step, in_port)
+    if verify and engine is not Engine.GATE:
+        reference = run_gate(bit_matrix, max_step, in_port=reference_port)
+        for field in ('state', 'outputs', 'cycles'):
+            expected, actual = getattr(reference, field), getattr(result, field)
+            if expected != actual:
+                raise ValueError(f'{engine.value} differs from gate in {field}:\n'
+                                 + f'expected: {expected}\nactual: {actual}')
+    return result
+
+
+def report(result: RunResult, engine: Engine = Engine.GATE) -> str:
+    s = result.state
+    lines = [
+        f'engine: {engine.value}',
+        f'cycles: {result.cycles}, elapsed: {result.elapsed:.3f} s, '
+        + f'{result.cycles_per_sec:.0f} cycles/sec',
+        f'PC: {utils.int2bastr(s.pc, 4)}, output: {utils.int2bastr(s.out, 4)}, '
+        + f'REGISTER_A: {utils.int2bastr(s.a, 4)}, REGISTER_B: {utils.int2bastr(s.b, 4)}, '
+        + f'c_flag: {s.carry}',
+        'outputs: ' + ', '.join(f'step {step}: {utils.int2bastr(out, 4)}'
+                                for step, out in result.outputs),
+    ]
+    return '\n'.join(lines)
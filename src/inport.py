@@ -0,0 +1,257 @@
+"""Devices of the input port.
+
+A device is an iterable of 4-bit values sampled once per cycle by cpu.TD4 and
+fastcore.FastTD4 (in_port of them), and read by IN A and IN B; 0000 is read once it is
+exhausted. Files, pipes and streams are read in bulk and decoded a chunk at a time in
+one of FORMATS:
+
+    packed -- two nibbles per byte, low nibble first
+    hex -- a hex digit per nibble; whitespace is ignored
+
+Pipes and asyncio streams are read ahead by a thread or a task into a bounded queue, so
+the CPU only waits for data which has not arrived yet.
+
+    $ producer | python TD4-emulator.py --headless -e fast --in-port - --in-format hex
+"""
+from typing import BinaryIO, Callable, Dict, Generator, Iterator, List, Optional, Union
+import asyncio
+import itertools
+import mmap
+import os
+import queue
+import stat
+import sys
+import threading
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 16  # bytes read at once
+DEPTH = 16  # chunks read ahead of the CPU
+
+_WHITESPACE, _INVALID = -1, -2
+_HEX = np.full(256, _INVALID, dtype=np.int8)
+_HEX[np.frombuffer(b'0123456789', np.uint8)] = range(10)
+_HEX[np.frombuffer(b'abcdef', np.uint8)] = range(10, 16)
+_HEX[np.frombuffer(b'ABCDEF', np.uint8)] = range(10, 16)
+_HEX[np.frombuffer(b' \t\r\n', np.uint8)] = _WHITESPACE
+
+
+def decode_packed(data: bytes) -> List[int]:
+    arr = np.frombuffer(data, dtype=np.uint8)
+    return np.stack((arr & 0b1111, arr >> 4), axis=1).ravel().tolist()
+
+
+def decode_hex(data: bytes) -> List[int]:
+    nibbles = _HEX[np.frombuffer(data, dtype=np.uint8)]
+    if (nibbles == _INVALID).any():
+        raise ValueError('Input port data must be hex digits and whitespace')
+    return nibbles[nibbles >= 0].tolist()
+
+
+FORMATS: Dict[str, Callable[[bytes], List[int]]] = {
+    'packed': decode_packed,
+    'hex': decode_hex,
+}
+
+
+def _decoder(fmt: str) -> Callable[[bytes], List[int]]:
+    if fmt not in FORMATS:
+        raise ValueError(f'No such a format: {fmt}; use one of {tuple(FORMATS)}')
+    return FORMATS[fmt]
+
+
+def constant(value: int) -> Iterator[int]:
+    """Input port held at value, e.g. by DIP switches"""
+    if not 0 <= value < 16:
+        raise ValueError(f'Input port value must be 0 to 15, not {value}')
+    return itertools.repeat(value)
+
+
+class _Device:
+    """Input port device; a context manager closing it on exit"""
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NibbleFile(_Device):
+    """Input port fed from a file through a memory map
+
+    Arguments:
+        path {str} -- file of nibbles
+
+    Keyword Arguments:
+        fmt {str} -- one of FORMATS (default: {'packed'})
+        chunk_size {int} -- bytes decoded at once (default: {CHUNK_SIZE})
+    """
+
+    def __init__(self, path: str, fmt: str = 'packed', chunk_size: int = CHUNK_SIZE):
+        self.path = path
+        self.decode = _decoder(fmt)
+        self.chunk_size = chunk_size
+        self._iterators: List[Generator[int, None, None]] = []
+
+    def __iter__(self) -> Iterator[int]:
+        iterator = self._read()
+        self._iterators = [i for i in self._iterators if i.gi_frame is not None] + [iterator]
+        return iterator
+
+    def close(self):
+        """Unmap and close the file of every iteration left before its end"""
+        for iterator in self._iterators:
+            iterator.close()
+        self._iterators.clear()
+
+    def _read(self) -> Generator[int, None, None]:
+        with open(self.path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return  # an empty file cannot be mapped
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for i in range(0, len(mm), self.chunk_size):
+                    yield from self.decode(mm[i:i + self.chunk_size])
+
+
+class _Prefetched(_Device):
+    """Input port of chunks decoded ahead by a producer into a bounded queue"""
+
+    _END = None
+
+    def __init__(self, fmt: str, depth: int):
+        self.decode = _decoder(fmt)
+        self.chunks: queue.Queue = queue.Queue(maxsize=depth)
+        self.closed = False
+
+    def close(self):
+        """Stop the producer after its current read, and drop the chunks read ahead"""
+        self.closed = True
+        while True:
+            try:
+                self.chunks.get_nowait()
+            except queue.Empty:
+                break
+
+    def __iter__(self) -> Iterator[int]:
+        while True:
+            chunk = self.chunks.get()
+            if chunk is self._END:
+                self.chunks.put(self._END)  # later iterations end at once
+                return
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield from chunk
+
+
+class PipePort(_Prefetched):
+    """Input port fed from a pipe, e.g. sys.stdin.buffer, read ahead by a thread
+
+    Arguments:
+        pipe {BinaryIO} -- binary file object to read until EOF
+
+    Keyword Arguments:
+        fmt {str} -- one of FORMATS (default: {'packed'})
+        chunk_size {int} -- bytes read at most at once (default: {CHUNK_SIZE})
+        depth {int} -- chunks read ahead (default: {DEPTH})
+        owned {bool} -- close pipe when the thread ends; a read blocked in the thread
+            cannot be interrupted, so the pipe is never closed under it (default: {False})
+    """
+
+    def __init__(self, pipe: BinaryIO, fmt: str = 'packed', chunk_size: int = CHUNK_SIZE,
+                 depth: int = DEPTH, owned: bool = False):
+        super().__init__(fmt, depth)
+        self.pipe = pipe
+        self.owned = owned
+        # read1 returns what has arrived instead of waiting for a whole chunk
+        self.read = getattr(pipe, 'read1', pipe.read)
+        self.chunk_size = chunk_size
+        self.thread = threading.Thread(target=self._pump, daemon=True)
+        self.thread.start()
+
+    def _pump(self):
+        try:
+            while not self.closed:
+                data = self.read(self.chunk_size)
+                if not data:
+                    break
+                self.chunks.put(self.decode(data))
+        except Exception as err:
+            self.chunks.put(err)
+        finally:
+            if self.owned:
+                self.pipe.close()
+        self.chunks.put(self._END)
+
+
+class StreamPort(_Prefetched):
+    """Input port fed from an asyncio stream, read ahead by a task of loop
+
+    The CPU iterating the port blocks while waiting for data, so it must run in another
+    thread than loop, e.g. in loop.run_in_executor.
+
+    Arguments:
+        reader {asyncio.StreamReader} -- stream to read until EOF
+        loop {asyncio.AbstractEventLoop} -- running loop of reader
+
+    Keyword Arguments:
+        fmt {str} -- one of FORMATS (default: {'packed'})
+        chunk_size {int} -- bytes read at most at once (default: {CHUNK_SIZE})
+        depth {int} -- chunks read ahead (default: {DEPTH})
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, loop: asyncio.AbstractEventLoop,
+                 fmt: str = 'packed', chunk_size: int = CHUNK_SIZE, depth: int = DEPTH):
+        super().__init__(fmt, depth)
+        self.loop = loop
+        self.future = asyncio.run_coroutine_threadsafe(self._pump(reader, chunk_size), loop)
+
+    def close(self):
+        self.future.cancel()
+        super().close()
+
+    async def _put(self, chunk):
+        # a full queue blocks an executor thread instead of the loop
+        await self.loop.run_in_executor(None, self.chunks.put, chunk)
+
+    async def _pump(self, reader: asyncio.StreamReader, chunk_size: int):
+        try:
+            while True:
+                data = await reader.read(chunk_size)
+                if not data:
+                    break
+                await self._put(self.decode(data))
+        except Exception as err:
+            await self._put(err)
+        await self._put(self._END)
+
+
+def open_port(spec: str, fmt: str = 'packed') -> Union[int, NibbleFile, PipePort]:
+    """Return input port of a command line spec
+
+    Arguments:
+        spec {str} -- a constant as 4 bits (0110) or decimal (6), - for stdin, or a path
+            to a file or a named pipe
+
+    Keyword Arguments:
+        fmt {str} -- one of FORMATS for files and pipes (default: {'packed'})
+
+    Returns:
+        Union[int, NibbleFile, PipePort] -- a constant or a device, which is a context
+            manager closing it
+    """
+    if len(spec) == 4 and set(spec) <= set('01'):
+        value: Optional[int] = int(spec, 2)
+    else:
+        value = int(spec) if spec.isdigit() else None
+    if value is not None:
+        constant(value)  # validates
+        return value
+    if spec == '-':
+        return PipePort(sys.stdin.buffer, fmt)
+    if stat.S_ISFIFO(os.stat(spec).st_mode):
+        return PipePort(open(spec, 'rb'), fmt, owned=True)
+    return NibbleFile(spec, fmt)
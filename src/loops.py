@@ -0,0 +1,149 @@
+"""Busy-wait loops of ROM and their closed form.
+
+A counting loop is a register counted up by an immediate until it carries:
+
+    L:     ADD r k   (r: A or B)
+    L + 1: JNC L
+
+Entered at L with r and carry c, the 1st iteration adds k + c (the carry flag is the
+carry-in of the ALU) and the following ones add k, as a taken JNC leaves the carry
+cleared. So n = 1 + ceil((16 - (r + k + c)) / k) iterations run until the carry, or
+forever when k is 0, and the 2n cycles are skipped in one step. Only whole iterations
+are skipped within a budget of cycles, which keeps runs cycle-accurate at any cut-off;
+OUT is not written inside of a loop.
+
+A halt is a jump to itself, JMP L or JNC L at L, which holds every register while the
+carry is cleared; all the cycles of a budget are skipped.
+
+    $ python -m src.loops program.txt
+"""
+from typing import Dict, NamedTuple, Optional, Tuple
+import argparse
+
+from src import utils, assembler, fastcore
+
+
+class Loop(NamedTuple):
+    start: int  # address of ADD, JNC at start + 1; or of the jump of a halt
+    register: Optional[int]  # 0: A, 1: B as MUX select; None for a halt
+    im: int
+
+    @property
+    def name(self) -> str:
+        return 'AB'[self.register]
+
+
+def successors(rom: Tuple[int, ...]) -> Dict[int, Tuple[int, ...]]:
+    """Return the control-flow graph of ROM: addresses each address may go to next.
+    A jump through a register, e.g. OUT B as assembled, may go anywhere.
+    """
+    graph = {}
+    for address, op in enumerate(rom):
+        targets = set()
+        for c_flag in (0, 1):
+            select, *_, load_pc = fastcore.EXEC_TABLE[op >> 4 | c_flag << 4]
+            if not load_pc:
+                targets.add((address + 1) & 0b1111)
+            elif select == 3:
+                targets.add((op & 0b1111) + c_flag & 0b1111)
+            else:
+                targets.update(range(16))
+        graph[address] = tuple(sorted(targets))
+    return graph
+
+
+def _is_add(op: int) -> Optional[int]:
+    """Return register counted by op, or None"""
+    execs = tuple(fastcore.EXEC_TABLE[op >> 4 | c_flag << 4] for c_flag in (0, 1))
+    if execs[0] != execs[1]:
+        return None
+    select, *loads = execs[0]
+    if select in (0, 1) and loads == [select == 0, select == 1, False, False]:
+        return select
+    return None
+
+
+def _is_jnc(op: int, target: int) -> bool:
+    return op & 0b1111 == target \
+        and fastcore.EXEC_TABLE[op >> 4] == (3, False, False, False, True) \
+        and fastcore.EXEC_TABLE[op >> 4 | 1 << 4] == (3, False, False, False, False)
+
+
+def _is_halt(op: int, address: int) -> bool:
+    """Return whether op at address jumps to itself without a carry; JMP or JNC"""
+    return op & 0b1111 == address \
+        and fastcore.EXEC_TABLE[op >> 4] == (3, False, False, False, True)
+
+
+def find_loops(rom: Tuple[int, ...]) -> Dict[int, Loop]:
+    """Return counting loops and halts of ROM by start address"""
+    graph = successors(rom)
+    loops = {}
+    for start, op in enumerate(rom):
+        jnc = (start + 1) & 0b1111
+        register = _is_add(op)
+        if register is not None and graph[start] == (jnc, ) and start in graph[jnc] \
+                and _is_jnc(rom[jnc], start):
+            loops[start] = Loop(start, register, op & 0b1111)
+        elif _is_halt(op, start):
+            loops[start] = Loop(start, None, op & 0b1111)
+    return loops
+
+
+def skip(loop: Loop, r: int, carry: int, budget: int) -> Tuple[int, int, int, int]:
+    """Run whole iterations of loop entered at its start, within budget cycles
+
+    Arguments:
+        loop {Loop} -- loop to run
+        r {int} -- counted register
+        carry {int} -- carry flag
+        budget {int} -- cycles which may be run
+
+    Returns:
+        Tuple[int, int, int, int] -- cycles run, PC, counted register and carry after them
+    """
+    if loop.register is None:
+        return (0 if carry else budget), loop.start, r, carry
+    k, iterations = loop.im, budget // 2
+    if iterations == 0:
+        return 0, loop.start, r, carry
+    first = r + k + carry
+    if first > 0b1111:
+        n = 1
+    elif k == 0:
+        n = iterations + 1  # never carries
+    else:
+        n = 1 + (16 - first + k - 1) // k
+    if n <= iterations:
+        # JNC at end falls through with carry set, so its res is start + 1
+        end = loop.start + 1
+        return 2 * n, (end + 1) & 0b1111, (first + (n - 1) * k) & 0b1111, end >> 4
+    return 2 * iterations, loop.start, first + (iterations - 1) * k, 0
+
+
+def describe(loops: Dict[int, Loop]) -> str:
+    if not loops:
+        return 'no busy-wait loops'
+    lines = []
+    for loop in loops.values():
+        start = utils.int2bastr(loop.start, 4)
+        if loop.register is None:
+            lines.append(f'{start}: halt while carry is 0')
+        else:
+            lines.append(f'{start}: ADD {loop.name} {utils.int2bastr(loop.im, 4)} / JNC {start}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Find busy-wait loops of a program')
+    parser.add_argument('program', help='program file')
+    args = parser.parse_args(argv)
+    rom = fastcore.rom_from_matrix(assembler.assemble(args.program))
+    for address, targets in successors(rom).items():
+        print(f'{utils.int2bastr(address, 4)} -> '
+              + ', '.join(utils.int2bastr(t, 4) for t in targets))
+    print(describe(find_loops(rom)))
+
+
+if __name__ == '__main__':
+    main()
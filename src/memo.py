@@ -0,0 +1,112 @@
+"""Memoized backend of the units.
+
+Arguments of a unit are turned into utils.BitVector keys, and its results are kept in
+an LRU cache of the unit, so the inputs a loop repeats every round are evaluated by the
+gates once. units stays the reference: every miss evaluates it. Functions have the same
+signatures as their counterparts in units and can be passed to cpu.TD4 as backend.
+Results are read-only arrays shared between hits.
+
+    >>> memo.configure(maxsize=256)
+    >>> cpu.TD4(bit_matrix, memo)
+    >>> print(memo.report())
+"""
+import numpy as np
+from nptyping import Array
+from typing import Callable, Dict, Hashable, Union
+import functools
+
+from src import units, utils, romimage
+
+MAXSIZE = 1024  # entries per unit; None is unbounded
+UNITS = ('ALU', 'MUX', 'DECODER', 'AR')
+
+_caches: Dict[str, Callable] = {}
+_enabled = True
+
+
+def _evaluate(name: str, *key: Hashable) -> Array[bool, 1, ...]:
+    args = (np.array(k) if isinstance(k, utils.BitVector) else k for k in key)
+    res = getattr(units, name)(*args)
+    res.flags.writeable = False
+    return res
+
+
+def configure(maxsize: int = MAXSIZE, enabled: bool = True):
+    """Replace the caches with empty ones
+
+    Keyword Arguments:
+        maxsize {int} -- entries per unit; None is unbounded (default: {MAXSIZE})
+        enabled {bool} -- with False every call evaluates units as it is (default: {True})
+    """
+    global _enabled
+    _enabled = enabled
+    for name in UNITS:
+        _caches[name] = functools.lru_cache(maxsize)(functools.partial(_evaluate, name))
+
+
+def enabled() -> bool:
+    return _enabled
+
+
+def cache_info() -> Dict[str, functools._CacheInfo]:
+    """Hits, misses and sizes of each unit"""
+    return {name: cache.cache_info() for name, cache in _caches.items()}
+
+
+def report() -> str:
+    lines = []
+    for name, info in cache_info().items():
+        calls = info.hits + info.misses
+        rate = info.hits / calls if calls else 0.0
+        lines.append(f'{name:<8} hits: {info.hits:>9}, misses: {info.misses:>7}, '
+                     + f'hit rate: {rate:6.1%}, size: {info.currsize}/{info.maxsize}')
+    return '\n'.join(lines)
+
+
+configure()
+
+
+def ALU(cin: bool, arr_a: Array[bool, 1, 4], arr_b: Array[bool, 1, 4]) \
+        -> Array[bool, 1, 5]:
+    """ALU through the cache; see units.ALU"""
+    if not _enabled:
+        return units.ALU(cin, arr_a, arr_b)
+    if arr_a is None or arr_b is None or len(arr_a) != 4 or len(arr_b) != 4:
+        raise ValueError('Length of each input operands must be 4')
+    return _caches['ALU'](bool(cin), utils.ba2bv(arr_a), utils.ba2bv(arr_b))
+
+
+def MUX(a: bool, b: bool,
+        ca: Array[bool, 1, 4], cb: Array[bool, 1, 4], cc: Array[bool, 1, 4], cd: Array[bool, 1, 4])\
+        -> Array[bool, 1, 4]:
+    """4-input Multiplexer through the cache; see units.MUX"""
+    if not _enabled:
+        return units.MUX(a, b, ca, cb, cc, cd)
+    return _caches['MUX'](bool(a), bool(b), utils.ba2bv(ca), utils.ba2bv(cb),
+                          utils.ba2bv(cc), utils.ba2bv(cd))
+
+
+def DECODER(op_arr: Array[bool, 1, 4], c_flag_: bool) -> Array[bool, 1, 6]:
+    """Instruction Decoder through the cache; see units.DECODER"""
+    if not _enabled:
+        return units.DECODER(op_arr, c_flag_)
+    return _caches['DECODER'](utils.ba2bv(op_arr), bool(c_flag_))
+
+
+def AR(address: Array[bool, 1, 4], g1_: bool, g2_: bool) -> Array[bool, 1, 16]:
+    """Address Resolver through the cache; see units.AR"""
+    if not _enabled:
+        return units.AR(address, g1_, g2_)
+    return _caches['AR'](utils.ba2bv(address), bool(g1_), bool(g2_))
+
+
+def build_ROM(bit_matrix: Union[Array[bool, 16, 8], bytes]) \
+        -> Callable[[Array[bool, 1, 4]], Array[bool, 1, 8]]:
+    """Build and return ROM addressed through the cached AR; see units.build_ROM"""
+    if isinstance(bit_matrix, (bytes, bytearray, memoryview)):
+        bit_matrix = romimage.unpack(bytes(bit_matrix))
+
+    def _ROM(address: Array[bool, 1, 4]) -> Array[bool, 1, 8]:
+        return bit_matrix[AR(address, False, False)][0]
+
+    return _ROM
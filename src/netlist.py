@@ -0,0 +1,373 @@
+"""Netlist of the gate-level units and its simulators.
+
+The netlist is traced from the definitions in units: while NOT, _AND and _OR are
+substituted, units are called with nets instead of bools and every gate they evaluate
+is recorded. Net 0 and 1 are the constants False and True.
+
+Two simulators run the netlist:
+
+    EventSimulator   -- re-evaluates only gates downstream of changed nets, in level order
+    compile_netlist  -- straight-line Python of the gates in level order
+
+NetlistTD4 wires the traced TD4 logic (AR, DECODER, MUX, ALU and the incrementer of PC)
+to registers and ROM like cpu.TD4, and counts gate evaluations per cycle.
+
+    $ python -m src.netlist [-p program.txt] [-n 300] [--mode event]
+"""
+import numpy as np
+from nptyping import Array
+from typing import Callable, Counter, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import argparse
+import collections
+import heapq
+
+import src
+from src import State, units, utils, assembler, fastcore
+
+GATE_KINDS = ('NOT', 'AND', 'OR')
+
+
+class Net:
+    """Wire while tracing; it has no value"""
+    __slots__ = ('id', )
+
+    def __init__(self, id: int):
+        self.id = id
+
+    def __bool__(self):
+        raise TypeError('A net has no value while tracing; units must be made of gates')
+
+
+class Gate(NamedTuple):
+    kind: str
+    inputs: Tuple[int, ...]
+    output: int
+
+
+class Netlist:
+    """Gates and named input and output buses; bit i of a bus is index i as in units"""
+
+    def __init__(self):
+        self.gates: List[Gate] = []
+        self.n_nets = 2
+        self.inputs: Dict[str, Tuple[int, ...]] = {}
+        self.outputs: Dict[str, Tuple[int, ...]] = {}
+        self._levels: Optional[List[int]] = None
+        self._fanout: Optional[List[Tuple[int, ...]]] = None
+
+    def _new_net(self) -> Net:
+        net = Net(self.n_nets)
+        self.n_nets += 1
+        return net
+
+    def input(self, name: str, width: int) -> Array[object, 1, ...]:
+        nets = np.array([self._new_net() for _ in range(width)], dtype=object)
+        self.inputs[name] = tuple(net.id for net in nets)
+        return nets
+
+    def output(self, name: str, nets: Iterable):
+        self.outputs[name] = tuple(self._net_id(net) for net in nets)
+
+    @staticmethod
+    def _net_id(x) -> int:
+        return x.id if isinstance(x, Net) else int(bool(x))
+
+    def _gate(self, kind: str, *xs) -> Net:
+        out = self._new_net()
+        self.gates.append(Gate(kind, tuple(self._net_id(x) for x in xs), out.id))
+        self._levels = self._fanout = None
+        return out
+
+    def NOT(self, x) -> Net:
+        return self._gate('NOT', x)
+
+    def AND(self, a, b) -> Net:
+        return self._gate('AND', a, b)
+
+    def OR(self, a, b) -> Net:
+        return self._gate('OR', a, b)
+
+    def tracing(self):
+        """Context in which units build gates of this netlist"""
+        return units.substitute(NOT=self.NOT, _AND=self.AND, _OR=self.OR)
+
+    @property
+    def levels(self) -> List[int]:
+        """Level of each gate; a gate reads nets of lower levels only"""
+        if self._levels is None:
+            net_levels = [0] * self.n_nets
+            self._levels = []
+            for gate in self.gates:  # gates are recorded after the gates they read
+                level = max(net_levels[i] for i in gate.inputs) + 1
+                net_levels[gate.output] = level
+                self._levels.append(level)
+        return self._levels
+
+    @property
+    def fanout(self) -> List[Tuple[int, ...]]:
+        """Gates reading each net"""
+        if self._fanout is None:
+            fanout: List[List[int]] = [[] for _ in range(self.n_nets)]
+            for g, gate in enumerate(self.gates):
+                for i in set(gate.inputs):
+                    fanout[i].append(g)
+            self._fanout = [tuple(f) for f in fanout]
+        return self._fanout
+
+    def cone(self, outputs: Iterable[str]) -> List[int]:
+        """Gates which outputs depend on, in level order"""
+        driver = {gate.output: g for g, gate in enumerate(self.gates)}
+        needed, stack = set(), [i for name in outputs for i in self.outputs[name]]
+        while stack:
+            g = driver.get(stack.pop())
+            if g is not None and g not in needed:
+                needed.add(g)
+                stack.extend(self.gates[g].inputs)
+        return sorted(needed, key=lambda g: (self.levels[g], g))
+
+    def counts(self) -> Dict[str, int]:
+        """Number of gates of each kind, total and the depth in gates"""
+        counts = collections.Counter(gate.kind for gate in self.gates)
+        result = {kind: counts[kind] for kind in GATE_KINDS}
+        result['total'] = len(self.gates)
+        result['depth'] = max(self.levels, default=0)
+        return result
+
+
+def build_TD4() -> Netlist:
+    """Trace the combinational logic of TD4
+
+    Inputs are pc, a, b, in_port, c_flag and op (the word read from ROM). Outputs are
+    lines (AR; one-hot address of ROM), decoded (DECODER), selected (MUX),
+    carry and sum (ALU), and count (PC + 1 of the 74HC161 counter).
+    """
+    netlist = Netlist()
+    pc, a, b, in_port = (netlist.input(name, 4) for name in ('pc', 'a', 'b', 'in_port'))
+    c_flag, = netlist.input('c_flag', 1)
+    op = netlist.input('op', 8)
+    with netlist.tracing():
+        lines = units.AR(pc, False, False)
+        decoded = units.DECODER(op[4:], units.NOT(c_flag))
+        selected = units.MUX(decoded[0], decoded[1], a, b, in_port, utils.bastr2ba('0000'))
+        res = units.ALU(c_flag, selected, op[:4])
+        count = units.ALU(False, pc, utils.bastr2ba('1000'))[1:]
+    netlist.output('lines', lines)
+    netlist.output('decoded', decoded)
+    netlist.output('selected', selected)
+    netlist.output('carry', res[:1])
+    netlist.output('sum', res[1:])
+    netlist.output('count', count)
+    return netlist
+
+
+_EVALUATE = {
+    'NOT': lambda v, i: v[i[0]] ^ 1,
+    'AND': lambda v, i: v[i[0]] & v[i[1]],
+    'OR': lambda v, i: v[i[0]] | v[i[1]],
+}
+
+
+class EventSimulator:
+    """Event-driven simulation; set inputs, settle, then get outputs
+
+    Arguments:
+        netlist {Netlist} -- circuit; every gate is evaluated once at the start
+    """
+
+    def __init__(self, netlist: Netlist):
+        self.netlist = netlist
+        self.values = bytearray(netlist.n_nets)
+        self.values[1] = 1
+        for gate in netlist.gates:
+            self.values[gate.output] = _EVALUATE[gate.kind](self.values, gate.inputs)
+        self._pending: List[Tuple[int, int]] = []
+        self._queued = set()
+        self.evaluations = 0
+
+    def set(self, name: str, value: int):
+        """Drive an input bus with an int; bit i to net i"""
+        levels, fanout = self.netlist.levels, self.netlist.fanout
+        for bit, i in enumerate(self.netlist.inputs[name]):
+            v = value >> bit & 1
+            if self.values[i] != v:
+                self.values[i] = v
+                self._schedule(fanout[i], levels)
+
+    def _schedule(self, gates: Tuple[int, ...], levels: List[int]):
+        for g in gates:
+            if g not in self._queued:
+                self._queued.add(g)
+                heapq.heappush(self._pending, (levels[g], g))
+
+    def settle(self) -> int:
+        """Evaluate scheduled gates until no net changes; return number of evaluations"""
+        netlist, values = self.netlist, self.values
+        gates, levels, fanout = netlist.gates, netlist.levels, netlist.fanout
+        n = 0
+        while self._pending:
+            _, g = heapq.heappop(self._pending)
+            self._queued.discard(g)
+            gate = gates[g]
+            v = _EVALUATE[gate.kind](values, gate.inputs)
+            n += 1
+            if values[gate.output] != v:
+                values[gate.output] = v
+                self._schedule(fanout[gate.output], levels)
+        self.evaluations += n
+        return n
+
+    def get(self, name: str) -> int:
+        return sum(self.values[i] << bit for bit, i in enumerate(self.netlist.outputs[name]))
+
+
+def gen_source(netlist: Netlist, inputs: Iterable[str], outputs: Iterable[str],
+               name: str = 'evaluate') -> Tuple[str, int]:
+    """Generate straight-line Python of the gates outputs depend on
+
+    Returns:
+        Tuple[str, int] -- source of function name(*inputs) -> outputs as ints, and
+        number of gates in it
+    """
+    inputs, outputs = tuple(inputs), tuple(outputs)
+    cone = netlist.cone(outputs)
+    lines = [f'def {name}({", ".join(inputs)}):', '    n0, n1 = 0, 1']
+    for bus in inputs:
+        lines += [f'    n{i} = {bus} >> {bit} & 1' for bit, i in enumerate(netlist.inputs[bus])]
+    ops = {'AND': '&', 'OR': '|'}
+    for g in cone:
+        gate = netlist.gates[g]
+        if gate.kind == 'NOT':
+            expr = f'n{gate.inputs[0]} ^ 1'
+        else:
+            expr = f'n{gate.inputs[0]} {ops[gate.kind]} n{gate.inputs[1]}'
+        lines.append(f'    n{gate.output} = {expr}  # {gate.kind}')
+    packed = (' | '.join(f'n{i} << {bit}' for bit, i in enumerate(netlist.outputs[bus]))
+              for bus in outputs)
+    lines.append(f'    return {", ".join(packed)}{"," if len(outputs) == 1 else ""}')
+    return '\n'.join(lines) + '\n', len(cone)
+
+
+def compile_netlist(netlist: Netlist, inputs: Iterable[str], outputs: Iterable[str]) \
+        -> Tuple[Callable[..., Tuple[int, ...]], int]:
+    """Compile gen_source; returns the function and its number of gates"""
+    source, n_gates = gen_source(netlist, inputs, outputs)
+    namespace = {}
+    exec(compile(source, '<netlist>', 'exec'), namespace)
+    return namespace['evaluate'], n_gates
+
+
+_FETCH_INPUTS, _FETCH_OUTPUTS = ('pc', ), ('lines', )
+_EXECUTE_INPUTS = ('pc', 'a', 'b', 'in_port', 'c_flag', 'op')
+_EXECUTE_OUTPUTS = ('decoded', 'carry', 'sum', 'count')
+
+
+class NetlistTD4:
+    """TD4 on the traced netlist; registers and ROM are the chips outside of it
+
+    Arguments:
+        bit_matrix {Array[bool, 16, 8]} -- assembled program loaded into ROM
+
+    Keyword Arguments:
+        mode {str} -- 'event' for EventSimulator or 'compiled' (default: {'event'})
+        netlist {Optional[Netlist]} -- circuit (default: {build_TD4()})
+    """
+
+    def __init__(self, bit_matrix: Array[bool, 16, 8], mode: str = 'event',
+                 netlist: Optional[Netlist] = None):
+        self.rom = fastcore.rom_from_matrix(bit_matrix)
+        self.netlist = netlist or build_TD4()
+        self.mode = mode
+        if mode == 'event':
+            self.simulator = EventSimulator(self.netlist)
+        elif mode == 'compiled':
+            self._fetch, self._fetch_gates = compile_netlist(
+                self.netlist, _FETCH_INPUTS, _FETCH_OUTPUTS)
+            self._execute, self._execute_gates = compile_netlist(
+                self.netlist, _EXECUTE_INPUTS, _EXECUTE_OUTPUTS)
+        else:
+            raise ValueError(f'No such a mode: {mode}; must be event or compiled')
+        self.pc = self.a = self.b = self.out = self.carry = 0
+        self.step = 0
+        self.evaluations: Counter[int] = collections.Counter()  # per cycle: cycles
+
+    @property
+    def state(self) -> State:
+        return State(self.pc, self.a, self.b, self.out, self.carry)
+
+    def _read_rom(self, lines: int) -> int:
+        return self.rom[(lines & -lines).bit_length() - 1]  # 1st selected address
+
+    def _cycle_event(self, in_port: int) -> Tuple[int, int, int, int, int]:
+        sim = self.simulator
+        sim.set('pc', self.pc)
+        n = sim.settle()
+        sim.set('op', self._read_rom(sim.get('lines')))
+        for name, value in (('a', self.a), ('b', self.b), ('in_port', in_port),
+                            ('c_flag', self.carry)):
+            sim.set(name, value)
+        n += sim.settle()
+        self.evaluations[n] += 1
+        return sim.get('decoded'), sim.get('carry'), sim.get('sum'), sim.get('count'), n
+
+    def _cycle_compiled(self, in_port: int) -> Tuple[int, int, int, int, int]:
+        lines, = self._fetch(self.pc)
+        decoded, carry, s, count = self._execute(self.pc, self.a, self.b, in_port, self.carry,
+                                                 self._read_rom(lines))
+        n = self._fetch_gates + self._execute_gates
+        self.evaluations[n] += 1
+        return decoded, carry, s, count, n
+
+    def cycle(self, reset_: bool = True, in_port: int = 0) -> int:
+        """Pass one clock; returns number of gate evaluations in it"""
+        if self.mode == 'event':
+            decoded, carry, s, count, n = self._cycle_event(in_port)
+        else:
+            decoded, carry, s, count, n = self._cycle_compiled(in_port)
+        # load0_ to load3_ are active low; see units.DECODER
+        if not decoded >> 2 & 1:
+            self.a = s
+        if not decoded >> 3 & 1:
+            self.b = s
+        if not decoded >> 4 & 1:
+            self.out = s
+        self.pc = count if decoded >> 5 & 1 else s
+        self.carry = carry
+        if reset_ is False:
+            self.pc = self.a = self.b = self.out = self.carry = 0
+        self.step += 1
+        return n
+
+    def run(self, cycles: int, in_port: int = 0):
+        for _ in range(cycles):
+            self.cycle(in_port=in_port)
+
+
+def report(td4: NetlistTD4) -> str:
+    counts = td4.netlist.counts()
+    cycles = sum(td4.evaluations.values())
+    total = sum(n * k for n, k in td4.evaluations.items())
+    lines = ['gates: ' + ', '.join(f'{kind} {counts[kind]}' for kind in GATE_KINDS)
+             + f', total {counts["total"]}, depth {counts["depth"]}',
+             f'{td4.mode}: {cycles} cycles, {total} gate evaluations, '
+             + f'{total / cycles if cycles else 0:.1f} per cycle']
+    if cycles:
+        lines.append(f'  min {min(td4.evaluations)}, max {max(td4.evaluations)}, '
+                     + f'idle cycles {td4.evaluations[0]}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run TD4 on its gate netlist')
+    parser.add_argument('-p', '--program', default=src.CONFIG['program_file'])
+    parser.add_argument('-n', '--max-step', type=int, default=src.CONFIG['max_step'])
+    parser.add_argument('--mode', choices=('event', 'compiled'), default='event')
+    args = parser.parse_args(argv)
+
+    td4 = NetlistTD4(assembler.assemble(args.program), args.mode)
+    td4.run(args.max_step + 1)
+    print(f'state: {td4.state}')
+    print(report(td4))
+
+
+if __name__ == '__main__':
+    main()
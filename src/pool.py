@@ -0,0 +1,135 @@
+"""Run many program files headless across a process pool.
+
+    $ python -m src.pool programs/ [-n 300] [-e fast] [-j 8] [-o report.json]
+    $ python -m src.pool manifest.json
+
+A manifest is a JSON list of {"program_file": ..., "max_step": ...} as in TD4_config.json;
+relative paths are resolved against the manifest. A directory runs its *.txt files.
+"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional
+import argparse
+import json
+import os
+import time
+
+import src
+from src import Engine, headless, romimage
+
+
+class Job(NamedTuple):
+    program_file: str
+    max_step: int
+
+
+def load_jobs(path: str, max_step: Optional[int] = None) -> List[Job]:
+    """Return jobs of a directory of programs or a manifest
+
+    Arguments:
+        path {str} -- directory of *.txt programs or JSON manifest
+
+    Keyword Arguments:
+        max_step {int} -- max_step of programs in a directory or without one in the manifest
+            (default: {None; max_step in TD4_config.json})
+    """
+    if max_step is None:
+        max_step = src.CONFIG['max_step']
+    if os.path.isdir(path):
+        return [Job(os.path.join(path, name), max_step)
+                for name in sorted(os.listdir(path)) if name.endswith('.txt')]
+
+    with open(path, 'r') as f:
+        manifest = json.load(f)
+    if isinstance(manifest, dict):
+        manifest = [manifest]
+    base = os.path.dirname(os.path.abspath(path))
+    return [Job(os.path.join(base, entry['program_file']), entry.get('max_step', max_step))
+            for entry in manifest]
+
+
+def run_job(job: Job, engine: Engine, cache_dir: Optional[str] = None) -> Dict:
+    """Assemble and run a job headless; errors of the program are reported, not raised"""
+    result = {'program_file': job.program_file, 'max_step': job.max_step}
+    try:
+        res = headless.run(job.program_file, job.max_step, engine, cache_dir=cache_dir)
+    except (OSError, ValueError) as err:
+        result['error'] = str(err)
+        return result
+    result.update(state=res.state._asdict(), outputs=res.outputs, cycles=res.cycles,
+                  elapsed=res.elapsed)
+    return result
+
+
+def _run_chunk(jobs: List[Job], engine_value: str, cache_dir: Optional[str]) -> List[Dict]:
+    engine = Engine(engine_value)
+    return [run_job(job, engine, cache_dir) for job in jobs]
+
+
+def run_pool(jobs: Iterable[Job], engine: Engine = Engine.FAST,
+             workers: Optional[int] = None, cache_dir: Optional[str] = None) -> Iterator[Dict]:
+    """Run jobs across processes and yield results as they complete
+
+    Arguments:
+        jobs {Iterable[Job]} -- jobs to run
+
+    Keyword Arguments:
+        engine {Engine} -- headless engine (default: {Engine.FAST})
+        workers {Optional[int]} -- number of processes (default: {number of cores})
+        cache_dir {Optional[str]} -- assembly cache; see romimage (default: {None})
+
+    Yields:
+        Dict -- result of a job; see run_job
+    """
+    jobs = list(jobs)
+    workers = workers or os.cpu_count() or 1
+    # a few chunks per worker; keeps IPC low for thousands of small jobs and balances load
+    size = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, jobs[i:i + size], engine.value, cache_dir)
+                   for i in range(0, len(jobs), size)]
+        for future in as_completed(futures):
+            yield from future.result()
+
+
+def merge(results: Iterable[Dict], engine: Engine, wall_time: float) -> Dict:
+    results = sorted(results, key=lambda r: r['program_file'])
+    return {
+        'engine': engine.value,
+        'jobs': len(results),
+        'errors': sum(1 for r in results if 'error' in r),
+        'cycles': sum(r.get('cycles', 0) for r in results),
+        'wall_time': wall_time,
+        'results': results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run many TD4 programs headless in parallel')
+    parser.add_argument('path', help='directory of *.txt programs or JSON manifest')
+    parser.add_argument('-n', '--max-step', type=int, default=src.CONFIG['max_step'])
+    parser.add_argument('-e', '--engine', choices=tuple(e.value for e in Engine),
+                        default=Engine.FAST.value)
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help='number of processes (default: number of cores)')
+    parser.add_argument('-o', '--output', default='pool_report.json', help='merged report')
+    parser.add_argument('--rom-cache', metavar='DIR', nargs='?', const=romimage.DEFAULT_CACHE_DIR,
+                        help='skip assembly of unchanged programs')
+    args = parser.parse_args(argv)
+
+    engine = Engine(args.engine)
+    start = time.perf_counter()
+    results = []
+    for result in run_pool(load_jobs(args.path, args.max_step), engine, args.workers,
+                           args.rom_cache):
+        status = result.get('error') or f'{result["cycles"]} cycles in {result["elapsed"]:.3f} s'
+        print(f'{result["program_file"]}: {status}')
+        results.append(result)
+    report = merge(results, engine, time.perf_counter() - start)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=4)
+    print(f'{report["jobs"]} jobs, {report["errors"]} errors, {report["cycles"]} cycles '
+          + f'in {report["wall_time"]:.3f} s; report: {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Opt-in instrumentation of the run loop and the units.
+
+    profiler = Profiler()
+    with profiler.instrument():
+        run_TD4(...)
+    print(profiler.report())
+
+Nothing is wrapped outside of instrument(), so a run without profiler costs nothing.
+"""
+from typing import Callable, Dict, Iterator, List
+from contextlib import ExitStack, contextmanager
+import collections
+import functools
+import time
+
+from src import units, utils, cpu, components
+
+TIMED_UNITS = ('HA', 'FA', 'ALU', 'MUX', 'DECODER', 'AR', 'DISPLAY')
+GATE_PRIMITIVES = ('NOT', '_AND', '_OR')
+TIMED_COMPONENTS = (components.Register, components.DFlipFlop)
+
+
+class Stat:
+    """Calls, total time and histogram of a stage; bucket i counts times in [2^(i-1), 2^i) ns"""
+    __slots__ = ('calls', 'total_ns', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.buckets: List[int] = [0] * 64
+
+    def add(self, ns: int):
+        self.calls += 1
+        self.total_ns += ns
+        self.buckets[ns.bit_length()] += 1
+
+    def percentile(self, p: float) -> int:
+        """Return upper bound in ns of the bucket holding the p-th percentile"""
+        rank = p / 100 * self.calls
+        count = 0
+        for i, n in enumerate(self.buckets):
+            count += n
+            if count >= rank and n:
+                return 1 << i
+        return 0
+
+
+@contextmanager
+def _replaced(obj, name: str, value):
+    original = getattr(obj, name)
+    setattr(obj, name, value)
+    try:
+        yield
+    finally:
+        setattr(obj, name, original)
+
+
+class Profiler:
+    def __init__(self):
+        self.stats: Dict[str, Stat] = collections.defaultdict(Stat)
+        self.gate_counts: Dict[str, int] = collections.Counter()
+
+    def timed(self, name: str, fn: Callable) -> Callable:
+        stat = self.stats[name]
+
+        @functools.wraps(fn)
+        def _timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            res = fn(*args, **kwargs)
+            stat.add(time.perf_counter_ns() - start)
+            return res
+        return _timed
+
+    def counted(self, name: str, fn: Callable) -> Callable:
+        counts = self.gate_counts
+
+        @functools.wraps(fn)
+        def _counted(*args):
+            counts[name] += 1
+            return fn(*args)
+        return _counted
+
+    def _timed_build_ROM(self, bit_matrix):
+        return self.timed('ROM', self._build_ROM(bit_matrix))
+
+    @contextmanager
+    def instrument(self) -> Iterator['Profiler']:
+        """Wrap the units, the phases of the components, cpu.TD4.cycle and utils.ba2str.
+        Components bind their phases when a scheduler is made, so only machines built in
+        the context are timed per component.
+        """
+        self._build_ROM = units.build_ROM
+        functions = {name: self.timed(name, getattr(units, name)) for name in TIMED_UNITS}
+        functions.update(
+            {name: self.counted(name, getattr(units, name)) for name in GATE_PRIMITIVES})
+        functions.update(build_ROM=self._timed_build_ROM)
+        with ExitStack() as stack:
+            stack.enter_context(units.substitute(**functions))
+            stack.enter_context(_replaced(cpu.TD4, 'cycle', self.timed('cycle', cpu.TD4.cycle)))
+            for cls in TIMED_COMPONENTS:
+                for phase in ('evaluate', 'commit'):
+                    name = f'{cls.__name__}.{phase}'
+                    stack.enter_context(
+                        _replaced(cls, phase, self.timed(name, getattr(cls, phase))))
+            stack.enter_context(_replaced(utils, 'ba2str', self.timed('ba2str', utils.ba2str)))
+            yield self
+
+    def report(self) -> str:
+        cycles = self.stats['cycle'].calls if 'cycle' in self.stats else 0
+        lines = [f'{"stage":<16} {"calls":>10} {"total ms":>10} {"mean us":>10} '
+                 + f'{"p50 us":>8} {"p99 us":>8}']
+        for name, stat in sorted(self.stats.items(), key=lambda item: -item[1].total_ns):
+            if stat.calls == 0:
+                continue
+            lines.append(f'{name:<16} {stat.calls:>10} {stat.total_ns / 1e6:>10.2f} '
+                         + f'{stat.total_ns / stat.calls / 1e3:>10.2f} '
+                         + f'{stat.percentile(50) / 1e3:>8.2f} {stat.percentile(99) / 1e3:>8.2f}')
+        total_gates = sum(self.gate_counts.values())
+        per_cycle = f', {total_gates / cycles:.1f} per cycle' if cycles else ''
+        lines.append(f'gate evaluations: {total_gates}{per_cycle} ('
+                     + ', '.join(f'{name}: {n}' for name, n in sorted(self.gate_counts.items()))
+                     + ')')
+        return '\n'.join(lines)
@@ -0,0 +1,98 @@
+"""Rate-limited differential register panel.
+
+The renderer is an observer of cpu.Cycle: a call only keeps the cycle, and a frame is
+drawn when 1 / fps has passed since the last one, so the clock is not throttled by the
+terminal. A frame formats the fields of the latest cycle only, and rewrites only the
+cells which changed since the previous frame with ANSI cursor movements.
+"""
+from typing import Callable, Optional, TextIO, Tuple
+import sys
+import time
+
+from src import utils
+
+# (label, formatter of a cpu.Cycle); same notation as units.DISPLAY
+PANEL: Tuple[Tuple[str, Callable], ...] = (
+    ('step', lambda cycle: str(cycle.step)),
+    ('PC', lambda cycle: utils.ba2str(cycle.q_PC[::-1])),
+    ('output', lambda cycle: utils.ba2str(cycle.q_c_out[::-1])),
+    ('REGISTER_A', lambda cycle: utils.ba2str(cycle.q_a[::-1])),
+    ('REGISTER_B', lambda cycle: utils.ba2str(cycle.q_b[::-1])),
+    ('c_flag', lambda cycle: str(int(cycle.c_flag))),
+    ('fetched_op', lambda cycle: utils.ba2str(cycle.op_arr[::-1])),
+    ('decode_res', lambda cycle: utils.ba2str(cycle.decoded_arr)),
+    ('MUX_res', lambda cycle: utils.ba2str(cycle.selected_arr[::-1])),
+    ('carry', lambda cycle: str(int(cycle.c))),
+    ('ALU_res', lambda cycle: utils.ba2str(cycle.sum_arr)),
+)
+
+CLEAR_EOL = '\x1b[K'
+
+
+class Renderer:
+    """Register panel redrawn at most fps times a second
+
+    Keyword Arguments:
+        fps {float} -- frame rate (default: {30.0})
+        fields {Tuple[Tuple[str, Callable], ...]} -- rows of the panel (default: {PANEL})
+        stream {Optional[TextIO]} -- terminal (default: {sys.stdout})
+        ansi {Optional[bool]} -- update cells in place; otherwise only the last frame is
+            printed when closed (default: {whether stream is a tty})
+        now {Callable[[], float]} -- monotonic clock in seconds (default: {time.perf_counter})
+    """
+
+    def __init__(self, fps: float = 30.0, fields: Tuple[Tuple[str, Callable], ...] = PANEL,
+                 stream: Optional[TextIO] = None, ansi: Optional[bool] = None,
+                 now: Callable[[], float] = time.perf_counter):
+        if fps <= 0:
+            raise ValueError('fps must be positive')
+        self.interval = 1 / fps
+        self.fields = fields
+        self.stream = stream or sys.stdout
+        self.ansi = self.stream.isatty() if ansi is None else ansi
+        self.now = now
+        self.width = max(len(label) for label, _ in fields) + 2
+        self.cells: Optional[list] = None  # text of each row on the terminal
+        self.cycle = None
+        self.drawn = True
+        self.next_frame = 0.0
+        self.frames = 0
+
+    def __call__(self, cycle):
+        self.cycle = cycle
+        self.drawn = False
+        if self.ansi and self.now() >= self.next_frame:
+            self.draw()
+
+    def draw(self):
+        """Write cells changed since the last frame"""
+        if self.cycle is None:
+            return
+        values = [fmt(self.cycle) for _, fmt in self.fields]
+        if self.cells is None or not self.ansi:
+            self.stream.write(''.join(f'{label:<{self.width}}{value}\n'
+                                      for (label, _), value in zip(self.fields, values)))
+        else:
+            n_rows = len(self.cells)
+            out = []
+            for row, (old, new) in enumerate(zip(self.cells, values)):
+                if old != new:
+                    up = n_rows - row
+                    out.append(f'\x1b[{up}A\r\x1b[{self.width}C{new}{CLEAR_EOL}\x1b[{up}B\r')
+            self.stream.write(''.join(out))
+        self.stream.flush()
+        self.cells = values
+        self.drawn = True
+        self.frames += 1
+        self.next_frame = self.now() + self.interval
+
+    def close(self):
+        """Draw the last cycle unless it is on the terminal"""
+        if not self.drawn:
+            self.draw()
+
+    def __enter__(self) -> 'Renderer':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
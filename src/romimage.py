@@ -0,0 +1,186 @@
+"""Binary ROM images and assembly cache.
+
+An image is the assembled program in 16 bytes; byte i is address i and its bit j is
+bit j of the instruction (LSB is bit 0 as in the bit matrix).
+
+A container packs many images for memory-mapping:
+
+    header  -- magic b'TD4C', version (u2), reserved (u2), count (u8)
+    keys    -- count x 32 bytes; SHA-256 of each program source
+    images  -- count x 16 bytes
+
+    $ python -m src.romimage build programs/ programs.td4c
+    $ python -m src.romimage list programs.td4c
+"""
+import numpy as np
+from nptyping import Array
+from typing import Dict, Iterable, Optional, Tuple
+import argparse
+import functools
+import hashlib
+import os
+import struct
+
+from src import assembler
+
+IMAGE_SIZE = 16
+KEY_SIZE = 32
+MAGIC = b'TD4C'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQ')
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                 '.td4cache')
+
+
+def pack(bit_matrix: Array[bool, 16, 8]) -> bytes:
+    """Return 16-byte image of an assembled program"""
+    return np.packbits(np.asarray(bit_matrix, dtype=bool), axis=1, bitorder='little').tobytes()
+
+
+def unpack(image: bytes) -> Array[bool, 16, 8]:
+    """Return bit matrix of a 16-byte image"""
+    if len(image) != IMAGE_SIZE:
+        raise ValueError(f'ROM image must be {IMAGE_SIZE} bytes')
+    arr = np.frombuffer(image, dtype=np.uint8).reshape(IMAGE_SIZE, 1)
+    return np.unpackbits(arr, axis=1, bitorder='little').astype(bool)
+
+
+def source_key(program_path: str) -> bytes:
+    """Return SHA-256 of a program source"""
+    with open(program_path, 'rb') as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+@functools.lru_cache(maxsize=None)
+def assembler_key() -> bytes:
+    """Return SHA-256 of VERSION and the assembler source; images of another are not reused"""
+    with open(assembler.__file__, 'rb') as f:
+        return hashlib.sha256(VERSION.to_bytes(2, 'little') + f.read()).digest()
+
+
+def assemble_cached(program_path: str, cache_dir: str = DEFAULT_CACHE_DIR) -> Array[bool, 16, 8]:
+    """Assemble program unless its image is cached by the hash of its content and
+    of the assembler"""
+    key = hashlib.sha256(assembler_key() + source_key(program_path)).digest()
+    cache_path = os.path.join(cache_dir, key.hex() + '.rom')
+    if os.path.exists(cache_path):
+        with open(cache_path, 'rb') as f:
+            return unpack(f.read())
+
+    bit_matrix = assembler.assemble(program_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(pack(bit_matrix))
+    os.replace(tmp_path, cache_path)
+    return bit_matrix
+
+
+def write_container(path: str, entries: Iterable[Tuple[bytes, bytes]]):
+    """Write (key, image) entries into a container"""
+    entries = list(entries)
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, len(entries)))
+        for key, _ in entries:
+            f.write(key)
+        for _, image in entries:
+            f.write(image)
+
+
+def assemble_dir(program_dir: str, container_path: str,
+                 cache_dir: Optional[str] = DEFAULT_CACHE_DIR) -> Dict[str, str]:
+    """Assemble *.txt in a directory into a container
+
+    Returns:
+        Dict[str, str] -- error of each program which could not be assembled
+    """
+    entries = []
+    errors = {}
+    for name in sorted(os.listdir(program_dir)):
+        if not name.endswith('.txt'):
+            continue
+        path = os.path.join(program_dir, name)
+        try:
+            bit_matrix = assemble_cached(path, cache_dir) if cache_dir \
+                else assembler.assemble(path)
+        except ValueError as err:
+            errors[path] = str(err)
+            continue
+        entries.append((source_key(path), pack(bit_matrix)))
+    write_container(container_path, entries)
+    return errors
+
+
+class Container:
+    """Memory-mapped container of images
+
+    Arguments:
+        path {str} -- container file
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            magic, version, _, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'Not a ROM container of version {VERSION}: {path}')
+        if count == 0:
+            self.keys = np.empty((0, KEY_SIZE), dtype=np.uint8)
+            self.images = np.empty((0, IMAGE_SIZE), dtype=np.uint8)
+        else:
+            self.keys = np.memmap(path, dtype=np.uint8, mode='r', offset=HEADER.size,
+                                  shape=(count, KEY_SIZE))
+            self.images = np.memmap(path, dtype=np.uint8, mode='r',
+                                    offset=HEADER.size + count * KEY_SIZE,
+                                    shape=(count, IMAGE_SIZE))
+        self._index = None
+
+    def __len__(self) -> int:
+        return len(self.images)
+
+    def __getitem__(self, i: int) -> bytes:
+        """Return i-th image"""
+        return self.images[i].tobytes()
+
+    def index(self, key: bytes) -> int:
+        """Return position of the image of a source hash"""
+        if self._index is None:
+            self._index = {k.tobytes(): i for i, k in enumerate(self.keys)}
+        try:
+            return self._index[key]
+        except KeyError:
+            raise KeyError(f'No image for key: {key.hex()}')
+
+    def find(self, program_path: str) -> bytes:
+        """Return image of a program source without assembling it"""
+        return self[self.index(source_key(program_path))]
+
+    def matrices(self) -> Array[bool, ..., 16, 8]:
+        """Return ROM stack of every image; see batch.run_batch"""
+        return np.unpackbits(self.images[:, :, None], axis=2, bitorder='little').astype(bool)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TD4 ROM images')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help='assemble a directory into a container')
+    build_parser.add_argument('program_dir')
+    build_parser.add_argument('container')
+    build_parser.add_argument('--no-cache', action='store_true', help='assemble every program')
+    list_parser = subparsers.add_parser('list', help='list images of a container')
+    list_parser.add_argument('container')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        errors = assemble_dir(args.program_dir, args.container,
+                              None if args.no_cache else DEFAULT_CACHE_DIR)
+        for path, err in errors.items():
+            print(f'{path}: {err}')
+        print(f'{len(Container(args.container))} images; {len(errors)} errors')
+    elif args.command == 'list':
+        container = Container(args.container)
+        for i in range(len(container)):
+            print(f'{container.keys[i].tobytes().hex()} {container[i].hex()}')
+
+
+if __name__ == '__main__':
+    main()
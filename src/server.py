@@ -0,0 +1,415 @@
+"""Server of TD4 sessions over TCP or a Unix socket.
+
+Every connection is a session with its own machine, driven by a JSON object per line:
+
+    {"cmd": "load", "program": ["OUT 0111", "ADD A 0001", ...], "in_port": 0}
+    {"cmd": "clock", "hz": 10}  -- or "cycle": NORMAL, HIGH or MANUAL; "hz": null is max speed
+    {"cmd": "next"}, {"cmd": "reset"}  -- one cycle, as DebugMenu.NEXT and RESET
+    {"cmd": "run", "cycles": 100}  -- at the clock, streaming states until done or stop
+    {"cmd": "stop"}  -- ends a run or a continue, as DebugMenu.STOP
+    {"cmd": "back", "steps": 3}, {"cmd": "jump", "step": 40}
+    {"cmd": "break", "spec": "JNC"}, {"cmd": "watch", "spec": "out changed"}
+        -- add one; "-spec" removes one, "" clears them; see debugger
+    {"cmd": "continue", "cycles": 10000}  -- until a breakpoint or watchpoint hits
+    {"cmd": "state"}
+
+Each request is answered by {"ok": true, "step": ..., "state": {...}} with the result of
+the command, or {"ok": false, "error": ...}, with the "id" of the request if given.
+While a run goes, {"event": "state", "step": ..., "state": {...}, "outputs": [...]} is
+sent at every tick of the clock, at most FPS times a second. RUN, BACK, JUMP and
+CONTINUE go on in the background until answered, and STOP ends them.
+
+Machines are fastcore.FastTD4 skipping busy-wait loops. Work of more than INLINE_CYCLES
+cycles runs in an executor, so one loop multiplexes hundreds of sessions; a session
+runs one job at a time. BACK and JUMP replay from power on with the recorded resets,
+which is exact as the input port of a session is constant.
+
+    $ python -m src.server --port 4004
+    $ python -m src.server --unix /tmp/td4.sock
+"""
+from concurrent.futures import Executor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import argparse
+import asyncio
+import json
+
+from src import ClockCycle, State, assembler, fastcore, debugger
+
+INLINE_CYCLES = 256  # cycles run on the loop; more go to the executor
+RUN_SLICE = 1 << 16  # cycles per job at most, so that stop takes effect between jobs
+LINE_LIMIT = 1 << 16  # bytes of a request at most
+FPS = 30.0  # states streamed per second at most
+MAX_SESSIONS = 1024
+
+COMMANDS = ('load', 'clock', 'next', 'reset', 'run', 'stop', 'back', 'jump', 'break', 'watch',
+            'continue', 'state')
+BACKGROUND = ('run', 'back', 'jump', 'continue')  # answered by a task, which stop cancels
+
+
+_REQUIRED = object()
+_KINDS = {int: 'an integer', float: 'a number', str: 'a string', list: 'a list'}
+
+
+def field(request: Dict, name: str, kind: type, default=_REQUIRED, nullable: bool = False):
+    """Return a field of request checked to be of kind; a bool is not a number
+
+    Arguments:
+        request {Dict} -- decoded request
+        name {str} -- name of the field
+        kind {type} -- int, float (an int is as well), str or list
+
+    Keyword Arguments:
+        default {object} -- value of a missing field; required when not given
+        nullable {bool} -- accept null (default: {False})
+
+    Raises:
+        KeyError: raised when a required field is missing
+        TypeError: raised when the field is not of kind
+    """
+    if name not in request:
+        if default is _REQUIRED:
+            raise KeyError(name)
+        return default
+    value = request[name]
+    if value is None and nullable:
+        return value
+    kinds = (int, float) if kind is float else (kind, )
+    if isinstance(value, bool) or not isinstance(value, kinds):
+        raise TypeError(f'{name} must be {_KINDS[kind]}' + (' or null' if nullable else ''))
+    return value
+
+
+class Session:
+    """A machine and its clock, breakpoints and history
+
+    Keyword Arguments:
+        executor {Optional[Executor]} -- runs long jobs (default: {None; default executor})
+    """
+
+    def __init__(self, executor: Optional[Executor] = None):
+        self.executor = executor
+        self.rom: Tuple[int, ...] = (0, ) * 16
+        self.in_port = 0
+        self.hz: Optional[float] = None
+        self.manual = False
+        self.td4 = fastcore.FastTD4(self.rom, skip_loops=True)
+        self.resets: List[int] = []  # steps of cycles with reset_ low, to replay
+        self.previous: Optional[State] = None
+        self.breakpoints: Dict[str, debugger.Condition] = {}
+        self.watchpoints: Dict[str, debugger.Condition] = {}
+        self.task: Optional[asyncio.Task] = None  # command of BACKGROUND in progress
+        self.lock = asyncio.Lock()
+
+    def reply(self, **fields) -> Dict:
+        return dict(ok=True, step=self.td4.step, state=self.td4.state._asdict(), **fields)
+
+    async def execute(self, cycles: int, fn: Callable, *args):
+        """Call fn(*args) doing about cycles cycles; in the executor when they are many"""
+        async with self.lock:
+            if cycles <= INLINE_CYCLES:
+                return fn(*args)
+            future = asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                await future  # the machine is in use until the job ends
+                raise
+
+    # jobs on the machine; see execute
+
+    def _diverge(self):
+        """Forget the resets after the step, which is executed anew"""
+        if self.resets and self.resets[-1] >= self.td4.step:
+            self.resets = [s for s in self.resets if s < self.td4.step]
+
+    def _cycle(self, reset_: bool = True):
+        self._diverge()
+        self.previous = self.td4.state
+        if not reset_:
+            self.resets.append(self.td4.step)
+        self.td4.cycle(reset_, self.in_port)
+
+    def _run(self, cycles: int) -> List[Tuple[int, int]]:
+        self._diverge()
+        outputs: List[Tuple[int, int]] = []
+        self.td4.run(cycles, outputs, self.in_port)
+        self.previous = None
+        return outputs
+
+    def _run_to(self, step: int):
+        """Run up to step with the resets recorded on the way, as BACK and JUMP"""
+        if step <= self.td4.step:
+            return
+        for reset in [s for s in self.resets if self.td4.step <= s < step - 1]:
+            self.td4.run(reset - self.td4.step, in_port=self.in_port)
+            self.td4.cycle(False, self.in_port)
+        self.td4.run(step - 1 - self.td4.step, in_port=self.in_port)
+        self.previous = self.td4.state
+        self.td4.cycle(step - 1 not in self.resets, self.in_port)
+
+    def _replay(self, step: int):
+        self.td4 = fastcore.FastTD4(self.rom, skip_loops=True)
+        self.previous = None
+        self._run_to(step)
+
+    def _continue(self, cycles: int) -> List[str]:
+        rom = self.rom
+        for _ in range(cycles):
+            previous, state = self.previous, self.td4.state
+            self._cycle()
+            hits = [f'breakpoint {spec}' for spec, condition in self.breakpoints.items()
+                    if condition(state, previous, rom[state.pc])]
+            hits += [f'watchpoint {spec}' for spec, condition in self.watchpoints.items()
+                     if condition(state, previous, rom[state.pc])]
+            if hits:
+                return hits
+        return []
+
+    # commands
+
+    async def load(self, program: Union[str, List[str]], in_port: int = 0) -> Dict:
+        lines = program.splitlines() if isinstance(program, str) else program
+        if not all(isinstance(line, str) for line in lines):
+            raise TypeError('program must be a string or a list of strings')
+        if isinstance(in_port, bool) or not isinstance(in_port, int) or not 0 <= in_port < 16:
+            raise ValueError(f'in_port must be 0 to 15, not {in_port}')
+        async with self.lock:
+            self.rom = fastcore.rom_from_matrix(assembler.assemble_lines(lines))
+            self.in_port = in_port
+            self.resets = []
+            self._replay(0)
+            self.previous = None
+        return self.reply()
+
+    async def clock(self, hz: Optional[float] = None, cycle: Optional[str] = None) -> Dict:
+        if cycle is not None:
+            cc = ClockCycle[cycle.upper()]
+            self.manual, self.hz = cc is ClockCycle.MANUAL, float(cc.value) or None
+        else:
+            if hz is not None and hz <= 0:
+                raise ValueError('hz must be positive, or null for max speed')
+            self.manual, self.hz = False, hz
+        return self.reply(hz=self.hz, manual=self.manual)
+
+    async def step(self, reset_: bool = True) -> Dict:
+        await self.execute(1, self._cycle, reset_)
+        return self.reply()
+
+    async def run(self, cycles: int, send: Callable[[Dict], None]) -> Dict:
+        """Run cycles at the clock, sending a state at each tick"""
+        if self.manual:
+            raise ValueError('MANUAL clock runs by next; pick a clock rate to run')
+        loop = asyncio.get_running_loop()
+        start, done, last_sent = loop.time(), 0, 0.0
+        outputs: List[Tuple[int, int]] = []
+        while done < cycles:
+            if self.hz is None:
+                n = min(cycles - done, RUN_SLICE)
+            else:
+                n = min(cycles, int((loop.time() - start) * self.hz) + 1, done + RUN_SLICE) - done
+            if n > 0:
+                outputs += await self.execute(n, self._run, n)
+                done += n
+                if done < cycles and loop.time() - last_sent >= 1 / FPS:
+                    send(dict(event='state', step=self.td4.step,
+                              state=self.td4.state._asdict(), outputs=outputs))
+                    last_sent, outputs = loop.time(), []
+            if self.hz is not None and done < cycles:
+                # wait for the next tick; fast clocks are run in batches at FPS
+                tick = start + done / self.hz - loop.time()
+                await asyncio.sleep(max(tick, 1 / FPS if self.hz > FPS else 0.0))
+            else:
+                await asyncio.sleep(0)
+        return self.reply(outputs=outputs)
+
+    async def restore(self, step: int) -> Dict:
+        if step < 0:
+            raise ValueError('step must be 0 or more')
+        if step < self.td4.step:
+            await self.execute(0, self._replay, 0)
+        while self.td4.step < step:
+            target = min(step, self.td4.step + RUN_SLICE)
+            await self.execute(target - self.td4.step, self._run_to, target)
+        return self.reply()
+
+    async def set_point(self, points: Dict[str, debugger.Condition],
+                        parse: Callable[[str], debugger.Condition], spec: str) -> Dict:
+        if not isinstance(spec, str):
+            raise TypeError('spec must be a string')
+        spec = spec.strip()
+        if not spec:
+            points.clear()
+        elif spec.startswith('-'):
+            points.pop(spec[1:].strip(), None)
+        else:
+            points[spec] = parse(spec)
+        return self.reply(breakpoints=list(self.breakpoints), watchpoints=list(self.watchpoints))
+
+    async def continue_(self, cycles: int) -> Dict:
+        hits = []
+        for done in range(0, cycles, RUN_SLICE):
+            hits = await self.execute(RUN_SLICE, self._continue, min(RUN_SLICE, cycles - done))
+            if hits:
+                break
+        return self.reply(hits=hits)
+
+
+class Server:
+    """Host of sessions; one per connection
+
+    Keyword Arguments:
+        executor {Optional[Executor]} -- runs long jobs of every session
+            (default: {None; default executor})
+        max_sessions {int} -- connections over it are refused (default: {MAX_SESSIONS})
+    """
+
+    def __init__(self, executor: Optional[Executor] = None, max_sessions: int = MAX_SESSIONS):
+        self.executor = executor
+        self.max_sessions = max_sessions
+        self.sessions: List[Session] = []
+
+    async def start(self, host: str = '127.0.0.1', port: int = 4004,
+                    path: Optional[str] = None) -> asyncio.AbstractServer:
+        """Start listening on host:port, or a Unix socket at path"""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path, limit=LINE_LIMIT)
+        return await asyncio.start_server(self.handle, host, port, limit=LINE_LIMIT)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        def send(message: Dict):
+            writer.write(json.dumps(message).encode() + b'\n')
+
+        if len(self.sessions) >= self.max_sessions:
+            send(dict(ok=False, error=f'Too many sessions; {self.max_sessions} at most'))
+            await writer.drain()
+            writer.close()
+            return
+        session = Session(self.executor)
+        self.sessions.append(session)
+        try:
+            while True:
+                try:
+                    line = await reader.readuntil(b'\n')
+                except asyncio.LimitOverrunError:
+                    await self._discard_line(reader)
+                    send(dict(ok=False, error=f'A request must be {LINE_LIMIT} bytes at most'))
+                    line = b''
+                if line.strip():
+                    await self.dispatch(session, line, send)
+                await writer.drain()
+        except asyncio.IncompleteReadError as err:
+            if err.partial.strip():
+                await self.dispatch(session, err.partial, send)
+        except ConnectionError:
+            pass
+        finally:
+            if session.task is not None:
+                session.task.cancel()
+            self.sessions.remove(session)
+            writer.close()
+
+    @staticmethod
+    async def _discard_line(reader: asyncio.StreamReader):
+        """Drop a line over the limit, to its end"""
+        while True:
+            try:
+                await reader.readuntil(b'\n')
+                return
+            except asyncio.LimitOverrunError as err:
+                await reader.readexactly(err.consumed)
+
+    async def dispatch(self, session: Session, line: bytes, send: Callable[[Dict], None]):
+        """Answer a request, or start answering a command of BACKGROUND in a task"""
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('A request must be a JSON object')
+            request_id = request.pop('id', None)
+            command = request.pop('cmd', None)
+            if command not in COMMANDS:
+                raise ValueError(f'No such a command: {command}; use one of {COMMANDS}')
+            busy = session.task is not None and not session.task.done()
+            if command == 'stop':
+                if busy:
+                    session.task.cancel()
+                    await asyncio.wait((session.task, ))
+                response = session.reply(stopped=busy)
+            elif command == 'state':
+                response = session.reply(running=busy)
+            elif busy:
+                raise ValueError(f'{command} while running; stop first')
+            elif command in BACKGROUND:
+                job = self.command(session, command, request, send)
+                session.task = asyncio.ensure_future(self._answer(job, request_id, send))
+                return
+            else:
+                response = await self.command(session, command, request, send)
+        except Exception as err:  # a bad request must not end the session
+            response = dict(ok=False, error=f'{type(err).__name__}: {err}')
+        if request_id is not None:
+            response['id'] = request_id
+        send(response)
+
+    async def command(self, session: Session, command: str, request: Dict,
+                      send: Callable[[Dict], None]) -> Dict:
+        if command == 'load':
+            program = request.get('program')
+            if not isinstance(program, str):
+                program = field(request, 'program', list)
+            return await session.load(program, field(request, 'in_port', int, 0))
+        if command == 'clock':
+            return await session.clock(field(request, 'hz', float, None, nullable=True),
+                                       field(request, 'cycle', str, None, nullable=True))
+        if command in ('next', 'reset'):
+            return await session.step(reset_=command == 'next')
+        if command == 'run':
+            return await session.run(field(request, 'cycles', int), send)
+        if command == 'continue':
+            return await session.continue_(field(request, 'cycles', int))
+        if command == 'back':
+            return await session.restore(max(session.td4.step - field(request, 'steps', int), 0))
+        if command == 'jump':
+            return await session.restore(field(request, 'step', int))
+        if command == 'break':
+            return await session.set_point(session.breakpoints, debugger.parse_breakpoint,
+                                           field(request, 'spec', str, ''))
+        if command == 'watch':
+            return await session.set_point(session.watchpoints, debugger.parse_watchpoint,
+                                           field(request, 'spec', str, ''))
+        raise ValueError(f'Undefined command: {command}')
+
+    async def _answer(self, job, request_id, send: Callable[[Dict], None]):
+        try:
+            response = await job
+        except Exception as err:  # a bad request must not end the session
+            response = dict(ok=False, error=f'{type(err).__name__}: {err}')
+        if request_id is not None:
+            response['id'] = request_id
+        send(response)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve TD4 sessions')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=4004)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead')
+    parser.add_argument('--max-sessions', type=int, default=MAX_SESSIONS)
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = await Server(max_sessions=args.max_sessions).start(
+            args.host, args.port, args.unix)
+        print('Serving TD4 sessions on '
+              + (args.unix or f'{args.host}:{args.port}'), flush=True)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Ring buffer of machine snapshots for time-travel debugging.
+
+A snapshot is the state packed in 17 bits (pc | a << 4 | b << 8 | out << 12 | carry << 16)
+and takes 4 bytes. Every interval-th step is stored as a keyframe, the steps in between
+as XOR with the previous step, so restoring any kept step applies at most interval - 1
+deltas regardless of how long the machine has run. The oldest steps are dropped a whole
+keyframe group at a time when the buffer is full.
+"""
+from array import array
+
+from src import State
+
+
+def pack(state: State) -> int:
+    pc, a, b, out, carry = state
+    return pc | a << 4 | b << 8 | out << 12 | carry << 16
+
+
+def unpack(packed: int) -> State:
+    return State(packed & 0b1111, packed >> 4 & 0b1111, packed >> 8 & 0b1111,
+                 packed >> 12 & 0b1111, packed >> 16 & 1)
+
+
+class SnapshotRing:
+    """Snapshots of the last capacity steps at most
+
+    Keyword Arguments:
+        capacity {int} -- steps kept; rounded up to a multiple of interval (default: {65536})
+        interval {int} -- steps from a keyframe to the next (default: {64})
+    """
+
+    def __init__(self, capacity: int = 1 << 16, interval: int = 64):
+        if capacity <= 0 or interval <= 0:
+            raise ValueError('capacity and interval must be positive')
+        self.interval = interval
+        self.capacity = -(-capacity // interval) * interval
+        self._data = array('I', bytes(4)) * self.capacity
+        self.first = 0  # oldest kept step; always a keyframe
+        self.last = -1  # latest kept step
+        self._prev = 0  # packed state of last
+
+    def __len__(self) -> int:
+        return self.last - self.first + 1
+
+    def __contains__(self, step: int) -> bool:
+        return self.first <= step <= self.last
+
+    def _is_keyframe(self, step: int) -> bool:
+        return step % self.interval == 0 or step == self.first
+
+    def record(self, step: int, state: State):
+        """Keep state of step
+
+        Steps are expected one by one. Recording a kept step drops the steps after it,
+        as happens after going back; a step out of sequence starts the buffer over.
+        """
+        if step in self and step > self.first:
+            self.last = step - 1
+            self._prev = pack(self.state_at(self.last))
+        elif step != self.last + 1 or len(self) == 0:
+            self.first, self.last = step, step - 1
+        packed = pack(state)
+        evicted = step - self.capacity
+        if evicted >= self.first:
+            # the group of the overwritten keyframe is no longer restorable
+            self.first = evicted - evicted % self.interval + self.interval
+        self._data[step % self.capacity] = packed if self._is_keyframe(step) \
+            else packed ^ self._prev
+        self.last, self._prev = step, packed
+
+    def state_at(self, step: int) -> State:
+        """Return state of a kept step"""
+        if step not in self:
+            raise ValueError(f'Step {step} is not kept; kept steps are {self.first} to {self.last}')
+        keyframe = max(self.first, step - step % self.interval)
+        packed = self._data[keyframe % self.capacity]
+        for s in range(keyframe + 1, step + 1):
+            packed ^= self._data[s % self.capacity]
+        return unpack(packed)
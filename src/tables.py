@@ -0,0 +1,101 @@
+"""Truth-table backend of the units.
+
+Each table is generated once from the gate-level definitions in units,
+so units stays the reference and this module only answers by an index.
+Functions have the same signatures as their counterparts in units and can be
+passed to cpu.TD4 as backend.
+"""
+import numpy as np
+from nptyping import Array
+from typing import Callable
+
+from src import units, utils
+
+_pack = utils.ba2int_lsb
+
+
+def _read_only(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+def _gen_ALU_TABLE() -> Array[bool, 512, 5]:
+    # index: cin | arr_a << 1 | arr_b << 5
+    rows = []
+    for i in range(512):
+        bits = utils.int2ba(i, 9)[::-1]
+        rows.append(units.ALU(bits[0], bits[1:5], bits[5:]))
+    return _read_only(np.array(rows))
+
+
+def _gen_MUX_TABLE() -> Array[bool, 262144, 4]:
+    # a lane selects 1 bit; index: a | b << 1 | c0 << 2 | c1 << 3 | c2 << 4 | c3 << 5
+    lane = np.array(tuple(units._MUX(*utils.int2bat(i, 6)[::-1]) for i in range(64)))
+    # index: a | b << 1 | ca << 2 | cb << 6 | cc << 10 | cd << 14
+    idx = np.arange(1 << 18)
+    sel = idx & 0b11
+    cols = []
+    for i in range(4):
+        lane_idx = sel.copy()
+        for j in range(4):
+            lane_idx |= ((idx >> (2 + 4 * j + i)) & 1) << (2 + j)
+        cols.append(lane[lane_idx])
+    return _read_only(np.stack(cols, axis=1))
+
+
+def _gen_DECODER_TABLE() -> Array[bool, 32, 6]:
+    # index: op_arr | c_flag_ << 4
+    rows = []
+    for i in range(32):
+        bits = utils.int2ba(i, 5)[::-1]
+        rows.append(units.DECODER(bits[:4], bool(bits[4])))
+    return _read_only(np.array(rows))
+
+
+def _gen_AR_TABLE() -> Array[bool, 64, 16]:
+    # index: address | g1_ << 4 | g2_ << 5
+    rows = []
+    for i in range(64):
+        bits = utils.int2ba(i, 6)[::-1]
+        rows.append(units.AR(bits[:4], bool(bits[4]), bool(bits[5])))
+    return _read_only(np.array(rows))
+
+
+ALU_TABLE = _gen_ALU_TABLE()
+MUX_TABLE = _gen_MUX_TABLE()
+DECODER_TABLE = _gen_DECODER_TABLE()
+AR_TABLE = _gen_AR_TABLE()
+
+
+def ALU(cin: bool, arr_a: Array[bool, 1, 4], arr_b: Array[bool, 1, 4]) \
+        -> Array[bool, 1, 5]:
+    """ALU by table; see units.ALU"""
+    if arr_a is None or arr_b is None or len(arr_a) != 4 or len(arr_b) != 4:
+        raise ValueError('Length of each input operands must be 4')
+    return ALU_TABLE[int(bool(cin)) | _pack(arr_a) << 1 | _pack(arr_b) << 5]
+
+
+def MUX(a: bool, b: bool,
+        ca: Array[bool, 1, 4], cb: Array[bool, 1, 4], cc: Array[bool, 1, 4], cd: Array[bool, 1, 4])\
+        -> Array[bool, 1, 4]:
+    """4-input Multiplexer by table; see units.MUX"""
+    return MUX_TABLE[int(bool(a)) | int(bool(b)) << 1
+                     | _pack(ca) << 2 | _pack(cb) << 6 | _pack(cc) << 10 | _pack(cd) << 14]
+
+
+def DECODER(op_arr: Array[bool, 1, 4], c_flag_: bool) -> Array[bool, 1, 6]:
+    """Instruction Decoder by table; see units.DECODER"""
+    return DECODER_TABLE[_pack(op_arr) | int(bool(c_flag_)) << 4]
+
+
+def AR(address: Array[bool, 1, 4], g1_: bool, g2_: bool) -> Array[bool, 1, 16]:
+    """Address Resolver by table; see units.AR"""
+    return AR_TABLE[_pack(address) | int(bool(g1_)) << 4 | int(bool(g2_)) << 5]
+
+
+def build_ROM(bit_matrix: Array[bool, 16, 8]) -> Callable[[Array[bool, 1, 4]], Array[bool, 1, 8]]:
+    """Build and return ROM addressed through the AR table; see units.build_ROM"""
+    def _ROM(address: Array[bool, 1, 4]) -> Array[bool, 1, 8]:
+        return bit_matrix[AR(address, False, False)][0]
+
+    return _ROM
@@ -0,0 +1,189 @@
+"""Compact binary execution trace.
+
+A trace file is a 16-byte header followed by one 5-byte record per cycle:
+
+    pc_a    -- PC << 4 | REGISTER_A
+    b_out   -- REGISTER_B << 4 | output
+    op      -- fetched op (8 bits)
+    flags   -- c_flag | decode_res << 1 (select_a is bit 1, ..., load3_ is bit 6) | carry << 7
+    mux_alu -- MUX_res << 4 | ALU_res
+
+TraceWriter appends records in large chunks, TraceReader memory-maps the file and
+decodes only the slices asked for.
+
+    $ python -m src.trace replay trace.bin [--start N] [--stop M] [--auto]
+"""
+import numpy as np
+from nptyping import Array
+from typing import Dict, Iterator, Optional
+import argparse
+import struct
+
+from src import ClockCycle, units, utils, cpu
+
+MAGIC = b'TD4T'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQ')  # magic, version, record size, step of the 1st record
+RECORD = np.dtype([('pc_a', 'u1'), ('b_out', 'u1'), ('op', 'u1'), ('flags', 'u1'),
+                   ('mux_alu', 'u1')])
+COLUMNS = ('pc', 'a', 'b', 'out', 'c_flag', 'op', 'decoded', 'mux', 'carry', 'alu')
+
+_pack = utils.ba2int_lsb
+
+
+class TraceWriter:
+    """Append cycles to a trace file
+
+    Arguments:
+        path {str} -- trace file; overwritten
+
+    Keyword Arguments:
+        start_step {int} -- step of the 1st record (default: {0})
+        chunk {int} -- records buffered before a write (default: {65536})
+    """
+
+    def __init__(self, path: str, start_step: int = 0, chunk: int = 1 << 16):
+        self._f = open(path, 'wb')
+        self._f.write(HEADER.pack(MAGIC, VERSION, RECORD.itemsize, start_step))
+        self._buffer = np.empty(chunk, dtype=RECORD)
+        self._n = 0
+
+    def append(self, pc: int, a: int, b: int, out: int, c_flag: int, op: int,
+               decoded: int, mux: int, carry: int, alu: int):
+        self._buffer[self._n] = (pc << 4 | a, b << 4 | out, op,
+                                 c_flag | decoded << 1 | carry << 7, mux << 4 | alu)
+        self._n += 1
+        if self._n == len(self._buffer):
+            self.flush()
+
+    def __call__(self, cycle: cpu.Cycle):
+        """Record a cycle of cpu.TD4; usable as an observer of headless.run_gate"""
+        self.append(utils.ba2int(cycle.q_PC[::-1]), utils.ba2int(cycle.q_a[::-1]),
+                    utils.ba2int(cycle.q_b[::-1]), utils.ba2int(cycle.q_c_out[::-1]),
+                    int(cycle.c_flag), _pack(cycle.op_arr), _pack(cycle.decoded_arr),
+                    _pack(cycle.selected_arr), int(cycle.c), _pack(cycle.sum_arr))
+
+    def flush(self):
+        self._f.write(self._buffer[:self._n].tobytes())
+        self._f.flush()
+        self._n = 0
+
+    def close(self):
+        if not self._f.closed:
+            self.flush()
+            self._f.close()
+
+    def __enter__(self) -> 'TraceWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class _Column:
+    """Column decoded on slicing"""
+
+    def __init__(self, records: np.memmap, name: str):
+        self._records = records
+        self._name = name
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __getitem__(self, key) -> Array:
+        return decode(self._records[key], self._name)
+
+
+def decode(records: Array, name: str) -> Array:
+    """Decode a column out of records"""
+    if name == 'pc':
+        return records['pc_a'] >> 4
+    elif name == 'a':
+        return records['pc_a'] & 0b1111
+    elif name == 'b':
+        return records['b_out'] >> 4
+    elif name == 'out':
+        return records['b_out'] & 0b1111
+    elif name == 'c_flag':
+        return records['flags'] & 1
+    elif name == 'op':
+        return records['op']
+    elif name == 'decoded':
+        return records['flags'] >> 1 & 0b111111
+    elif name == 'mux':
+        return records['mux_alu'] >> 4
+    elif name == 'carry':
+        return records['flags'] >> 7
+    elif name == 'alu':
+        return records['mux_alu'] & 0b1111
+    raise ValueError(f'No such a column: {name}')
+
+
+class TraceReader:
+    """Memory-mapped trace file; columns are sliced like reader.pc[1000:2000]
+
+    Arguments:
+        path {str} -- trace file
+    """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            magic, version, record_size, self.start_step = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION or record_size != RECORD.itemsize:
+            raise ValueError(f'Not a trace file of version {VERSION}: {path}')
+        try:
+            self.records = np.memmap(path, dtype=RECORD, mode='r', offset=HEADER.size)
+        except ValueError:  # mmap of empty file
+            self.records = np.empty(0, dtype=RECORD)
+        for name in COLUMNS:
+            setattr(self, name, _Column(self.records, name))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def window(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, Array]:
+        """Return every column of records[start:stop]"""
+        records = self.records[start:stop]
+        return {name: decode(records, name) for name in COLUMNS}
+
+    def find(self, name: str, value: int, start: int = 0, chunk: int = 1 << 20) -> Iterator[int]:
+        """Yield steps whose column equals value, scanning chunk records at a time"""
+        for i in range(start, len(self.records), chunk):
+            for j in np.flatnonzero(decode(self.records[i:i + chunk], name) == value):
+                yield self.start_step + i + int(j)
+
+
+def replay(path: str, start: int = 0, stop: Optional[int] = None,
+           cc: ClockCycle = ClockCycle.MANUAL):
+    """Re-render records[start:stop] through units.DISPLAY"""
+    reader = TraceReader(path)
+    columns = reader.window(start, stop)
+    for i in range(len(columns['pc'])):
+        c = {name: int(column[i]) for name, column in columns.items()}
+        units.DISPLAY(cc,
+                      step=reader.start_step + start + i, PC=utils.int2bastr(c['pc'], 4),
+                      output=utils.int2bastr(c['out'], 4),
+                      REGISTER_A=utils.int2bastr(c['a'], 4), REGISTER_B=utils.int2bastr(c['b'], 4),
+                      c_flag=c['c_flag'], fetched_op=utils.int2bastr(c['op'], 8),
+                      decode_res=utils.int2bastr(c['decoded'], 6)[::-1],
+                      MUX_res=utils.int2bastr(c['mux'], 4),
+                      carry=c['carry'], ALU_res=utils.int2bastr(c['alu'], 4)[::-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TD4 trace tools')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    replay_parser = subparsers.add_parser('replay', help='re-render a window of a trace')
+    replay_parser.add_argument('path')
+    replay_parser.add_argument('--start', type=int, default=0, help='1st record to render')
+    replay_parser.add_argument('--stop', type=int, default=None, help='record to stop before')
+    replay_parser.add_argument('--auto', action='store_true',
+                               help='render in the one-line format of auto clock modes')
+    args = parser.parse_args(argv)
+    if args.command == 'replay':
+        replay(args.path, args.start, args.stop,
+               ClockCycle.HIGH if args.auto else ClockCycle.MANUAL)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from tqdm import trange
+from typing import Iterable
 import time
 import re
 
@@ -6,6 +6,7 @@ from src import ClockCycle, FrontMenu, DebugMenu
 
 
 def dummy_progress():
+    from tqdm import trange  # only the splash needs it
     for i in trange(100):
         time.sleep(0.02)
 
@@ -49,8 +50,8 @@ def run_menu() -> ClockCycle:
     return clock_cycles[selected][1]
 
 
-def debug_menu() -> DebugMenu:
-    debug_menus = tuple(DebugMenu.__members__.items())
+def debug_menu(menus: Iterable[DebugMenu] = tuple(DebugMenu)) -> DebugMenu:
+    debug_menus = tuple((menu.name, menu) for menu in menus)
 
     debug_menu_str = ''
     for i, menu in enumerate(debug_menus):
@@ -70,3 +71,17 @@ def debug_menu() -> DebugMenu:
             return debug_menus[selected][1]
         else:
             print(f'Input number from 0 to {max_debug_menu_num}')
+
+
+def int_io(prompt: str, minimum: int = 0) -> int:
+    while True:
+        print(prompt, end=' ')
+        input_str = input().strip()
+        if input_str.isdigit() and int(input_str) >= minimum:
+            return int(input_str)
+        print(f'Input number >= {minimum}')
+
+
+def line_io(prompt: str) -> str:
+    print(prompt, end=' ')
+    return input().strip()
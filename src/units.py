@@ -1,10 +1,29 @@
 import numpy as np
 from nptyping import Array
-from typing import Callable, Tuple
+from typing import Callable, Optional, Tuple, Union
+from contextlib import contextmanager
 import functools
-import time
 
-from src import ClockCycle, DebugMenu, utils, decorators, ui
+from src import ClockCycle, DebugMenu, utils, decorators, ui, clock
+
+
+@contextmanager
+def substitute(**functions: Callable):
+    """Replace functions of this module while in the context. As every gate is built from
+    NOT, _AND and _OR, substituting them changes how all units are evaluated.
+
+    e.g, with substitute(NOT=my_not): ...
+    """
+    module = globals()
+    missing = set(functions) - set(module)
+    if missing:
+        raise ValueError(f'No such functions in units: {sorted(missing)}')
+    originals = {name: module[name] for name in functions}
+    module.update(functions)
+    try:
+        yield
+    finally:
+        module.update(originals)
 
 
 def NOT(x: bool) -> bool:
@@ -153,7 +172,8 @@ def DECODER(op_arr: Array[bool, 1, 4], c_flag_: bool) -> Array[bool, 1, 6]:
 
 
 def build_D_FF() -> Callable[[], bool]:
-    """Return D-FF
+    """Return D-FF as a coroutine; kept only as the reference of components.DFlipFlop,
+    which the emulator uses instead
 
     Returns:
         Callable[[], bool] -- D-FF
@@ -171,7 +191,8 @@ def build_D_FF() -> Callable[[], bool]:
 
 
 def build_REGISTER(ent: bool, enp: bool) -> Callable[[], Array[bool, 1, 4]]:
-    """Build and return register; 74HC161 as COUNTER or REGISTER
+    """Build and return register; 74HC161 as COUNTER or REGISTER.
+    Kept only as the reference of components.Register, which the emulator uses instead
 
     Arguments:
         ent {bool} -- flag to decide which of COUNTER or REGISTER
@@ -246,39 +267,47 @@ def AR(address: Array[bool, 1, 4], g1_: bool, g2_: bool) -> Array[bool, 1, 16]:
     return np.array([NOT(NAND(g, i, j)) for i in (t4, t5, t6, t7) for j in (t0, t1, t2, t3)])
 
 
-def build_ROM(bit_matrix: Array[bool, 16, 8]) -> Callable[[Array[bool, 1, 4]], Array[bool, 1, 8]]:
+def build_ROM(bit_matrix: Union[Array[bool, 16, 8], bytes]) \
+        -> Callable[[Array[bool, 1, 4]], Array[bool, 1, 8]]:
     """Build and return ROM
 
     Arguments:
-        bit_matrix {Array[bool, 16, 8]} -- memory
+        bit_matrix {Union[Array[bool, 16, 8], bytes]} -- memory, or its 16-byte image
+            (see romimage)
 
     Returns:
         Callable[[Array[bool, 1, 4]], Array[bool, 1, 8]] -- ROM
     """
+    if isinstance(bit_matrix, (bytes, bytearray, memoryview)):
+        from src import romimage
+        bit_matrix = romimage.unpack(bytes(bit_matrix))
+
     def _ROM(address: Array[bool, 1, 4]) -> Array[bool, 1, 8]:
         return bit_matrix[AR(address, False, False)][0]
 
     return _ROM
 
 
-def build_CLOCK_GENERATOR(cc: ClockCycle) -> Callable[[], Tuple[bool, bool]]:
+def build_CLOCK_GENERATOR(cc: ClockCycle, hz: Optional[float] = None,
+                          stats: Optional[clock.ClockStats] = None) -> Callable[[], Tuple[bool, bool]]:
     """Build and return Clock Generator
 
     Arguments:
         cc {ClockCycle} -- Clock Cycle defined in Enum: ClockCycle
 
+    Keyword Arguments:
+        hz {Optional[float]} -- frequency of NORMAL or HIGH instead of cc.value (default: {None})
+        stats {Optional[clock.ClockStats]} -- collects jitter of ticks (default: {None})
+
     Returns:
         Callable[[], Tuple[bool, bool]] -- CLOCK_GENERATOR
     """
     def _AUTO_CLOCK_GENERATOR():
-        while True:
-            time.sleep(1 / cc.value)
-            ck, reset_ = True, True
-            yield ck, reset_
+        return clock.build_SCHEDULED_CLOCK(hz or cc.value, stats=stats)
 
     def _MANUAL_CLOCK_GENERATOR():
         while True:
-            dm = ui.debug_menu()
+            dm = ui.debug_menu((DebugMenu.NEXT, DebugMenu.RESET, DebugMenu.STOP))
             if dm is DebugMenu.NEXT:
                 ck, reset_ = True, True
             elif dm is DebugMenu.RESET:
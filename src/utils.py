@@ -1,11 +1,38 @@
 from numpy.testing import assert_array_equal
 import numpy as np
-from typing import Tuple
+from typing import Iterable, Tuple
 from nptyping import Array
 import unittest
 import itertools
 
 
+class BitVector(tuple):
+    """Immutable and hashable bit array, e.g. a key of a cache.
+
+    Indexing, slicing and iteration behave as Array[bool, 1, ...], np.array(bv) returns
+    the array, and the helpers taking bit arrays (ba2int, ba2str, ...) take it as well.
+    """
+    __slots__ = ()
+
+    def __new__(cls, bits: Iterable[bool] = ()):
+        if isinstance(bits, np.ndarray) and bits.dtype == np.bool_:
+            return super().__new__(cls, bits.tolist())
+        return super().__new__(cls, (bool(b) for b in bits))
+
+    def __getitem__(self, index):
+        item = super().__getitem__(index)
+        return tuple.__new__(BitVector, item) if isinstance(index, slice) else item
+
+    def __add__(self, other: Iterable[bool]) -> 'BitVector':
+        return BitVector(tuple(self) + tuple(other))
+
+    def __array__(self, dtype=None, copy=None) -> Array[bool, 1, ...]:
+        return np.array(tuple(self), dtype=dtype or np.bool_)
+
+    def __repr__(self) -> str:
+        return f"BitVector('{bat2str(self)}')"
+
+
 def bat2str(bit_arr: Tuple[bool]) -> str:
     bit_arr_str = ''.join(str(int(b)) for b in bit_arr)
     return bit_arr_str
@@ -23,6 +50,14 @@ def ba2int(bit_arr: Array[bool, 1, ...]) -> int:
     return bat2int(bit_arr)
 
 
+_WEIGHTS = 1 << np.arange(8)
+
+
+def ba2int_lsb(bit_arr: Array[bool, 1, ...]) -> int:
+    """Return int of bit array of 8 bits at most whose LSB is index=0"""
+    return int(bit_arr @ _WEIGHTS[:len(bit_arr)])
+
+
 def int2bastr(i: int, digit: int) -> str:
     return f'{i:0{digit}b}'
 
@@ -43,6 +78,18 @@ def int2ba(i: int, digit: int) -> Array[bool, 1, ...]:
     return bastr2ba(int2bastr(i, digit))
 
 
+def ba2bv(bit_arr: Array[bool, 1, ...]) -> BitVector:
+    return BitVector(bit_arr)
+
+
+def bastr2bv(bit_arr_str: str) -> BitVector:
+    return BitVector(bastr2bat(bit_arr_str))
+
+
+def int2bv(i: int, digit: int) -> BitVector:
+    return BitVector(int2bat(i, digit))
+
+
 def gen_all_bool_patterns(length: int) -> Tuple[Tuple[bool]]:
     """Return all bool patterns. Be aware of the order of patterns.
 
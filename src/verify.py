@@ -0,0 +1,178 @@
+"""Exhaustive verification of the units by bit-slicing.
+
+Pattern p of n input bits sets input bit k to p >> k & 1. Each input bit is packed into
+a bit plane, an array of uint64 words whose bit j of word w belongs to pattern 64w + j,
+so one bitwise operation evaluates a gate for 64 patterns. The units themselves are run
+with NOT, _AND and _OR substituted by ~, & and |, and their outputs are compared with
+integer specifications written independently of the gates.
+
+    $ python -m src.verify
+"""
+import numpy as np
+from nptyping import Array
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+import time
+
+from src import units, fastcore
+
+# bit planes of input bits 0 to 5 within a word
+_WORD_PATTERNS = (0xAAAAAAAAAAAAAAAA, 0xCCCCCCCCCCCCCCCC, 0xF0F0F0F0F0F0F0F0,
+                  0xFF00FF00FF00FF00, 0xFFFF0000FFFF0000, 0xFFFFFFFF00000000)
+_ONES = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class Result(NamedTuple):
+    unit: str
+    patterns: int
+    mismatches: int
+    first_mismatch: Optional[int]  # pattern
+    elapsed: float
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatches == 0
+
+
+def planes(n_bits: int) -> Array[np.uint64, ..., ...]:
+    """Return bit planes of input bits 0 to n_bits - 1 over every pattern"""
+    words = max(1, (1 << n_bits) >> 6)
+    w = np.arange(words, dtype=np.uint64)
+    rows = []
+    for k in range(n_bits):
+        if k < 6:
+            rows.append(np.full(words, _WORD_PATTERNS[k], dtype=np.uint64))
+        else:
+            rows.append(np.where(w >> np.uint64(k - 6) & np.uint64(1), _ONES, np.uint64(0)))
+    return np.array(rows, dtype=np.uint64).reshape(n_bits, words)
+
+
+def constant(value: bool, words: int) -> Array[np.uint64, ...]:
+    return np.full(words, _ONES if value else 0, dtype=np.uint64)
+
+
+def sliced():
+    """Context in which units evaluate bit planes"""
+    return units.substitute(NOT=np.invert, _AND=np.bitwise_and, _OR=np.bitwise_or)
+
+
+def pack(values: Array[np.int32, ...], n_bits: int) -> Array[np.uint64, ..., ...]:
+    """Return bit planes of bits 0 to n_bits - 1 of values; the inverse of unpack"""
+    values = np.pad(values.astype(np.uint16 if n_bits <= 16 else np.uint32),
+                    (0, -len(values) % 64))
+    rows = [np.packbits(values & (1 << i) != 0, bitorder='little') for i in range(n_bits)]
+    return np.array(rows).view('<u8').astype(np.uint64)
+
+
+def unpack(out_planes: Array[np.uint64, ..., ...], n_patterns: int) -> Array[np.int32, ...]:
+    """Return output of each pattern as int; bit i is out_planes[i]"""
+    out_planes = np.ascontiguousarray(out_planes, dtype=np.uint64)
+    bits = np.unpackbits(out_planes.astype('<u8').view(np.uint8), axis=-1, bitorder='little')
+    bits = bits.reshape(len(out_planes), -1)[:, :n_patterns].astype(np.int32)
+    return (bits << np.arange(len(out_planes), dtype=np.int32)[:, None]).sum(axis=0)
+
+
+def _grids(widths: Tuple[int, ...]) -> List[Array[np.uint16, ...]]:
+    """Return fields of widths from bit 0 as grids which broadcast to every pattern in order"""
+    return [np.arange(1 << w, dtype=np.uint16).reshape((-1,) + (1,) * i)
+            for i, w in enumerate(widths)]
+
+
+def _check(name: str, widths: Tuple[int, ...], run: Callable[[Array], Array],
+           spec: Callable[..., Array[np.uint16, ...]]) -> Result:
+    start = time.perf_counter()
+    n_bits = sum(widths)
+    n_patterns = 1 << n_bits
+    with sliced():
+        actual = np.asarray(run(planes(n_bits)), dtype=np.uint64)
+    fields = _grids(widths)
+    shape = np.broadcast(*fields).shape
+    expected = pack(np.broadcast_to(spec(*fields), shape).ravel(), len(actual))
+    if n_patterns < 64:
+        mask = np.uint64((1 << n_patterns) - 1)
+        actual, expected = actual & mask, expected & mask
+    # words with any wrong pattern; decoded only when there are some
+    wrong_words = np.flatnonzero((actual != expected).any(axis=0))
+    wrong = np.empty(0, dtype=np.int64)
+    if len(wrong_words):
+        words = np.unique(wrong_words)
+        n_bits = 64 * len(words)
+        diff = unpack(actual[:, words], n_bits) != unpack(expected[:, words], n_bits)
+        wrong = (words[:, None] * 64 + np.arange(64)).ravel()[diff]
+    return Result(name, n_patterns, len(wrong), int(wrong[0]) if len(wrong) else None,
+                  time.perf_counter() - start)
+
+
+# specifications take the fields of the input bits from bit 0
+
+def _spec_ALU(cin, a, b):
+    res = cin + a + b
+    # output index 0 is carry, 1 to 4 are sums from LSB
+    return res >> 4 | (res & 0b1111) << 1
+
+
+def _spec_MUX(a, b, ca, cb, cc, cd):
+    return np.where(b == 1, np.where(a == 1, cd, cc), np.where(a == 1, cb, ca))
+
+
+def _spec_AR(address, g1_, g2_):
+    return np.where((g1_ | g2_) == 0, 1 << address, 0)
+
+
+_DECODED = np.array([
+    sum(int(bit) << i for i, bit in enumerate(
+        (select & 1, select >> 1, not load_a, not load_b, not load_out, not load_pc)))
+    for select, load_a, load_b, load_out, load_pc in fastcore.EXEC_TABLE], dtype=np.uint16)
+
+
+def _spec_DECODER(op, c_flag_):
+    return _DECODED[op | (c_flag_ ^ 1) << 4]
+
+
+def _run_datapath(x):
+    op, c_flag, a, b, in_port = x[:8], x[8], x[9:13], x[13:17], x[17:21]
+    decoded = units.DECODER(op[4:], units.NOT(c_flag))
+    selected = units.MUX(decoded[0], decoded[1], a, b, in_port,
+                         np.array([constant(False, x.shape[1])] * 4))
+    return np.concatenate((decoded, units.ALU(c_flag, selected, op[:4])))
+
+
+def _spec_datapath(op, c_flag, a, b, in_port):
+    decoded = _spec_DECODER(op >> 4, c_flag ^ 1)
+    selected = np.where(decoded & 0b10, np.where(decoded & 1, 0, in_port),
+                        np.where(decoded & 1, b, a)).astype(np.uint16)
+    return decoded | _spec_ALU(c_flag, selected, op & 0b1111) << 6
+
+
+# unit: (widths of input fields, run on planes, specification on fields)
+CHECKS: Dict[str, Tuple[Tuple[int, ...], Callable, Callable]] = {
+    'ALU': ((1, 4, 4), lambda x: units.ALU(x[0], x[1:5], x[5:9]), _spec_ALU),
+    'MUX': ((1, 1, 4, 4, 4, 4),
+            lambda x: units.MUX(x[0], x[1], x[2:6], x[6:10], x[10:14], x[14:18]), _spec_MUX),
+    'AR': ((4, 1, 1), lambda x: units.AR(x[:4], x[4], x[5]), _spec_AR),
+    'DECODER': ((4, 1), lambda x: units.DECODER(x[:4], x[4]), _spec_DECODER),
+    # DECODER -> MUX -> ALU of a cycle: op, c_flag, A, B and IN with 0000 on the 4th input
+    'datapath': ((8, 1, 4, 4, 4), _run_datapath, _spec_datapath),
+}
+
+
+def verify(name: str) -> Result:
+    """Check a unit of CHECKS over every input pattern"""
+    widths, run, spec = CHECKS[name]
+    return _check(name, widths, run, spec)
+
+
+def verify_all() -> List[Result]:
+    return [verify(name) for name in CHECKS]
+
+
+def main(argv=None):
+    results = verify_all()
+    for r in results:
+        status = 'ok' if r.ok else f'{r.mismatches} mismatches, 1st pattern {r.first_mismatch:b}'
+        print(f'{r.unit:<10} {r.patterns:>9} patterns in {r.elapsed * 1e3:8.1f} ms: {status}')
+    if not all(r.ok for r in results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+import numpy as np
+import unittest
+
+from src import State, fastcore, analysis
+
+
+class TestAnalysis(unittest.TestCase):
+    def test_pack(self):
+        state = State(1, 2, 3, 4, 1)
+        self.assertEqual(state, analysis.unpack(analysis.pack(state, 0b1010)))
+
+    def test_build_transition_table(self):
+        rng = np.random.RandomState(0)
+        rom = tuple(int(i) for i in rng.randint(0, 256, 16))
+        table = analysis.build_transition_table(rom)
+        for packed in rng.randint(0, analysis.N_STATES >> 4, 200):  # input port is 0000
+            state = analysis.unpack(packed)
+            fast = fastcore.FastTD4(rom)
+            fast.load(state)
+            fast.cycle()
+            self.assertEqual(fast.state, analysis.unpack(table[packed]))
+
+    def test_analyze(self):
+        rng = np.random.RandomState(1)
+        for _ in range(5):
+            rom = tuple(int(i) for i in rng.randint(0, 256, 16))
+            orbit = analysis.analyze(rom)
+            fast = fastcore.FastTD4(rom)
+            for step in (0, 1, 17, 1000, 5000):
+                fast.run(step - fast.step)
+                self.assertEqual(fast.state, orbit.state_at(step))
+            self.assertEqual(orbit.state_at(orbit.transient),
+                             orbit.state_at(orbit.transient + orbit.period))
+
+    def test_analyze_for_period(self):
+        # JMP 0000 at address 0
+        orbit = analysis.analyze((0b11110000,) + (0,) * 15)
+        self.assertEqual((0, 1), (orbit.transient, orbit.period))
+        self.assertEqual(State(0, 0, 0, 0, 0), orbit.state_at(10 ** 12))
@@ -0,0 +1,57 @@
+from numpy.testing import assert_array_equal
+import numpy as np
+import unittest
+import os
+
+from src import State, units, utils, assembler, fastcore, batch
+
+gen_all_bool_patterns = utils.gen_all_bool_patterns
+
+
+class TestBatch(unittest.TestCase):
+    def test_ALU(self):
+        patterns = np.array(gen_all_bool_patterns(9))
+        expected = np.array(tuple(units.ALU(p[0], p[1:5], p[5:]) for p in patterns))
+        actual = batch.ALU(patterns[:, 0], patterns[:, 1:5], patterns[:, 5:])
+        assert_array_equal(expected, actual)
+
+    def test_DECODER(self):
+        patterns = np.array(gen_all_bool_patterns(5))
+        expected = np.array(tuple(units.DECODER(p[:4], p[4]) for p in patterns))
+        actual = batch.DECODER(patterns[:, :4], patterns[:, 4])
+        assert_array_equal(expected, actual)
+
+    def test_MUX(self):
+        patterns = np.random.RandomState(0).randint(0, 2, (1000, 18)).astype(bool)
+        args = (patterns[:, 0], patterns[:, 1], patterns[:, 2:6], patterns[:, 6:10],
+                patterns[:, 10:14], patterns[:, 14:])
+        expected = np.array(tuple(units.MUX(*arg) for arg in zip(*args)))
+        assert_array_equal(expected, batch.MUX(*args))
+
+    def test_run_batch_is_same_as_fastcore(self):
+        roms = np.random.RandomState(0).randint(0, 2, (50, 16, 8)).astype(bool)
+        actual = batch.run_batch(roms, 100)
+        for i, rom in enumerate(roms):
+            fast = fastcore.FastTD4(fastcore.rom_from_matrix(rom))
+            outs = [0]
+            for _ in range(100):
+                fast.cycle()
+                outs.append(fast.state.out)
+            expected = fast.state
+            self.assertEqual(expected, State(*(int(batch.to_int(r[i])) for r in actual[:4]),
+                                             int(actual.carry[i])))
+            assert_array_equal(outs, actual.outputs[:, i])
+
+    def test_stack(self):
+        path = os.path.join(os.path.dirname(__file__), 'test_program_correct.txt')
+        actual = batch.run_batch(batch.stack((path, path)), 3, trace=False)
+        assert_array_equal([[False, True, False, True]] * 2, actual.pc)
+        assert_array_equal([[False, True, False, True]] * 2, actual.b)
+        self.assertIsNone(actual.outputs)
+
+    def test_run_batch_for_in_ports(self):
+        rom = np.array((assembler.assemble_line('IN A'), assembler.assemble_line('OUT 0000'))
+                       + ((False,) * 8,) * 14)
+        in_ports = np.array((utils.bastr2ba('0011')[::-1], utils.bastr2ba('1100')[::-1]))
+        actual = batch.run_batch(np.stack((rom, rom)), 1, in_ports)
+        assert_array_equal(in_ports, actual.a)
@@ -0,0 +1,30 @@
+import unittest
+
+from src import bench
+
+
+class TestBench(unittest.TestCase):
+    def test_compare_is_relative_to_reference(self):
+        baseline = {bench.REFERENCE: 2.0, 'run.fast': 4.0, 'run.gate': 1.0, 'gone': 1.0}
+        # this machine is twice as fast: the same code gives the same speedups
+        results = {bench.REFERENCE: 1.0, 'run.fast': 2.0, 'run.gate': 0.25, 'new': 1.0}
+        self.assertEqual({'run.fast': 1.0, 'run.gate': 2.0}, bench.compare(results, baseline))
+
+    def test_compare_without_reference(self):
+        self.assertEqual({}, bench.compare({'run.fast': 1.0}, {'run.fast': 1.0}))
+        self.assertEqual({}, bench.compare({bench.REFERENCE: 1.0, 'run.fast': 1.0},
+                                           {'run.fast': 1.0}))
+
+    def test_over_budget(self):
+        self.assertEqual({'startup.import': 1.0},
+                         bench.over_budget({'startup.import': 1.0, 'startup.help': 0.0,
+                                            'run.fast': 1.0}))
+
+    def test_report(self):
+        results = {bench.REFERENCE: 50e-6, 'run.fast': 1e-6, 'startup.import': 1.0}
+        lines = bench.report(results, {'run.fast': 2.0}).splitlines()
+        self.assertEqual(3, len(lines))
+        self.assertTrue(lines[0].startswith(bench.REFERENCE))
+        self.assertNotIn(' x', lines[0])
+        self.assertIn('1.000 us/op  x2.00', lines[1])
+        self.assertIn('over budget of 50 ms', lines[2])
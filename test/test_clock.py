@@ -0,0 +1,75 @@
+import contextlib
+import io
+import itertools
+import os
+import runpy
+import unittest
+
+from src import ClockCycle, units, clock
+
+emulator_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'TD4-emulator.py')
+
+
+class FakeTime:
+    def __init__(self):
+        self.t = 100.0
+
+    def now(self) -> float:
+        return self.t
+
+    def sleep(self, sec: float):
+        self.t += sec
+
+
+class TestClock(unittest.TestCase):
+    def test_build_SCHEDULED_CLOCK_does_not_drift(self):
+        fake = FakeTime()
+        gen = clock.build_SCHEDULED_CLOCK(10, spin=0, now=fake.now, sleep=fake.sleep)
+        for _ in range(30):
+            next(gen)
+            fake.t += 0.03  # work in a cycle
+        self.assertAlmostEqual(100.0 + 3.0 + 0.03, fake.t)
+
+    def test_build_SCHEDULED_CLOCK_for_catch_up(self):
+        fake = FakeTime()
+        stats = clock.ClockStats(10)
+        gen = clock.build_SCHEDULED_CLOCK(10, stats=stats, spin=0, now=fake.now, sleep=fake.sleep)
+        next(gen)
+        fake.t += 0.35
+        ticks = [fake.t for _ in itertools.islice(gen, 4)]
+        self.assertAlmostEqual(100.45, ticks[0])
+        self.assertEqual(ticks[0], ticks[2])  # back-to-back
+        self.assertAlmostEqual(100.5, ticks[3])
+        self.assertEqual(2, stats.late_ticks)
+        self.assertEqual(0, stats.missed_ticks)
+
+    def test_build_SCHEDULED_CLOCK_for_skip(self):
+        fake = FakeTime()
+        stats = clock.ClockStats(10)
+        gen = clock.build_SCHEDULED_CLOCK(10, catch_up=False, stats=stats, spin=0,
+                                          now=fake.now, sleep=fake.sleep)
+        next(gen)
+        fake.t += 0.35
+        ticks = [fake.t for _ in itertools.islice(gen, 2)]
+        self.assertAlmostEqual(100.45, ticks[0])
+        self.assertAlmostEqual(100.5, ticks[1])
+        self.assertEqual(2, stats.missed_ticks)
+        self.assertTrue('missed ticks: 2' in stats.report())
+
+    def test_build_SCHEDULED_CLOCK_for_invalid_hz(self):
+        with self.assertRaises(ValueError) as context:
+            next(clock.build_SCHEDULED_CLOCK(0))
+        self.assertTrue('Frequency must be > 0' in str(context.exception))
+
+    def test_build_CLOCK_GENERATOR_with_hz(self):
+        stats = clock.ClockStats(1000)
+        gen = units.build_CLOCK_GENERATOR(ClockCycle.HIGH, 1000, stats)
+        self.assertEqual((True, True), next(gen))
+        self.assertEqual(1, stats.ticks)
+
+    def test_hz_option_must_be_positive(self):
+        parse_args = runpy.run_path(emulator_path)['parse_args']
+        self.assertEqual(50.0, parse_args(['--hz', '50']).hz)
+        for hz in ('0', '-1', 'nan'):
+            with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+                parse_args(['--hz', hz])
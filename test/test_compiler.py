@@ -0,0 +1,38 @@
+import numpy as np
+import unittest
+
+from src import State, fastcore, compiler
+
+
+class TestCompiler(unittest.TestCase):
+    def test_find_leaders(self):
+        # 0: ADD A 0001, 1: JNC 0000, 2: OUT 0001, 3: JMP 0010
+        rom = (0b00000001, 0b11100000, 0b10110001, 0b11110010) + (0, ) * 12
+        self.assertEqual((0, 2, 4), compiler.find_leaders(rom))
+
+    def test_compile_rom_is_cached(self):
+        rom = (0b00000001, 0b11100000) + (0, ) * 14
+        self.assertIs(compiler.compile_rom(rom), compiler.compile_rom(list(rom)))
+        self.assertEqual(compiler.CACHE_SIZE, compiler._compile.cache_info().maxsize)
+
+    def test_run_is_same_as_fastcore(self):
+        rng = np.random.RandomState(0)
+        for _ in range(50):
+            rom = tuple(int(i) for i in rng.randint(0, 256, 16))
+            for cycles in (0, 1, 7, 200):
+                fast = fastcore.FastTD4(rom)
+                expected_outputs = []
+                fast.run(cycles, expected_outputs)
+                actual_outputs = []
+                actual = compiler.run(rom, cycles, outputs=actual_outputs)
+                self.assertEqual(fast.state, actual)
+                self.assertEqual(expected_outputs, actual_outputs)
+
+    def test_run_from_state(self):
+        rng = np.random.RandomState(1)
+        rom = tuple(int(i) for i in rng.randint(0, 256, 16))
+        state = State(5, 1, 2, 3, 1)
+        fast = fastcore.FastTD4(rom)
+        fast.load(state)
+        fast.run(100)
+        self.assertEqual(fast.state, compiler.run(rom, 100, state, 10))
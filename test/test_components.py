@@ -0,0 +1,92 @@
+from numpy.testing import assert_array_equal
+import copy
+import pickle
+import unittest
+
+from src import components, utils
+
+
+class Follower(components.Component):
+    """Takes q of source at every edge"""
+    __slots__ = ('source', 'q', '_next')
+
+    def __init__(self, source):
+        self.source, self.q, self._next = source, 0, 0
+
+    def evaluate(self):
+        self._next = self.source.q
+
+    def commit(self):
+        self.q = self._next
+
+    def reset(self):
+        self.q = 0
+
+
+class TestComponents(unittest.TestCase):
+    def test_Component_is_abstract(self):
+        with self.assertRaises(TypeError):
+            components.Component()
+
+    def test_Register_for_invalid_ent_and_enp(self):
+        with self.assertRaises(ValueError):
+            components.Register(False, True)
+
+    def test_Register(self):
+        reg = components.Register(False, False)
+        scheduler = components.Scheduler((reg, ))
+        reg.load_, reg.d = False, utils.bastr2ba('1010')
+        scheduler.tick()
+        assert_array_equal(utils.bastr2ba('1010'), reg.q)
+        reg.load_, reg.d = True, utils.bastr2ba('0101')
+        scheduler.tick()
+        assert_array_equal(utils.bastr2ba('1010'), reg.q)  # hold
+        scheduler.tick(reset_=False)
+        assert_array_equal(utils.bastr2ba('0000'), reg.q)
+
+    def test_COUNTER(self):
+        counter = components.Register(True, True)
+        scheduler = components.Scheduler((counter, ))
+        for i in range(1, 18):
+            scheduler.tick()
+            self.assertEqual(i & 0b1111, utils.ba2int(counter.q[::-1]))
+        counter.load_, counter.d = False, utils.int2ba(9, 4)[::-1]
+        scheduler.tick()
+        self.assertEqual(9, utils.ba2int(counter.q[::-1]))
+
+    def test_DFlipFlop(self):
+        d_ff = components.DFlipFlop()
+        scheduler = components.Scheduler((d_ff, ))
+        d_ff.d = True
+        scheduler.tick()
+        self.assertIs(True, d_ff.q)
+        scheduler.tick(reset_=False)
+        self.assertIs(False, d_ff.q)
+
+    def test_two_phases_are_independent_of_order(self):
+        counter = components.Register(True, True)
+        follower = Follower(counter)
+        for order in ((counter, follower), (follower, counter)):
+            counter.reset(), follower.reset()
+            scheduler = components.Scheduler(order)
+            for _ in range(3):
+                scheduler.tick()
+            # the follower lags one edge behind in either order
+            self.assertEqual((3, 2), (utils.ba2int(counter.q[::-1]),
+                                      utils.ba2int(follower.q[::-1])))
+
+    def test_reset_line(self):
+        counter, d_ff = components.Register(True, True), components.DFlipFlop()
+        d_ff.d = True
+        scheduler = components.Scheduler((counter, d_ff), reset_line=(d_ff, ))
+        scheduler.tick(reset_=False)
+        self.assertEqual((1, False), (utils.ba2int(counter.q[::-1]), d_ff.q))
+
+    def test_copy_and_pickle(self):
+        counter = components.Register(True, True)
+        scheduler = components.Scheduler((counter, ))
+        scheduler.tick()
+        for clone in (copy.deepcopy(scheduler), pickle.loads(pickle.dumps(scheduler))):
+            clone.tick()
+            self.assertEqual(2, utils.ba2int(clone.components[0].q[::-1]))
+        self.assertEqual(1, utils.ba2int(counter.q[::-1]))
@@ -0,0 +1,112 @@
+import unittest
+import os
+
+from src import DebugMenu, State, assembler, cpu, debugger, snapshots, fastcore
+
+PROGRAM_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'program.txt')
+
+
+def _script(*commands):
+    """Return menu and ask_int answering commands; ints are answers of BACK and JUMP"""
+    menus = iter([c for c in commands if isinstance(c, DebugMenu)])
+    ints = iter([c for c in commands if not isinstance(c, DebugMenu)])
+    return (lambda: next(menus, DebugMenu.STOP)), (lambda prompt: next(ints))
+
+
+def _fast_state(cycles: int) -> State:
+    td4 = fastcore.FastTD4(fastcore.rom_from_matrix(assembler.assemble(PROGRAM_PATH)))
+    td4.run(cycles)
+    return td4.state
+
+
+class TestDebugger(unittest.TestCase):
+    def setUp(self):
+        self.td4 = cpu.TD4(assembler.assemble(PROGRAM_PATH))
+
+    def test_next_and_back(self):
+        menu, ask_int = _script(DebugMenu.NEXT, DebugMenu.NEXT, DebugMenu.NEXT,
+                                DebugMenu.BACK, 2, DebugMenu.NEXT)
+        observed = []
+        dbg = debugger.Debugger(self.td4, [observed.append], menu=menu, ask_int=ask_int)
+        shown = [cycle.step for cycle in dbg.run(300)]
+        self.assertEqual([0, 1, 2, 1], shown)
+        self.assertEqual(2, self.td4.step)
+        self.assertEqual(_fast_state(2), self.td4.state)
+        self.assertEqual(4, len(observed))
+
+    def test_jump_forward_and_back(self):
+        menu, ask_int = _script(DebugMenu.JUMP, 200, DebugMenu.JUMP, 37, DebugMenu.NEXT)
+        dbg = debugger.Debugger(self.td4, menu=menu, ask_int=ask_int,
+                                ring=snapshots.SnapshotRing(256, 16))
+        shown = [cycle.step for cycle in dbg.run(300)]
+        self.assertEqual([37], shown)
+        self.assertEqual(_fast_state(38), self.td4.state)
+        # history after step 37 is replaced
+        self.assertEqual(37, dbg.ring.last)
+
+    def test_jump_before_kept_steps(self):
+        menu, ask_int = _script(DebugMenu.JUMP, 100, DebugMenu.JUMP, 10)
+        dbg = debugger.Debugger(self.td4, menu=menu, ask_int=ask_int,
+                                ring=snapshots.SnapshotRing(32, 16))
+        self.assertEqual([], list(dbg.run(300)))
+        self.assertEqual(100, self.td4.step)
+
+    def test_run_until_max_step(self):
+        menu, ask_int = _script(*([DebugMenu.NEXT] * 10))
+        dbg = debugger.Debugger(self.td4, menu=menu, ask_int=ask_int)
+        self.assertEqual(4, len(list(dbg.run(3))))
+
+    def test_breakpoint_on_instruction(self):
+        menu, ask_int = _script(DebugMenu.BREAK, DebugMenu.CONTINUE, DebugMenu.CONTINUE)
+        dbg = debugger.Debugger(self.td4, menu=menu, ask_int=ask_int,
+                                ask_line=lambda prompt: 'OUT 0110')
+        shown = list(dbg.run(300))
+        # OUT 0110 at address 5 is reached after A counts up to 15
+        self.assertEqual(2, len(shown))
+        self.assertEqual('0101', ''.join(str(int(b)) for b in shown[0].q_PC[::-1]))
+        self.assertEqual(300, shown[1].step)
+
+    def test_watchpoint_and_max_step(self):
+        menu, ask_int = _script(DebugMenu.WATCH, DebugMenu.CONTINUE, DebugMenu.CONTINUE)
+        dbg = debugger.Debugger(self.td4, menu=menu, ask_int=ask_int,
+                                ask_line=lambda prompt: 'out changed')
+        shown = [cycle.step for cycle in dbg.run(20)]
+        self.assertEqual([1, 20], shown)
+        self.assertEqual(21, self.td4.step)
+
+    def test_set_points(self):
+        lines = iter(['pc == 0011', 'b > 2', '-pc == 0011', 'x', ''])
+        dbg = debugger.Debugger(self.td4, ask_line=lambda prompt: next(lines))
+        dbg.set_points(dbg.watchpoints, debugger.parse_watchpoint, 'watchpoint')
+        dbg.set_points(dbg.watchpoints, debugger.parse_watchpoint, 'watchpoint')
+        self.assertEqual(['pc == 0011', 'b > 2'], list(dbg.watchpoints))
+        dbg.set_points(dbg.watchpoints, debugger.parse_watchpoint, 'watchpoint')
+        self.assertEqual(['b > 2'], list(dbg.watchpoints))
+        dbg.set_points(dbg.watchpoints, debugger.parse_watchpoint, 'watchpoint')
+        self.assertEqual(['b > 2'], list(dbg.watchpoints))
+        dbg.set_points(dbg.watchpoints, debugger.parse_watchpoint, 'watchpoint')
+        self.assertEqual({}, dbg.watchpoints)
+
+    def test_parse_breakpoint(self):
+        state = State(6, 0, 0, 0, 0)
+        self.assertTrue(debugger.parse_breakpoint('0110')(state, None, 0))
+        self.assertTrue(debugger.parse_breakpoint('6')(state, None, 0))
+        self.assertFalse(debugger.parse_breakpoint('7')(state, None, 0))
+        self.assertTrue(debugger.parse_breakpoint('jnc')(state, None, 0b11100011))
+        self.assertTrue(debugger.parse_breakpoint('JNC 0011')(state, None, 0b11100011))
+        self.assertFalse(debugger.parse_breakpoint('JNC 0001')(state, None, 0b11100011))
+        self.assertTrue(debugger.parse_breakpoint('MOV A 0010')(state, None, 0b00110010))
+        for spec in ('16', 'JNZ', 'ADD C', 'ADD A 1234', 'MOV A 2', 'OUT 01'):
+            with self.assertRaises(ValueError):
+                debugger.parse_breakpoint(spec)
+
+    def test_parse_watchpoint(self):
+        previous, state = State(0, 1, 0, 0, 0), State(1, 1, 5, 0, 1)
+        self.assertTrue(debugger.parse_watchpoint('b == 0101')(state, previous, 0))
+        self.assertTrue(debugger.parse_watchpoint('carry>=1')(state, previous, 0))
+        self.assertTrue(debugger.parse_watchpoint('pc changed')(state, previous, 0))
+        self.assertFalse(debugger.parse_watchpoint('a changed')(state, previous, 0))
+        self.assertFalse(debugger.parse_watchpoint('a changed')(state, None, 0))
+        for spec in ('out = 1', 'c == 1', 'a > 16'):
+            with self.assertRaises(ValueError):
+                debugger.parse_watchpoint(spec)
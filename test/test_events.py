@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+import asyncio
+import itertools
+import os
+
+from src import Engine, assembler, cpu, events, headless
+
+test_dir = os.path.dirname(__file__)
+PROGRAM_PATH = os.path.join(os.path.dirname(test_dir), 'program.txt')
+
+
+def _cycles(max_step: int):
+    td4 = cpu.TD4(assembler.assemble(PROGRAM_PATH))
+    return td4.run(itertools.repeat((True, True)), max_step)
+
+
+class TestEvents(unittest.TestCase):
+    def test_watch_out_matches_headless_outputs(self):
+        expected = headless.ENGINES[Engine.FAST](assembler.assemble(PROGRAM_PATH), 300)
+        actual = tuple((e.step, e.value) for e in events.watch(_cycles(300), now=lambda: 0.0))
+        self.assertEqual(expected.outputs, actual)
+
+    def test_callbacks_and_unsubscribe(self):
+        stream = events.EventStream(('a', 'out'), now=lambda: 1.0)
+        received = []
+        unsubscribe = stream.subscribe(received.append)
+        cycles = _cycles(10)
+        for cycle in itertools.islice(cycles, 3):
+            stream(cycle)
+        self.assertEqual([events.Event(0, 1.0, 'a', 0), events.Event(0, 1.0, 'out', 0),
+                          events.Event(1, 1.0, 'out', 0b0111), events.Event(2, 1.0, 'a', 1)],
+                         received)
+        unsubscribe()
+        for cycle in cycles:
+            stream(cycle)
+        self.assertEqual(4, len(received))
+
+    def test_invalid_register(self):
+        with self.assertRaises(ValueError):
+            events.EventStream(('c', ))
+
+    def test_queue(self):
+        async def _consume():
+            stream = events.EventStream()
+            queue = stream.queue()
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, lambda: [stream(c) for c in _cycles(300)])
+            received = []
+            while not queue.empty():
+                received.append(queue.get_nowait())
+            return received
+
+        received = asyncio.run(_consume())
+        self.assertEqual((0, 0), (received[0].step, received[0].value))
+        self.assertEqual(list(events.watch(_cycles(300), now=lambda: 0.0)),
+                         [e._replace(time=0.0) for e in received])
+
+    def test_log_round_trip(self):
+        times = iter([10.0, 9.5, 1e9 + 0.25, 1e9 + 60.0])
+        evs = [events.Event(0, next(times), 'out', 0), events.Event(3, next(times), 'pc', 15),
+               events.Event(200000, next(times), 'carry', 1),
+               events.Event(200001, next(times), 'out', 9)]
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'events.bin')
+            with events.EventLogWriter(path) as writer:
+                for event in evs:
+                    writer(event)
+            self.assertEqual(evs, list(events.read_log(path)))
+            with events.EventLogWriter(path):
+                pass
+            self.assertEqual([], list(events.read_log(path)))
@@ -0,0 +1,74 @@
+import numpy as np
+import unittest
+
+from src import State, units, utils, cpu, fastcore
+
+gen_all_bool_patterns = utils.gen_all_bool_patterns
+
+
+class TestFastcore(unittest.TestCase):
+    def test_decode(self):
+        for p in gen_all_bool_patterns(5):
+            op_arr, c_flag = np.array(p[:4]), p[4]
+            expected = units.DECODER(op_arr, units.NOT(c_flag))
+            select, *loads = fastcore.decode(utils.ba2int(op_arr[::-1]), int(c_flag))
+            self.assertEqual((bool(expected[0]), bool(expected[1])), (bool(select & 1), bool(select & 2)))
+            self.assertEqual(tuple(bool(b) for b in expected[2:]), tuple(loads))
+
+    def test_Register_for_invalid_ent_and_enp(self):
+        with self.assertRaises(ValueError) as context:
+            fastcore.Register(False, True)
+        self.assertTrue(
+            'ent and enp are must be (True, True) or (False, False)' in str(context.exception))
+
+    def test_Register_for_COUNTER(self):
+        COUNTER = fastcore.Register(True, True)
+        COUNTER.clock(True, 0b1010)
+        self.assertEqual(0b0001, COUNTER.q)
+        COUNTER.clock(False, 0b0101)
+        self.assertEqual(0b0101, COUNTER.q)
+        COUNTER.clock(True, 0b1010, False)
+        self.assertEqual(0b0000, COUNTER.q)
+
+    def test_Register_for_REGISTER(self):
+        REGISTER = fastcore.Register(False, False)
+        REGISTER.clock(False, 0b1010)
+        self.assertEqual(0b1010, REGISTER.q)
+        REGISTER.clock(True, 0b0101)
+        self.assertEqual(0b1010, REGISTER.q)
+        REGISTER.clock(False, 0b0101, False)
+        self.assertEqual(0b0000, REGISTER.q)
+
+    def test_cycle_is_same_as_TD4(self):
+        rng = np.random.RandomState(0)
+        for _ in range(10):
+            bit_matrix = rng.randint(0, 2, (16, 8)).astype(bool)
+            td4 = cpu.TD4(bit_matrix)
+            fast = fastcore.FastTD4(fastcore.rom_from_matrix(bit_matrix))
+            for i in range(64):
+                reset_ = i != 40
+                td4.cycle(True, reset_)
+                fast.cycle(reset_)
+                self.assertEqual(td4.state, fast.state)
+
+    def test_run_is_same_as_cycle(self):
+        rng = np.random.RandomState(1)
+        for _ in range(20):
+            rom = tuple(int(i) for i in rng.randint(0, 256, 16))
+            expected, actual = fastcore.FastTD4(rom), fastcore.FastTD4(rom)
+            outputs = []
+            for _ in range(100):
+                out = expected.state.out
+                expected.cycle()
+                if expected.state.out != out:
+                    outputs.append((expected.step, expected.state.out))
+            actual_outputs = []
+            actual.run(100, actual_outputs)
+            self.assertEqual(expected.state, actual.state)
+            self.assertEqual(100, actual.step)
+            self.assertEqual(outputs, actual_outputs)
+
+    def test_load(self):
+        fast = fastcore.FastTD4((0,) * 16)
+        fast.load(State(1, 2, 3, 4, 1))
+        self.assertEqual(State(1, 2, 3, 4, 1), fast.state)
@@ -0,0 +1,56 @@
+from unittest import mock
+import tempfile
+import unittest
+import json
+import os
+import random
+
+from src import State, fuzz
+
+
+_reference_step = fuzz.reference_step
+
+
+def _buggy_step(state, op, in_port):
+    """Reference model which ignores the input port"""
+    return _reference_step(state, op, 0)
+
+
+class TestFuzz(unittest.TestCase):
+    def test_templates(self):
+        self.assertEqual(12, len(fuzz.TEMPLATES))
+        self.assertIn('MOV A Im', fuzz.TEMPLATES)
+        self.assertIn('IN B', fuzz.TEMPLATES)
+
+    def test_reference_step(self):
+        step = fuzz.reference_step
+        # ADD A 1111 with carry in overflows
+        self.assertEqual(State(1, 0, 0, 0, 1), step(State(0, 1, 0, 0, 0), 0b00001111, 0))
+        # IN B with carry
+        self.assertEqual(State(5, 0, 4, 0, 0), step(State(4, 0, 0, 0, 1), 0b01100000, 3))
+        # JNC is taken without carry and not taken with it
+        self.assertEqual(State(9, 0, 0, 0, 0), step(State(0, 0, 0, 0, 0), 0b11101001, 0))
+        self.assertEqual(State(1, 0, 0, 0, 0), step(State(0, 0, 0, 0, 1), 0b11101001, 0))
+
+    def test_check(self):
+        rng = random.Random(0)
+        for _ in range(5):
+            self.assertIsNone(fuzz.check(fuzz.gen_case(rng, 50)))
+
+    def test_shrink(self):
+        case = fuzz.Case(('MOV A 0011', 'MOV B 0101', 'IN A', 'OUT B', 'JMP 0000'), (7, ) * 20, 20)
+        with mock.patch.object(fuzz, 'reference_step', _buggy_step):
+            self.assertIn('differs', fuzz.check(case))
+            shrunk = fuzz.shrink(case)
+        self.assertEqual(('IN A', ), shrunk.program)
+        self.assertEqual(1, shrunk.cycles)
+
+    def test_fuzz_with_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            fuzz.save_failure(tmp_dir, {'seed': 1, 'error': '', 'program': ['IN A'],
+                                        'in_port': [3, 3], 'cycles': 2})
+            self.assertEqual([fuzz.Case(('IN A', ), (3, 3), 2)], fuzz.load_corpus(tmp_dir))
+            self.assertEqual([], fuzz.fuzz(4, cycles=20, workers=2, corpus_dir=tmp_dir))
+            self.assertEqual(['1.json'], os.listdir(tmp_dir))
+            with open(os.path.join(tmp_dir, '1.json'), 'r') as f:
+                self.assertEqual(2, json.load(f)['cycles'])
@@ -0,0 +1,85 @@
+import unittest
+import os
+import tempfile
+
+from src import State, Engine, headless
+
+program_path = os.path.join(os.path.dirname(__file__), 'test_program_correct.txt')
+ramen_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'program.txt')
+
+
+class TestHeadless(unittest.TestCase):
+    def test_run_gate(self):
+        actual = headless.run(program_path, 2, Engine.GATE)
+        self.assertEqual(State(pc=10, a=0, b=10, out=0, carry=0), actual.state)
+        self.assertEqual(3, actual.cycles)
+        self.assertEqual(((0, 0),), actual.outputs)
+
+    def test_run_gate_for_outputs(self):
+        actual = headless.run(ramen_path, 300, Engine.GATE)
+        self.assertEqual(301, actual.cycles)
+        self.assertEqual((0, 0), actual.outputs[0])
+        self.assertEqual((1, 0b0111), actual.outputs[1])
+        self.assertEqual(0b1000, actual.state.out)
+
+    def test_report(self):
+        actual = headless.report(headless.run(program_path, 2, Engine.GATE), Engine.GATE)
+        self.assertTrue('PC: 1010' in actual)
+        self.assertTrue('cycles/sec' in actual)
+
+    def test_run_fast_is_same_as_gate(self):
+        expected = headless.run(ramen_path, 1000, Engine.GATE)
+        actual = headless.run(ramen_path, 1000, Engine.FAST)
+        self.assertEqual(expected.state, actual.state)
+        self.assertEqual(expected.outputs, actual.outputs)
+        self.assertEqual(expected.cycles, actual.cycles)
+
+    def test_run_cycle_is_same_as_fast(self):
+        for max_step in (0, 100, 1000):
+            expected = headless.run(ramen_path, max_step, Engine.FAST)
+            actual = headless.run(ramen_path, max_step, Engine.CYCLE)
+            self.assertEqual(expected.state, actual.state)
+            self.assertEqual(expected.outputs, actual.outputs)
+
+    def test_run_cycle_is_same_as_gate_for_loop(self):
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as f:
+            f.write('OUT 0001\nOUT 0010\nJMP 0000\n')
+        self.addCleanup(os.remove, path)
+        for max_step in (0, 1, 2, 3, 20, 21):
+            expected = headless.run(path, max_step, Engine.GATE)
+            actual = headless.run(path, max_step, Engine.CYCLE)
+            self.assertEqual(expected.state, actual.state)
+            self.assertEqual(expected.outputs, actual.outputs)
+
+    def test_run_cycle_for_a_trillion_steps(self):
+        fd, path = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as f:
+            f.write('OUT 0001\nOUT 0010\nJMP 0000\n')
+        self.addCleanup(os.remove, path)
+        expected = headless.run(path, 100, Engine.GATE)
+        actual = headless.run(path, 10 ** 12, Engine.CYCLE)
+        self.assertEqual(10 ** 12 + 1, actual.cycles)
+        self.assertEqual(headless.UNROLL_LIMIT + 4, len(actual.outputs))  # + up to step 3
+        self.assertEqual(expected.outputs, actual.outputs[:len(expected.outputs)])
+
+        actual = headless.run(ramen_path, 10 ** 12, Engine.CYCLE)
+        self.assertEqual(headless.run(ramen_path, 1000, Engine.FAST).outputs, actual.outputs)
+
+    def test_run_block_with_verify(self):
+        actual = headless.run(ramen_path, 500, Engine.BLOCK, verify=True)
+        self.assertEqual(501, actual.cycles)
+
+    def test_run_with_verify_for_difference(self):
+        def _run_wrong(bit_matrix, max_step, in_port=0):
+            result = headless.run_fast(bit_matrix, max_step, in_port)
+            return result._replace(state=result.state._replace(a=result.state.a ^ 1))
+
+        original = headless.ENGINES[Engine.FAST]
+        headless.ENGINES[Engine.FAST] = _run_wrong
+        try:
+            with self.assertRaises(ValueError) as context:
+                headless.run(ramen_path, 10, Engine.FAST, verify=True)
+            self.assertTrue('fast differs from gate in state' in str(context.exception))
+        finally:
+            headless.ENGINES[Engine.FAST] = original
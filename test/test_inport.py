@@ -0,0 +1,118 @@
+import unittest
+import asyncio
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+
+from src import Engine, assembler, cpu, fastcore, headless, inport, utils
+
+PROGRAM = ('IN A', 'IN B', 'JMP 0000')
+
+
+class TestInport(unittest.TestCase):
+    def setUp(self):
+        fd, self.program_file = tempfile.mkstemp(suffix='.txt')
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join(PROGRAM) + '\n')
+        self.addCleanup(os.remove, self.program_file)
+
+    def test_decode(self):
+        self.assertEqual([1, 2, 0xf, 0xa], inport.decode_packed(b'\x21\xaf'))
+        self.assertEqual([1, 2, 0xf, 0xa], inport.decode_hex(b'12 F\na'))
+        with self.assertRaises(ValueError):
+            inport.decode_hex(b'12g')
+        with self.assertRaises(ValueError):
+            inport.NibbleFile(self.program_file, 'text')
+
+    def test_open_port(self):
+        self.assertEqual(6, inport.open_port('0110'))
+        self.assertEqual(12, inport.open_port('12'))
+        with self.assertRaises(ValueError):
+            inport.open_port('16')
+        self.assertIsInstance(inport.open_port(self.program_file), inport.NibbleFile)
+
+    def test_stdin_needs_headless(self):
+        result = subprocess.run((sys.executable, 'TD4-emulator.py', '--in-port', '-'),
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                stdin=subprocess.DEVNULL, capture_output=True, text=True)
+        self.assertEqual(2, result.returncode)
+        self.assertIn('needs --headless', result.stderr)
+
+    def test_nibble_file(self):
+        data = bytes(random.Random(0).randrange(256) for _ in range(1000))
+        with tempfile.NamedTemporaryFile(delete=False) as f:
+            f.write(data)
+        self.addCleanup(os.remove, f.name)
+        port = inport.NibbleFile(f.name, chunk_size=64)
+        self.assertEqual(inport.decode_packed(data), list(port))
+        self.assertEqual(2000, len(list(port)))  # iterable again
+        with port:
+            iterator = iter(port)
+            next(iterator)
+        self.assertEqual([], list(iterator))  # closed with the port
+        open(f.name, 'wb').close()
+        self.assertEqual([], list(port))
+
+    def test_pipe_port(self):
+        r, w = os.pipe()
+        with open(r, 'rb', buffering=0) as reader:
+            port = inport.PipePort(reader, 'hex', chunk_size=3, depth=2)
+            with open(w, 'wb') as writer:
+                writer.write(b'0123456789abcdef' * 10)
+            self.assertEqual(list(range(16)) * 10, list(port))
+            self.assertEqual([], list(port))
+            self.assertFalse(reader.closed)  # not owned
+
+        r, w = os.pipe()
+        os.close(w)
+        with inport.PipePort(open(r, 'rb'), owned=True) as port:
+            self.assertEqual([], list(port))
+        port.thread.join()
+        self.assertTrue(port.pipe.closed)
+
+    def test_stream_port(self):
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, daemon=True)
+        thread.start()
+        self.addCleanup(loop.close)
+        self.addCleanup(thread.join)
+        self.addCleanup(loop.call_soon_threadsafe, loop.stop)
+
+        async def feed():
+            reader = asyncio.StreamReader()
+            reader.feed_data(b'\x10\x32' * 100)
+            reader.feed_eof()
+            return reader
+
+        reader = asyncio.run_coroutine_threadsafe(feed(), loop).result()
+        port = inport.StreamPort(reader, loop, chunk_size=7, depth=1)
+        self.assertEqual([0, 1, 2, 3] * 100, list(port))
+        port.future.result(timeout=1)
+
+    def test_engines_sample_every_cycle(self):
+        values = [random.Random(1).randrange(16) for _ in range(10000)]
+        bit_matrix = assembler.assemble(self.program_file)
+        td4 = cpu.TD4(bit_matrix, in_port=values)
+        fast = fastcore.FastTD4(fastcore.rom_from_matrix(bit_matrix))
+        fast.run(9000, in_port=iter(values))
+        for _ in range(9000):
+            td4.cycle()
+        self.assertEqual(td4.state, fast.state)
+        self.assertEqual(values[8997:8999], [fast.state.a, fast.state.b])
+        # exhausted ports read 0000
+        fast.run(2000, in_port=iter(values[9000:]))
+        self.assertEqual((0, 0), (fast.state.a, fast.state.b))
+        self.assertEqual(6, utils.ba2int(cpu.TD4(bit_matrix, in_port=6).q_c_in[::-1]))
+
+    def test_headless(self):
+        values = list(range(16)) * 4
+        result = headless.run(self.program_file, 40, Engine.FAST, verify=True,
+                              in_port=iter(values))
+        self.assertEqual((values[39], values[40]), (result.state.a, result.state.b))
+        result = headless.run(self.program_file, 40, Engine.BLOCK, verify=True, in_port=9)
+        self.assertEqual((9, 9), (result.state.a, result.state.b))
+        with self.assertRaises(ValueError):
+            headless.run(self.program_file, 40, Engine.CYCLE, in_port=iter(values))
@@ -0,0 +1,87 @@
+import unittest
+from unittest import mock
+import os
+import random
+
+from src import Engine, assembler, fastcore, headless, loops, fuzz
+
+PROGRAM_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'program.txt')
+
+
+def rom_of(program):
+    return fastcore.rom_from_matrix(fuzz.assemble_program(program))
+
+
+def random_program(rng: random.Random):
+    program = list(rng.choice(fuzz.TEMPLATES).replace('Im', f'{rng.randrange(16):04b}')
+                   for _ in range(16))
+    for _ in range(rng.randrange(1, 4)):
+        # counting loops and halts at random places
+        start = rng.randrange(15)
+        if rng.random() < 0.8:
+            program[start] = f'ADD {rng.choice("AB")} {rng.randrange(16):04b}'
+            program[start + 1] = f'JNC {start:04b}'
+        else:
+            program[start] = f'{rng.choice(("JMP", "JNC"))} {start:04b}'
+    return tuple(program)
+
+
+class TestLoops(unittest.TestCase):
+    def test_find_loops(self):
+        found = loops.find_loops(fastcore.rom_from_matrix(assembler.assemble(PROGRAM_PATH)))
+        self.assertEqual({0b0001, 0b0011, 0b0110, 0b1000, 0b1111}, set(found))
+        self.assertEqual(loops.Loop(0b0011, 0, 1), found[0b0011])
+        self.assertIsNone(found[0b1111].register)
+
+    def test_successors(self):
+        graph = loops.successors(rom_of(('JMP 0101', 'JNC 0000', 'OUT B')))
+        self.assertEqual((0b0101, 0b0110), graph[0])  # JMP adds the carry
+        self.assertEqual((0, 2), graph[1])
+        self.assertEqual(tuple(range(16)), graph[2])
+
+    def test_skip_is_exact(self):
+        for register in ('A', 'B'):
+            for k in range(16):
+                rom = rom_of(('OUT 0000', f'ADD {register} {k:04b}', 'JNC 0001'))
+                loop = loops.find_loops(rom)[1]
+                for r in range(16):
+                    for carry in (0, 1):
+                        for budget in (0, 1, 2, 7, 40):
+                            td4 = fastcore.FastTD4(rom)
+                            td4.load(td4.state._replace(pc=1, carry=carry,
+                                                        **{register.lower(): r}))
+                            n, pc, r_after, carry_after = loops.skip(loop, r, carry, budget)
+                            for _ in range(n):
+                                td4.cycle()
+                            expected = td4.state
+                            self.assertEqual((expected.pc, expected[1 + loop.register],
+                                              expected.carry), (pc, r_after, carry_after))
+                            self.assertLessEqual(n, budget)
+                            self.assertEqual(0, n % 2)
+
+    @mock.patch.object(fastcore, 'IN_PORT_CHUNK', 7)  # loops across chunks of input port
+    def test_run_is_same_as_cycle_by_cycle(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            rom = rom_of(random_program(rng))
+            cycles = rng.randrange(300)
+            ports = [rng.randrange(16) for _ in range(cycles)]
+            for in_port in (rng.randrange(16), ports):
+                runs = []
+                for skip_loops in (False, True):
+                    td4 = fastcore.FastTD4(rom, skip_loops)
+                    outputs = []
+                    for part in (cycles // 3, cycles - cycles // 3):
+                        port = in_port if isinstance(in_port, int) \
+                            else in_port[td4.step:td4.step + part]
+                        td4.run(part, outputs, port)
+                    runs.append((td4.state, td4.step, outputs))
+                self.assertEqual(runs[0], runs[1], rom)
+
+    def test_headless(self):
+        result = headless.run(PROGRAM_PATH, 10 ** 9, Engine.FAST)
+        self.assertEqual(10 ** 9 + 1, result.cycles)
+        expected = headless.run(PROGRAM_PATH, 3000, Engine.GATE)
+        self.assertEqual(expected.outputs, result.outputs)
+        self.assertEqual(expected.state, result.state)
+        headless.run(PROGRAM_PATH, 777, Engine.FAST, verify=True)
@@ -0,0 +1,62 @@
+from numpy.testing import assert_array_equal
+import numpy as np
+import unittest
+import os
+
+from src import Engine, units, utils, memo, headless
+
+gen_all_bool_patterns = utils.gen_all_bool_patterns
+
+
+class TestMemo(unittest.TestCase):
+    def setUp(self):
+        memo.configure()
+        self.addCleanup(memo.configure)
+
+    def test_ALU(self):
+        for _ in range(2):
+            for p in gen_all_bool_patterns(9):
+                args = (p[0], np.array(p[1:5]), np.array(p[5:]))
+                assert_array_equal(units.ALU(*args), memo.ALU(*args))
+        info = memo.cache_info()['ALU']
+        self.assertEqual((512, 512), (info.hits, info.misses))
+
+    def test_units(self):
+        for p in gen_all_bool_patterns(6):
+            args = (np.array(p[:4]), p[4], p[5])
+            assert_array_equal(units.AR(*args), memo.AR(*args))
+        for p in gen_all_bool_patterns(5):
+            args = (np.array(p[:4]), p[4])
+            assert_array_equal(units.DECODER(*args), memo.DECODER(*args))
+        for p in np.random.RandomState(0).randint(0, 2, (200, 18)).astype(bool):
+            args = (p[0], p[1], p[2:6], p[6:10], p[10:14], p[14:])
+            assert_array_equal(units.MUX(*args), memo.MUX(*args))
+
+    def test_results_are_shared_read_only(self):
+        args = (True, utils.int2ba(3, 4), utils.int2ba(5, 4))
+        res = memo.ALU(*args)
+        self.assertIs(res, memo.ALU(*args))
+        with self.assertRaises(ValueError):
+            res[0] = False
+
+    def test_maxsize(self):
+        memo.configure(maxsize=4)
+        for i in range(16):
+            memo.AR(utils.int2ba(i, 4), False, False)
+        memo.AR(utils.int2ba(0, 4), False, False)
+        info = memo.cache_info()['AR']
+        self.assertEqual((0, 17, 4), (info.hits, info.misses, info.currsize))
+
+    def test_disabled(self):
+        memo.configure(enabled=False)
+        self.assertFalse(memo.enabled())
+        args = (True, utils.int2ba(3, 4), utils.int2ba(5, 4))
+        assert_array_equal(units.ALU(*args), memo.ALU(*args))
+        self.assertIsNot(memo.ALU(*args), memo.ALU(*args))
+        self.assertEqual(0, memo.cache_info()['ALU'].misses)
+
+    def test_run_memo_is_same_as_gate(self):
+        program = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'program.txt')
+        result = headless.run(program, 300, Engine.MEMO, verify=True)
+        self.assertEqual(301, result.cycles)
+        self.assertGreater(memo.cache_info()['ALU'].hits, 250)
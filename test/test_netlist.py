@@ -0,0 +1,92 @@
+import subprocess
+import sys
+import unittest
+import os
+import random
+
+from src import units, utils, assembler, fastcore, fuzz, netlist
+
+PROGRAM_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'program.txt')
+
+
+class TestNetlist(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.netlist = netlist.build_TD4()
+
+    def test_import_does_not_read_config(self):
+        code = 'import src, src.netlist; print("CONFIG" in vars(src))'
+        out = subprocess.run((sys.executable, '-c', code),
+                             cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             check=True, capture_output=True, text=True).stdout
+        self.assertEqual('False', out.strip())
+
+    def test_trace_restores_units(self):
+        self.assertIs(True, units.AND(True, True))
+        with self.assertRaises(TypeError):
+            with netlist.Netlist().tracing():
+                bool(units.NOT(True))
+
+    def test_counts(self):
+        counts = self.netlist.counts()
+        self.assertEqual(counts['total'], counts['NOT'] + counts['AND'] + counts['OR'])
+        self.assertEqual(len(self.netlist.gates), counts['total'])
+        self.assertGreater(counts['depth'], 0)
+
+    def test_alu_matches_units(self):
+        nl = netlist.Netlist()
+        cin, = nl.input('cin', 1)
+        a, b = nl.input('a', 4), nl.input('b', 4)
+        with nl.tracing():
+            nl.output('res', units.ALU(cin, a, b))
+        evaluate, n_gates = netlist.compile_netlist(nl, ('cin', 'a', 'b'), ('res', ))
+        self.assertEqual(len(nl.gates), n_gates)
+        sim = netlist.EventSimulator(nl)
+        for i in range(512):
+            bits = utils.int2ba(i, 9)[::-1]
+            expected = units.ALU(bits[0], bits[1:5], bits[5:])
+            expected = sum(int(bit) << k for k, bit in enumerate(expected))
+            self.assertEqual((expected, ), evaluate(i & 1, i >> 1 & 0b1111, i >> 5))
+            sim.set('cin', i & 1)
+            sim.set('a', i >> 1 & 0b1111)
+            sim.set('b', i >> 5)
+            sim.settle()
+            self.assertEqual(expected, sim.get('res'))
+
+    def test_event_simulator_skips_unchanged(self):
+        sim = netlist.EventSimulator(self.netlist)
+        self.assertEqual(0, sim.settle())
+        sim.set('a', 0)
+        self.assertEqual(0, sim.settle())
+        sim.set('op', 0b00010000)
+        self.assertLess(0, sim.settle())
+        self.assertEqual(0b111, sim.get('decoded') >> 3)
+
+    def test_td4_matches_fastcore(self):
+        for mode in ('event', 'compiled'):
+            bit_matrix = assembler.assemble(PROGRAM_PATH)
+            td4 = netlist.NetlistTD4(bit_matrix, mode, self.netlist)
+            fast = fastcore.FastTD4(fastcore.rom_from_matrix(bit_matrix))
+            for _ in range(300):
+                td4.cycle()
+                fast.cycle()
+                self.assertEqual(fast.state, td4.state)
+            self.assertEqual(300, sum(td4.evaluations.values()))
+            td4.cycle(reset_=False)
+            self.assertEqual((0, 0, 0, 0, 0), td4.state)
+
+    def test_td4_random_programs(self):
+        rng = random.Random(0)
+        for _ in range(5):
+            case = fuzz.gen_case(rng, 100)
+            bit_matrix = fuzz.assemble_program(case.program)
+            td4 = netlist.NetlistTD4(bit_matrix, 'event', self.netlist)
+            fast = fastcore.FastTD4(fastcore.rom_from_matrix(bit_matrix))
+            for in_port in case.in_port:
+                td4.cycle(in_port=in_port)
+                fast.cycle(in_port=in_port)
+            self.assertEqual(fast.state, td4.state)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            netlist.NetlistTD4(assembler.assemble(PROGRAM_PATH), 'levelized')
@@ -0,0 +1,44 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+import json
+import os
+
+from src import CONFIG, Engine, pool
+
+test_dir = os.path.dirname(__file__)
+
+
+class TestPool(unittest.TestCase):
+    def test_load_jobs_for_directory(self):
+        jobs = pool.load_jobs(test_dir, 10)
+        self.assertEqual(5, len(jobs))
+        self.assertEqual(pool.Job(os.path.join(test_dir, 'test_program_correct.txt'), 10), jobs[0])
+
+    def test_load_jobs_reads_config_when_called(self):
+        code = 'import src, src.pool; print("CONFIG" in vars(src))'
+        out = subprocess.run((sys.executable, '-c', code),
+                             cwd=os.path.dirname(test_dir), check=True, capture_output=True,
+                             text=True).stdout
+        self.assertEqual('False', out.strip())
+        self.assertEqual(CONFIG['max_step'], pool.load_jobs(test_dir)[0].max_step)
+
+    def test_load_jobs_for_manifest(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'manifest.json')
+            with open(path, 'w') as f:
+                json.dump([{'program_file': 'a.txt', 'max_step': 5}, {'program_file': 'b.txt'}], f)
+            jobs = pool.load_jobs(path, 10)
+        self.assertEqual([pool.Job(os.path.join(tmp_dir, 'a.txt'), 5),
+                          pool.Job(os.path.join(tmp_dir, 'b.txt'), 10)], jobs)
+
+    def test_run_pool(self):
+        jobs = pool.load_jobs(test_dir, 10) * 3
+        results = list(pool.run_pool(jobs, Engine.FAST, workers=2))
+        report = pool.merge(results, Engine.FAST, 0.0)
+        self.assertEqual(15, report['jobs'])
+        self.assertEqual(12, report['errors'])
+        self.assertEqual(3 * 11, report['cycles'])
+        correct = [r for r in results if 'error' not in r]
+        self.assertEqual({'pc': 2, 'a': 10, 'b': 10, 'out': 0, 'carry': 0}, correct[0]['state'])
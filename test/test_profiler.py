@@ -0,0 +1,39 @@
+import itertools
+import unittest
+import os
+
+from src import units, assembler, cpu, profiler
+
+program_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'program.txt')
+
+
+class TestProfiler(unittest.TestCase):
+    def test_instrument(self):
+        original_NOT, original_cycle = units.NOT, cpu.TD4.cycle
+        prof = profiler.Profiler()
+        with prof.instrument():
+            td4 = cpu.TD4(assembler.assemble(program_path))
+            for _ in td4.run(itertools.repeat((True, True)), 9):
+                pass
+        self.assertEqual(10, prof.stats['cycle'].calls)
+        self.assertEqual(10, prof.stats['DECODER'].calls)
+        self.assertEqual(10, prof.stats['ROM'].calls)
+        self.assertEqual(4 * 10, prof.stats['Register.evaluate'].calls)
+        self.assertEqual(10, prof.stats['DFlipFlop.commit'].calls)
+        self.assertTrue(prof.gate_counts['NOT'] > 0)
+        self.assertTrue('gate evaluations' in prof.report())
+        self.assertIs(original_NOT, units.NOT)
+        self.assertIs(original_cycle, cpu.TD4.cycle)
+
+    def test_Stat_percentile(self):
+        stat = profiler.Stat()
+        for ns in (100, 100, 100, 5000):
+            stat.add(ns)
+        self.assertEqual(128, stat.percentile(50))
+        self.assertEqual(8192, stat.percentile(99))
+
+    def test_substitute_for_unknown_function(self):
+        with self.assertRaises(ValueError) as context:
+            with units.substitute(FOO=units.NOT):
+                pass
+        self.assertTrue('No such functions in units' in str(context.exception))
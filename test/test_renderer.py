@@ -0,0 +1,76 @@
+import unittest
+import contextlib
+import io
+import os
+import runpy
+
+from src import assembler, cpu, renderer
+
+test_dir = os.path.dirname(__file__)
+emulator_path = os.path.join(os.path.dirname(test_dir), 'TD4-emulator.py')
+
+
+class _Clock:
+    def __init__(self):
+        self.t = 0.0
+
+    def __call__(self) -> float:
+        return self.t
+
+
+class TestRenderer(unittest.TestCase):
+    def setUp(self):
+        td4 = cpu.TD4(assembler.assemble(os.path.join(test_dir, 'test_program_correct.txt')))
+        self.cycles = [td4.cycle() for _ in range(4)]
+        self.stream = io.StringIO()
+        self.clock = _Clock()
+
+    def test_first_frame_is_full_panel(self):
+        r = renderer.Renderer(10, stream=self.stream, ansi=True, now=self.clock)
+        r(self.cycles[0])
+        lines = self.stream.getvalue().splitlines()
+        self.assertEqual(len(renderer.PANEL), len(lines))
+        self.assertEqual('step        0', lines[0])
+        self.assertEqual('PC          0000', lines[1])
+
+    def test_frames_are_rate_limited(self):
+        r = renderer.Renderer(10, stream=self.stream, ansi=True, now=self.clock)
+        for cycle in self.cycles[:3]:
+            r(cycle)
+        self.assertEqual(1, r.frames)
+        self.clock.t = 0.1
+        r(self.cycles[3])
+        self.assertEqual(2, r.frames)
+
+    def test_only_changed_cells_are_written(self):
+        r = renderer.Renderer(10, stream=self.stream, ansi=True, now=self.clock)
+        r(self.cycles[0])
+        self.stream.truncate(0)
+        self.stream.seek(0)
+        self.clock.t = 1.0
+        r(self.cycles[1])
+        update = self.stream.getvalue()
+        n_rows = len(renderer.PANEL)
+        # step and PC change; the row of step is n_rows lines up
+        self.assertIn(f'\x1b[{n_rows}A\r\x1b[{r.width}C1{renderer.CLEAR_EOL}', update)
+        self.assertIn(f'\x1b[{n_rows - 1}A\r\x1b[{r.width}C0001{renderer.CLEAR_EOL}', update)
+        self.assertNotIn('REGISTER_B', update)
+
+    def test_close_draws_last_cycle(self):
+        r = renderer.Renderer(10, stream=self.stream, ansi=False, now=self.clock)
+        for cycle in self.cycles:
+            r(cycle)
+        self.assertEqual('', self.stream.getvalue())
+        r.close()
+        self.assertTrue(self.stream.getvalue().startswith('step        3\n'))
+        self.assertEqual(1, r.frames)
+
+    def test_invalid_fps(self):
+        with self.assertRaises(ValueError):
+            renderer.Renderer(0)
+
+    def test_fps_option_must_be_positive(self):
+        parse_args = runpy.run_path(emulator_path)['parse_args']
+        self.assertEqual(60.0, parse_args(['--fps', '60']).fps)
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(io.StringIO()):
+            parse_args(['--fps', '0'])
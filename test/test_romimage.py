@@ -0,0 +1,79 @@
+from numpy.testing import assert_array_equal
+import tempfile
+import unittest
+import shutil
+import os
+
+from src import units, utils, assembler, romimage
+
+test_dir = os.path.dirname(__file__)
+program_path = os.path.join(test_dir, 'test_program_correct.txt')
+
+
+class TestRomimage(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_pack_and_unpack(self):
+        bit_matrix = assembler.assemble(program_path)
+        image = romimage.pack(bit_matrix)
+        self.assertEqual(16, len(image))
+        self.assertEqual(0b00010000, image[0])  # MOV A B
+        assert_array_equal(bit_matrix, romimage.unpack(image))
+
+    def test_unpack_for_invalid_size(self):
+        with self.assertRaises(ValueError) as context:
+            romimage.unpack(b'\0' * 15)
+        self.assertTrue('ROM image must be 16 bytes' in str(context.exception))
+
+    def test_assemble_cached(self):
+        cache_dir = os.path.join(self.tmp_dir.name, 'cache')
+        path = os.path.join(self.tmp_dir.name, 'program.txt')
+        shutil.copy(program_path, path)
+        expected = romimage.assemble_cached(path, cache_dir)
+        self.assertEqual(1, len(os.listdir(cache_dir)))
+
+        original = assembler.assemble
+        assembler.assemble = None  # must not be called for a cached program
+        try:
+            assert_array_equal(expected, romimage.assemble_cached(path, cache_dir))
+        finally:
+            assembler.assemble = original
+
+        original = romimage.assembler_key
+        romimage.assembler_key = lambda: b'another assembler'
+        try:
+            assert_array_equal(expected, romimage.assemble_cached(path, cache_dir))
+            self.assertEqual(2, len(os.listdir(cache_dir)))
+        finally:
+            romimage.assembler_key = original
+
+        with open(path, 'a') as f:
+            f.write('\nOUT 1111')
+        actual = romimage.assemble_cached(path, cache_dir)
+        self.assertEqual(3, len(os.listdir(cache_dir)))
+        assert_array_equal(assembler.assemble(path), actual)
+
+    def test_assemble_dir_and_Container(self):
+        container_path = os.path.join(self.tmp_dir.name, 'programs.td4c')
+        errors = romimage.assemble_dir(test_dir, container_path, None)
+        self.assertEqual(4, len(errors))
+        container = romimage.Container(container_path)
+        self.assertEqual(1, len(container))
+        expected = assembler.assemble(program_path)
+        assert_array_equal(expected, romimage.unpack(container.find(program_path)))
+        assert_array_equal(expected[None], container.matrices())
+
+        ROM = units.build_ROM(container[0])
+        assert_array_equal(expected[2], ROM(utils.bastr2ba('0010')[::-1]))
+
+    def test_Container_for_invalid_file(self):
+        path = os.path.join(self.tmp_dir.name, 'invalid.td4c')
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 32)
+        with self.assertRaises(ValueError) as context:
+            romimage.Container(path)
+        self.assertTrue('Not a ROM container' in str(context.exception))
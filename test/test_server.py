@@ -0,0 +1,173 @@
+import unittest
+import asyncio
+import json
+
+from src import fastcore, server
+
+PROGRAM = ('OUT 0111', 'ADD A 0001', 'JNC 0001', 'ADD A 0001', 'JNC 0011', 'OUT 0110',
+           'ADD A 0001', 'JNC 0110', 'ADD A 0001', 'JNC 1000', 'OUT 0000', 'OUT 0100',
+           'ADD A 0001', 'JNC 1010', 'OUT 1000', 'JMP 1111')
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader, self.writer = reader, writer
+
+    async def send(self, **request):
+        self.writer.write(json.dumps(request).encode() + b'\n')
+        await self.writer.drain()
+
+    async def receive(self):
+        return json.loads(await self.reader.readline())
+
+    async def request(self, **request):
+        await self.send(**request)
+        return await self.receive()
+
+
+class TestServer(unittest.TestCase):
+    def serve(self, test, **kwargs):
+        """Run test(connect) against a server on a free port"""
+        async def main():
+            host = server.Server(**kwargs)
+            listener = await host.start(port=0)
+            port = listener.sockets[0].getsockname()[1]
+            clients = []
+
+            async def connect():
+                clients.append(Client(*await asyncio.open_connection('127.0.0.1', port)))
+                return clients[-1]
+
+            try:
+                await test(connect)
+            finally:
+                for client in clients:
+                    client.writer.close()
+                    await client.writer.wait_closed()
+                listener.close()
+                await listener.wait_closed()
+
+        asyncio.run(main())
+
+    def test_step_and_reset(self):
+        async def test(connect):
+            client = await connect()
+            response = await client.request(cmd='load', program=PROGRAM, id=1)
+            self.assertEqual((True, 1, 0), (response['ok'], response['id'], response['step']))
+            response = await client.request(cmd='next')
+            self.assertEqual(0b0111, response['state']['out'])
+            await client.request(cmd='next')
+            response = await client.request(cmd='reset')
+            self.assertEqual((3, 0, 0), (response['step'], response['state']['pc'],
+                                         response['state']['a']))
+            response = await client.request(cmd='back', steps=2)
+            self.assertEqual((1, 1, 0b0111), (response['step'], response['state']['pc'],
+                                              response['state']['out']))
+            response = await client.request(cmd='jump', step=3)
+            self.assertEqual((3, 0), (response['step'], response['state']['pc']))
+
+        self.serve(test)
+
+    def test_run(self):
+        td4 = fastcore.FastTD4(fastcore.rom_from_matrix(
+            server.assembler.assemble_lines(PROGRAM)))
+        expected = []
+        td4.run(1000, expected)
+
+        async def test(connect):
+            client = await connect()
+            await client.request(cmd='load', program='\n'.join(PROGRAM))
+            response = await client.request(cmd='run', cycles=1000)
+            self.assertEqual(1000, response['step'])
+            self.assertEqual(td4.state._asdict(), response['state'])
+            self.assertEqual(expected, [tuple(o) for o in response['outputs']])
+
+            # a slow clock is streamed until stopped
+            response = await client.request(cmd='clock', cycle='HIGH')
+            self.assertEqual(10, response['hz'])
+            await client.send(cmd='run', cycles=100, id='run')
+            event = await client.receive()
+            self.assertEqual('state', event['event'])
+            await client.send(cmd='stop')
+            while 'event' in event:
+                event = await client.receive()
+            self.assertTrue(event['stopped'])
+            self.assertLess(event['step'], 1100)
+
+            response = await client.request(cmd='clock', cycle='MANUAL')
+            response = await client.request(cmd='run', cycles=10)
+            self.assertFalse(response['ok'])
+
+        self.serve(test)
+
+    def test_stop_long_jobs(self):
+        async def test(connect):
+            client = await connect()
+            await client.request(cmd='load', program=('ADD A 0001', 'JMP 0000'))
+            await client.request(cmd='clock', hz=1e9)
+            for request in (dict(cmd='jump', step=10 ** 10), dict(cmd='run', cycles=10 ** 10)):
+                await client.send(**request)
+                response = await client.request(cmd='state')
+                self.assertTrue(response['running'], request)
+                response = await client.request(cmd='stop')
+                while 'event' in response:
+                    response = await client.receive()
+                self.assertTrue(response['stopped'], request)
+                self.assertLess(response['step'], 10 ** 10)
+
+        self.serve(test)
+
+    def test_continue(self):
+        async def test(connect):
+            client = await connect()
+            await client.request(cmd='load', program=PROGRAM)
+            response = await client.request(cmd='break', spec='OUT 0000')
+            self.assertEqual(['OUT 0000'], response['breakpoints'])
+            response = await client.request(cmd='continue', cycles=10 ** 6)
+            self.assertEqual(['breakpoint OUT 0000'], response['hits'])
+            self.assertEqual((11, 0), (response['state']['pc'], response['state']['out']))
+            await client.request(cmd='break', spec='')
+            await client.request(cmd='watch', spec='out changed')
+            response = await client.request(cmd='continue', cycles=10 ** 6)
+            self.assertEqual(['watchpoint out changed'], response['hits'])
+            self.assertEqual(0b0100, response['state']['out'])
+
+        self.serve(test)
+
+    def test_sessions(self):
+        async def session(connect, in_port):
+            client = await connect()
+            await client.request(cmd='load', program=('IN A', 'JMP 0000'), in_port=in_port)
+            await client.request(cmd='run', cycles=1001)
+            return (await client.request(cmd='state'))['state']['a']
+
+        async def test(connect):
+            outs = await asyncio.gather(*(session(connect, i % 16) for i in range(200)))
+            self.assertEqual([i % 16 for i in range(200)], outs)
+
+        self.serve(test)
+
+    def test_errors(self):
+        async def test(connect):
+            client = await connect()
+            for request in (dict(cmd='fly'), dict(cmd='load', program=['MOV C 0000']),
+                            dict(cmd='run'), dict(cmd='watch', spec='pc'),
+                            dict(cmd='clock', hz=0), dict(cmd='break', spec=5),
+                            dict(cmd='load', program=[1, 2]), dict(cmd='load', program=5),
+                            dict(cmd='load', program=PROGRAM, in_port=3.5),
+                            dict(cmd='run', cycles=True), dict(cmd='jump', step='3'),
+                            dict(cmd='back', steps=None), dict(cmd='clock', hz='fast')):
+                response = await client.request(**request)
+                self.assertFalse(response['ok'], request)
+            client.writer.write(b'not json\n')
+            self.assertFalse((await client.receive())['ok'])
+            client.writer.write(b'{"cmd": "state", "pad": "' + b' ' * server.LINE_LIMIT + b'"}\n')
+            self.assertIn('bytes at most', (await client.receive())['error'])
+            self.assertTrue((await client.request(cmd='state'))['ok'])
+
+            # sessions over the limit are refused
+            await (await connect()).request(cmd='state')
+            response = await (await connect()).receive()
+            self.assertIn('Too many sessions', response['error'])
+
+        self.serve(test, max_sessions=2)
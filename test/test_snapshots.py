@@ -0,0 +1,60 @@
+import unittest
+import random
+
+from src import State, snapshots
+
+
+def _states(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [State(rng.randrange(16), rng.randrange(16), rng.randrange(16), rng.randrange(16),
+                  rng.randrange(2)) for _ in range(n)]
+
+
+class TestSnapshots(unittest.TestCase):
+    def test_pack(self):
+        state = State(1, 2, 3, 4, 1)
+        self.assertEqual(1 | 2 << 4 | 3 << 8 | 4 << 12 | 1 << 16, snapshots.pack(state))
+        self.assertEqual(state, snapshots.unpack(snapshots.pack(state)))
+
+    def test_state_at(self):
+        ring = snapshots.SnapshotRing(256, 8)
+        states = _states(100)
+        for step, state in enumerate(states):
+            ring.record(step, state)
+        self.assertEqual((0, 99), (ring.first, ring.last))
+        for step, state in enumerate(states):
+            self.assertEqual(state, ring.state_at(step))
+        self.assertNotIn(100, ring)
+        with self.assertRaises(ValueError):
+            ring.state_at(100)
+
+    def test_wrap_drops_whole_groups(self):
+        ring = snapshots.SnapshotRing(30, 8)
+        self.assertEqual(32, ring.capacity)
+        states = _states(100)
+        for step, state in enumerate(states):
+            ring.record(step, state)
+        self.assertEqual(72, ring.first)
+        self.assertEqual(28, len(ring))
+        for step in range(72, 100):
+            self.assertEqual(states[step], ring.state_at(step))
+
+    def test_record_after_going_back(self):
+        ring = snapshots.SnapshotRing(64, 8)
+        states, others = _states(40), _states(40, seed=1)
+        for step, state in enumerate(states):
+            ring.record(step, state)
+        for step in range(21, 40):
+            ring.record(step, others[step])
+        for step in range(40):
+            self.assertEqual(states[step] if step < 21 else others[step], ring.state_at(step))
+
+    def test_record_out_of_sequence(self):
+        ring = snapshots.SnapshotRing(64, 8)
+        for step, state in enumerate(_states(10)):
+            ring.record(step, state)
+        state = State(1, 1, 1, 1, 1)
+        ring.record(50, state)
+        self.assertEqual((50, 50), (ring.first, ring.last))
+        ring.record(51, state)
+        self.assertEqual(state, ring.state_at(51))
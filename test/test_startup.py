@@ -0,0 +1,33 @@
+import subprocess
+import unittest
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _imported_after(code: str) -> set:
+    """Return modules loaded by a fresh interpreter running code"""
+    out = subprocess.run((sys.executable, '-c', code + '\nimport sys; print(*sys.modules)'),
+                         cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    return set(out.split())
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_src_is_light(self):
+        modules = _imported_after('import src, src.ui')
+        for heavy in ('numpy', 'nptyping', 'tqdm', 'json'):
+            self.assertNotIn(heavy, modules)
+
+    def test_config_is_read_on_first_access(self):
+        out = subprocess.run(
+            (sys.executable, '-c', 'import src; print("CONFIG" in vars(src)); '
+             + 'print(src.CONFIG["max_step"]); print("CONFIG" in vars(src))'),
+            cwd=ROOT, check=True, capture_output=True, text=True).stdout
+        self.assertEqual(['False', '300', 'True'], out.split())
+
+    def test_help_does_not_import_numpy(self):
+        self.assertNotIn('numpy', _imported_after(
+            'import runpy, sys\nsys.argv = ["TD4-emulator.py", "--help"]\n'
+            + 'try:\n    runpy.run_path("TD4-emulator.py", run_name="__main__")\n'
+            + 'except SystemExit:\n    pass'))
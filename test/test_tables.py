@@ -0,0 +1,38 @@
+from numpy.testing import assert_array_equal
+import numpy as np
+import unittest
+import os
+
+from src import Engine, units, utils, tables, headless
+
+gen_all_bool_patterns = utils.gen_all_bool_patterns
+
+
+class TestTables(unittest.TestCase):
+    def test_ALU(self):
+        for p in gen_all_bool_patterns(9):
+            args = (p[0], np.array(p[1:5]), np.array(p[5:]))
+            assert_array_equal(units.ALU(*args), tables.ALU(*args))
+
+    def test_MUX(self):
+        rng = np.random.RandomState(0)
+        for p in rng.randint(0, 2, (1000, 18)).astype(bool):
+            args = (p[0], p[1], p[2:6], p[6:10], p[10:14], p[14:])
+            assert_array_equal(units.MUX(*args), tables.MUX(*args))
+
+    def test_DECODER(self):
+        for p in gen_all_bool_patterns(5):
+            args = (np.array(p[:4]), p[4])
+            assert_array_equal(units.DECODER(*args), tables.DECODER(*args))
+
+    def test_AR(self):
+        for p in gen_all_bool_patterns(6):
+            args = (np.array(p[:4]), p[4], p[5])
+            assert_array_equal(units.AR(*args), tables.AR(*args))
+
+    def test_run_table_is_same_as_gate(self):
+        program = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'program.txt')
+        expected = headless.run(program, 300, Engine.GATE)
+        actual = headless.run(program, 300, Engine.TABLE)
+        self.assertEqual(expected.state, actual.state)
+        self.assertEqual(expected.outputs, actual.outputs)
@@ -0,0 +1,66 @@
+import tempfile
+import itertools
+import unittest
+import os
+
+from src import ClockCycle, units, utils, assembler, cpu, trace
+
+program_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'program.txt')
+
+
+def _display_kwargs(cycle: cpu.Cycle) -> dict:
+    return dict(step=cycle.step, PC=utils.ba2str(cycle.q_PC[::-1]),
+                output=utils.ba2str(cycle.q_c_out[::-1]),
+                REGISTER_A=utils.ba2str(cycle.q_a[::-1]), REGISTER_B=utils.ba2str(cycle.q_b[::-1]),
+                c_flag=int(cycle.c_flag), fetched_op=utils.ba2str(cycle.op_arr[::-1]),
+                decode_res=utils.ba2str(cycle.decoded_arr),
+                MUX_res=utils.ba2str(cycle.selected_arr[::-1]),
+                carry=int(cycle.c), ALU_res=utils.ba2str(cycle.sum_arr))
+
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'trace.bin')
+        td4 = cpu.TD4(assembler.assemble(program_path))
+        self.expecteds = []
+        with trace.TraceWriter(self.path, chunk=16) as writer:
+            for cycle in td4.run(itertools.repeat((True, True)), 99):
+                writer(cycle)
+                self.expecteds.append(_display_kwargs(cycle))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_file_size(self):
+        self.assertEqual(trace.HEADER.size + 100 * trace.RECORD.itemsize,
+                         os.path.getsize(self.path))
+
+    def test_columns(self):
+        reader = trace.TraceReader(self.path)
+        self.assertEqual(100, len(reader))
+        self.assertEqual([int(e['PC'], 2) for e in self.expecteds[10:20]],
+                         reader.pc[10:20].tolist())
+        self.assertEqual([e['carry'] for e in self.expecteds], reader.carry[:].tolist())
+
+    def test_find(self):
+        reader = trace.TraceReader(self.path)
+        expected = [e['step'] for e in self.expecteds if e['output'] == '0110']
+        self.assertEqual(expected, list(reader.find('out', 0b0110, chunk=7)))
+
+    def test_replay(self):
+        actuals = []
+        original = units.DISPLAY
+        units.DISPLAY = lambda cc, **kwargs: actuals.append(kwargs)
+        try:
+            trace.replay(self.path, 60, 70, ClockCycle.MANUAL)
+        finally:
+            units.DISPLAY = original
+        self.assertEqual(self.expecteds[60:70], actuals)
+
+    def test_TraceReader_for_invalid_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'\0' * 32)
+        with self.assertRaises(ValueError) as context:
+            trace.TraceReader(self.path)
+        self.assertTrue('Not a trace file' in str(context.exception))
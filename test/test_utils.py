@@ -18,6 +18,13 @@ class TestUnits(unittest.TestCase):
         expected = 10
         assert_array_equal(expected, actual)
 
+    def test_ba2int_lsb(self):
+        arg = np.array((False, True, False, True, False))
+        actual = utils.ba2int_lsb(arg)
+        expected = 10
+        self.assertEqual(expected, actual)
+        self.assertEqual(0b10000000, utils.ba2int_lsb(utils.int2ba(1, 8)))
+
     def test_int2bastr(self):
         arg = 10
         actual = utils.int2bastr(arg, 5)
@@ -47,3 +54,16 @@ class TestUnits(unittest.TestCase):
         actual = utils.int2ba(arg, 5)
         expected = np.array((False, True, False, True, False))
         assert_array_equal(expected, actual)
+
+    def test_BitVector(self):
+        bv = utils.int2bv(10, 5)
+        self.assertEqual(utils.bastr2bv('01010'), bv)
+        self.assertEqual(hash(utils.ba2bv(utils.int2ba(10, 5))), hash(bv))
+        self.assertEqual(10, utils.ba2int(bv))
+        self.assertEqual('01010', utils.ba2str(bv))
+        self.assertIsInstance(bv[1:], utils.BitVector)
+        self.assertEqual(utils.bastr2bv('01010'), bv[::-1][::-1])
+        self.assertIs(True, bv[1])
+        assert_array_equal(utils.int2ba(10, 5), np.array(bv))
+        with self.assertRaises(TypeError):
+            bv[0] = True
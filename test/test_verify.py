@@ -0,0 +1,29 @@
+import unittest
+import numpy as np
+
+from src import units, verify
+
+
+class TestVerify(unittest.TestCase):
+    def test_units_pass(self):
+        for result in verify.verify_all():
+            self.assertTrue(result.ok, result)
+            self.assertIsNone(result.first_mismatch)
+
+    def test_planes(self):
+        patterns = verify.unpack(verify.planes(8), 256)
+        np.testing.assert_array_equal(np.arange(256), patterns)
+        patterns = verify.unpack(verify.planes(3), 8)
+        np.testing.assert_array_equal(np.arange(8), patterns)
+
+    def test_pack_unpack(self):
+        values = np.random.default_rng(0).integers(0, 1 << 11, 1000)
+        np.testing.assert_array_equal(values, verify.unpack(verify.pack(values, 11), 1000))
+
+    def test_broken_gate_is_found(self):
+        # full adders which ignore the input carry
+        with units.substitute(FA=lambda cin, a, b: units.HA(a, b)):
+            result = verify.verify('ALU')
+        self.assertFalse(result.ok)
+        self.assertEqual(result.first_mismatch, 1)  # cin only
+        self.assertIs(True, verify.verify('ALU').ok)